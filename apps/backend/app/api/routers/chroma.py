@@ -1,13 +1,31 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, BackgroundTasks
+from fastapi.responses import StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 
 from app.services import ChromaService
-from app.pydantic import DeleteCollectionDocsRequest
+from app.pydantic import (
+    DeleteCollectionDocsRequest,
+    CollectionInclude,
+    CollectionSourceType,
+    ListingFormat,
+    EmbeddingMigrationRequest,
+    IndexSearchRequest
+)
+from app.models import ProcessingStatus
+from app.core import settings
+from app.core import ChromaClientManager
 
-from ..svc_deps import get_chroma_svc
+from ..svc_deps import get_chroma_svc, get_chroma_manager
 
 
 
 from uuid import UUID
+from pathlib import Path
+from typing import List, Optional
+import tempfile
+import json
+import os
 
 
 
@@ -33,19 +51,92 @@ def get_collection_total (
         )  
 
 
+@router.get("/health", summary="Check Chroma DB is reachable")
+def get_health(
+    chroma_mnger: ChromaClientManager = Depends(get_chroma_manager)
+):
+    """
+    Check Chroma DB is reachable (recent successful checks are reused)
+    """
+
+    if not chroma_mnger.check_health():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Chroma DB is unreachable"
+        )
+
+    return {"status": "ok"}
+
+
+@router.post("/collections/gc", summary="Garbage collect retired collection versions")
+def garbage_collect_collections(
+    svc: ChromaService = Depends(get_chroma_svc)
+):
+    """
+    Delete collection versions which were replaced by a rebuild longer than the grace period ago
+    """
+
+    try:
+        return svc.garbage_collect_collections()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{str(e)}"
+        )
+
+
+@router.get("/migrations/{migration_id}", summary="Get the status & progress of an embedding migration")
+def get_embedding_migration(
+    migration_id: UUID,
+    svc: ChromaService = Depends(get_chroma_svc)
+):
+    """
+    Retrieve the status & progress of an embedding migration
+    """
+
+    try:
+        return svc.get_embedding_migration(migration_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{str(e)}"
+        )
+
+
 @router.get("/{project_id}")
 def get_documents(
     project_id: UUID, 
+    source_type: CollectionSourceType = CollectionSourceType.ALL,
+    limit: int = Query(settings.CHROMA_LIST_DEFAULT_LIMIT, ge=1, le=settings.CHROMA_LIST_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    include: Optional[List[CollectionInclude]] = Query(None),
+    where: Optional[str] = Query(None, description="JSON encoded Chroma metadata filter (i.e {\"source\": \"README.md\"})"),
+    format: ListingFormat = ListingFormat.JSON,
     svc: ChromaService = Depends(get_chroma_svc)
 ):
     """
-    Retrieve the documents associated with a particular project in Chroma 
-
-    TODO: Allow for specification of a particular source_type (i.e DOCS or CODE)
+    Retrieve a page of the documents associated with a particular project in Chroma (embeddings are
+    only returned when included), or stream every matching document as NDJSON
     """
 
     try:
-        return svc.get_all_files(project_id)
+        where_filter = json.loads(where) if where else None
+    except json.JSONDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid where filter: {str(e)}"
+        )
+
+    include_fields = [field.value for field in include] if include else None
+
+    try:
+        if format == ListingFormat.NDJSON:
+            return StreamingResponse(
+                svc.stream_files(project_id, source_type.value, include_fields, where_filter),
+                media_type="application/x-ndjson"
+            )
+
+        return svc.get_all_files(project_id, source_type.value, limit, offset, include_fields, where_filter)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -56,16 +147,15 @@ def get_documents(
 @router.delete("/collection/{project_id}")
 def delete_collection(
     project_id: UUID,
+    source_type: CollectionSourceType = CollectionSourceType.ALL,
     svc: ChromaService = Depends(get_chroma_svc)
 ):
     """
-    Retrieve the documents associated with a particular project in Chroma 
-
-    TODO: Allow for specification of a particular source_type (i.e DOCS or CODE)
+    Delete the collection(s) associated with a particular project in Chroma 
     """
 
     try:
-        return svc.delete_collection(project_id)
+        return svc.delete_collection(project_id, source_type.value)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -78,18 +168,175 @@ def delete_documents_from_collections(
 
     project_id: UUID, 
     delete_collection_docs: DeleteCollectionDocsRequest,
+    source_type: CollectionSourceType = CollectionSourceType.ALL,
     svc: ChromaService = Depends(get_chroma_svc)
 ):
     """
     Delete specific documents from existing collection
+    """
+
+    try:
+        return svc.delete_collection_documents(
+            delete_collections=delete_collection_docs, project_id=project_id, source_type=source_type.value
+        ) 
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{str(e)}"
+        )  
+
 
-    TODO: Allow for specification of a particular source_type (i.e DOCS or CODE)
+@router.post("/{project_id}/rebuild", summary="Kick off blue/green rebuild of a project's collections")
+def rebuild_collections(
+    project_id: UUID,
+    background_tasks: BackgroundTasks,
+    source_type: CollectionSourceType = CollectionSourceType.ALL,
+    svc: ChromaService = Depends(get_chroma_svc)
+):
+    """
+    Rebuild the collection(s) of a particular project into new versions in the background, queries are
+    served from the current versions until the rebuilt versions are swapped in
     """
 
     try:
-        return svc.delete_collection_documents(delete_collections=delete_collection_docs, project_id=project_id) 
+        collections = svc.get_rebuild_collections(project_id, source_type.value)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"{str(e)}"
-        )  
\ No newline at end of file
+        )
+
+    background_tasks.add_task(svc.rebuild_collections, collections)
+
+    return {
+        "collections": list(collections.values()),
+        "status": ProcessingStatus.IN_PROGRESS
+    }
+
+
+@router.get("/{project_id}/index", summary="Get the HNSW index configuration of a project's collections")
+def get_index_configuration(
+    project_id: UUID,
+    source_type: CollectionSourceType = CollectionSourceType.ALL,
+    svc: ChromaService = Depends(get_chroma_svc)
+):
+    """
+    Retrieve the HNSW index configuration (distance metric, M, construction & search ef) of a project's collection(s)
+    """
+
+    try:
+        return svc.get_index_configuration(project_id, source_type.value)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{str(e)}"
+        )
+
+
+@router.patch("/{project_id}/index", summary="Adjust the search ef of a project's collection")
+def update_search_ef(
+    project_id: UUID,
+    request: IndexSearchRequest,
+    svc: ChromaService = Depends(get_chroma_svc)
+):
+    """
+    Adjust the search ef of a project's collection (higher values trade query latency for recall)
+    """
+
+    try:
+        return svc.update_search_ef(project_id, request)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{str(e)}"
+        )
+
+
+@router.post("/{project_id}/migrate-embeddings", summary="Kick off re-embedding of a project's collection with another model")
+def migrate_embeddings(
+    project_id: UUID,
+    request: EmbeddingMigrationRequest,
+    background_tasks: BackgroundTasks,
+    svc: ChromaService = Depends(get_chroma_svc)
+):
+    """
+    Re-embed the chunks stored within a project's collection with another embedding model in the background,
+    switching the project over to the model once complete (progress via GET /chroma/migrations/{migration_id})
+    """
+
+    try:
+        migration = svc.init_embedding_migration(project_id, request)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{str(e)}"
+        )
+
+    background_tasks.add_task(svc.run_embedding_migration, migration["id"])
+
+    return migration
+
+
+@router.get("/{project_id}/export")
+def export_collections(
+    project_id: UUID,
+    source_type: CollectionSourceType = CollectionSourceType.ALL,
+    svc: ChromaService = Depends(get_chroma_svc)
+):
+    """
+    Export the collection(s) of a particular project as a tar archive of NPY vectors & JSONL metadata
+    """
+
+    archive_path = _create_tmp_archive_path()
+
+    try:
+        svc.export_collections(project_id, archive_path, source_type.value)
+    except Exception as e:
+        archive_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{str(e)}"
+        )
+
+    return FileResponse(
+        archive_path,
+        media_type="application/x-tar",
+        filename=f"{project_id}_{source_type.value.replace('/', '')}.tar",
+        background=BackgroundTask(os.remove, archive_path)
+    )
+
+
+@router.post("/{project_id}/import")
+async def import_collections(
+    project_id: UUID,
+    request: Request,
+    source_type: CollectionSourceType = CollectionSourceType.ALL,
+    svc: ChromaService = Depends(get_chroma_svc)
+):
+    """
+    Restore the collection(s) of a particular project from an exported archive sent as the request body
+    """
+
+    archive_path = _create_tmp_archive_path()
+
+    try:
+        # NOTE: archive is streamed to disk rather than held in memory
+        with open(archive_path, "wb") as f:
+            async for chunk in request.stream():
+                f.write(chunk)
+
+        return await run_in_threadpool(svc.import_collections, project_id, archive_path, source_type.value)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{str(e)}"
+        )
+    finally:
+        archive_path.unlink(missing_ok=True)
+
+
+def _create_tmp_archive_path() -> Path:
+    Path(settings.TMP).mkdir(parents=True, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=".tar", dir=settings.TMP)
+    os.close(fd)
+    return Path(path)
@@ -4,20 +4,51 @@ from .core import (
     init_db, 
     sync_engine, 
     setup_logging, 
-    async_engine
+    async_engine,
+    ChromaClientManager
 )
 from contextlib import asynccontextmanager
+import threading
+import asyncio
+import logging
 from .api.routers import app_router
+from .embeddings import (
+    shutdown_embedding_workers,
+    preload_tokenizers,
+    start_embedding_server,
+    stop_embedding_server
+)
+from .ingestion import garbage_collect_collections
+
+
+logger = logging.getLogger(__name__)
+
+
+def _garbage_collect_collections():
+    """
+    Delete collection versions & shared collection partitions whose grace period passed while the app was down
+    """
+    try:
+        garbage_collect_collections(ChromaClientManager())
+    except Exception as e:
+        logger.warning(f"Failed to garbage collect collections on startup: {str(e)}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Async context manager for initializing necessary models and then
-    disposing of DB engine once app's shutdown
+    disposing of DB engine & worker processes once app's shutdown
     """
     init_db()
+    if settings.TOKENIZER_PRELOAD:
+        await asyncio.to_thread(preload_tokenizers)
+    if settings.EMBEDDING_SERVER_ENABLED and settings.EMBEDDING_SERVER_AUTOSTART:
+        await asyncio.to_thread(start_embedding_server)
+    threading.Thread(target=_garbage_collect_collections, name="collection-gc", daemon=True).start()
     yield
+    stop_embedding_server()
+    shutdown_embedding_workers()
     sync_engine.dispose()
     await async_engine.dispose()
 
@@ -0,0 +1,359 @@
+import argparse
+import logging
+from pathlib import Path
+from typing import Dict, List
+
+from .core import settings, init_db, setup_logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def calibrate_conversion(args: argparse.Namespace):
+    """
+    Benchmark Docling pipeline tunings against a sample set of documents & persist the
+    fastest tuning for the current host
+
+    Usage: python -m app.cli calibrate --samples <dir>
+    """
+    from .conversion import calibrate
+
+    sample_files = [
+        f for f in sorted(Path(args.samples).glob("**/*"))
+        if f.is_file() and f.suffix.lstrip(".").lower() in settings.DOCS_FILE_EXTENSIONS
+    ][: args.max_files]
+
+    if not sample_files:
+        raise SystemExit(f"No documentation files found in sample directory: {args.samples}")
+
+    init_db()
+
+    logger.info(f"Calibrating Docling pipeline tuning against {len(sample_files)} sample documents")
+    tuning = calibrate(sample_files)
+    print(tuning)
+
+
+def benchmark_embedding_batching(args: argparse.Namespace):
+    """
+    Compare embedding throughput of fixed count batches against length bucketed token budget batches,
+    using paragraphs of sample markdown / text files as chunks
+
+    Usage: python -m app.cli benchmark-batching --samples <dir>
+    """
+    from .embeddings import load_embedding_model, benchmark_batching
+
+    texts = _load_sample_chunks(args.samples, args.max_chunks)
+
+    model = load_embedding_model("HuggingFace", args.model, settings.EMBEDDING_DEVICE)
+    print(benchmark_batching(model, texts))
+
+
+def benchmark_onnx_embedding(args: argparse.Namespace):
+    """
+    Check accuracy of the ONNX Runtime model against the torch model & compare their embedding throughput
+
+    Usage: python -m app.cli benchmark-onnx --samples <dir>
+    """
+    from .embeddings import check_onnx_accuracy, benchmark_onnx, export_onnx_model
+
+    texts = _load_sample_chunks(args.samples, args.max_chunks)
+    quantization = None if args.quantization == "none" else args.quantization
+
+    export_onnx_model(args.model, quantization)
+    print(check_onnx_accuracy(args.model, texts, quantization))
+    print(benchmark_onnx(args.model, texts, quantization))
+
+
+def fit_embedding_projection(args: argparse.Namespace):
+    """
+    Fit & persist a PCA projection of the model's embeddings, using paragraphs of sample markdown / text files
+
+    Usage: python -m app.cli fit-projection --samples <dir> --model <model> --dimensions <dimensions>
+    """
+    from .embeddings import load_embedding_model, embed_length_bucketed, fit_pca_projection
+
+    texts = _load_sample_chunks(args.samples, args.max_chunks)
+
+    init_db()
+
+    model = load_embedding_model("HuggingFace", args.model, settings.EMBEDDING_DEVICE)
+    projection = fit_pca_projection(args.model, embed_length_bucketed(model, texts), args.dimensions)
+    print({"dimensions": projection.dimensions, "explained_variance": projection.explained_variance})
+
+
+def benchmark_embedding_projection(args: argparse.Namespace):
+    """
+    Measure recall@k of reduced dimension embeddings against the full embeddings of sample chunks
+
+    Usage: python -m app.cli benchmark-projection --samples <dir> --dimensions <dimensions>
+    """
+    import numpy as np
+    from .embeddings import load_embedding_model, embed_length_bucketed, fit_pca, benchmark_projection_recall
+    from .embeddings.projection import MatryoshkaProjector
+
+    texts = _load_sample_chunks(args.samples, args.max_chunks)
+
+    model = load_embedding_model("HuggingFace", args.model, settings.EMBEDDING_DEVICE)
+    embeddings = np.asarray(embed_length_bucketed(model, texts), dtype=np.float32)
+
+    # NOTE: PCA is fitted against the chunks not used as queries, so recall is not measured on its own fit
+    results = {
+        "matryoshka": benchmark_projection_recall(embeddings, MatryoshkaProjector(args.dimensions), args.k, args.queries),
+        "pca": benchmark_projection_recall(embeddings, fit_pca(embeddings[args.queries:], args.dimensions)[0], args.k, args.queries)
+    }
+    print(results)
+
+
+def export_project_collections(args: argparse.Namespace):
+    """
+    Export a project's Chroma collection(s) to a tar archive of NPY vectors & JSONL metadata
+
+    Usage: python -m app.cli export-collections --project <project name> --output <archive>
+    """
+    from .core import ChromaClientManager
+    from .ingestion import export_collections
+
+    init_db()
+
+    counts = export_collections(
+        ChromaClientManager(), _get_collection_targets(args.project, args.source_type), Path(args.output)
+    )
+    print(counts)
+
+
+def import_project_collections(args: argparse.Namespace):
+    """
+    Restore a project's Chroma collection(s) from an exported archive
+
+    Usage: python -m app.cli import-collections --project <project name> --input <archive>
+    """
+    from .core import ChromaClientManager
+    from .ingestion import import_collections
+
+    init_db()
+
+    counts = import_collections(
+        ChromaClientManager(), Path(args.input), _get_collection_targets(args.project, args.source_type)
+    )
+    print(counts)
+
+
+def rebuild_project_collections(args: argparse.Namespace):
+    """
+    Blue/green rebuild a project's Chroma collection(s) into new versions & swap their aliases once complete
+
+    Usage: python -m app.cli rebuild-collections --project <project name>
+    """
+    from .core import ChromaClientManager
+    from .ingestion import CollectionRebuild, copy_collection
+
+    init_db()
+
+    chroma_manager = ChromaClientManager()
+    for name in {target.name for target in _get_collection_targets(args.project, args.source_type).values()}:
+        print(CollectionRebuild(chroma_manager, name).run(copy_collection(chroma_manager, name)))
+
+
+def garbage_collect_project_collections(args: argparse.Namespace):
+    """
+    Delete collection versions retired by rebuilds longer than the grace period ago
+
+    Usage: python -m app.cli gc-collections
+    """
+    from .core import ChromaClientManager
+    from .ingestion import garbage_collect_collections
+
+    init_db()
+
+    print(garbage_collect_collections(ChromaClientManager(), args.grace_seconds))
+
+
+def migrate_project_embeddings(args: argparse.Namespace):
+    """
+    Re-embed the chunks stored within a project's collection with another embedding model, switching the
+    project over to the model once complete
+
+    Usage: python -m app.cli migrate-embeddings --project-id <project id> --source-type DOCS --model <model>
+    """
+    from .core import ChromaClientManager, get_sync_session_maker
+    from .services import ChromaService, ProjectService
+    from .pydantic import EmbeddingMigrationRequest
+
+    init_db()
+
+    chroma_manager = ChromaClientManager()
+    with get_sync_session_maker()() as db:
+        svc = ChromaService(db=db, chroma_manager=chroma_manager, project_svc=ProjectService(db=db, chroma_manager=chroma_manager))
+        migration = svc.init_embedding_migration(
+            args.project_id,
+            EmbeddingMigrationRequest(
+                source_type=args.source_type,
+                embedding_provider=args.provider,
+                embedding_model=args.model,
+                embedding_dimensions=args.dimensions
+            )
+        )
+
+        svc.run_embedding_migration(migration["id"])
+        db.expire_all()
+        print(svc.get_embedding_migration(migration["id"]))
+
+
+def benchmark_collection_layouts(args: argparse.Namespace):
+    """
+    Compare memory use & query latency of per-project collections against a shared collection partitioned by
+    project metadata, using random vectors
+
+    Usage: python -m app.cli benchmark-collections --projects <projects> --chunks <chunks per project>
+    """
+    from .core.collection_benchmark import benchmark_collection_layouts
+
+    print(benchmark_collection_layouts(args.projects, args.chunks, args.dimensions, args.queries, args.k))
+
+
+def serve_embeddings(args: argparse.Namespace):
+    """
+    Run the local embedding server shared by API requests & IngestionJobs
+
+    Usage: python -m app.cli embedding-server
+    """
+    from .embeddings import run_embedding_server
+
+    run_embedding_server(args.socket)
+
+
+def _get_collection_targets(project_name: str, source_type: str) -> Dict:
+    """
+    Retrieve the collections (or partitions of shared collections) of a project by name, keyed by source type
+
+    Args:
+        project_name (str): name of the project
+        source_type (str): source type of the collection (DOCS, CODE, or N/A for both)
+    """
+    from sqlalchemy import select
+    from .core import get_sync_session_maker, get_collection_targets
+    from .models import Project
+
+    with get_sync_session_maker()() as session:
+        project = session.execute(select(Project).where(Project.project_name == project_name)).scalars().first()
+        if not project:
+            raise SystemExit(f"No project found with the name {project_name}")
+
+        return get_collection_targets(project, source_type)
+
+
+def _load_sample_chunks(samples: str, max_chunks: int) -> List[str]:
+    """
+    Split sample markdown / text files into paragraphs to use as chunks
+
+    Args:
+        samples (str): directory of sample files
+        max_chunks (int): maximum number of chunks to return
+    """
+
+    texts = []
+    for f in sorted(Path(samples).glob("**/*")):
+        if f.is_file() and f.suffix.lower() in {".md", ".txt"}:
+            texts.extend(p.strip() for p in f.read_text(errors="ignore").split("\n\n") if p.strip())
+
+    if not texts:
+        raise SystemExit(f"No markdown or text files found in sample directory: {samples}")
+
+    return texts[:max_chunks]
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create parser for the supported management commands
+    """
+
+    parser = argparse.ArgumentParser(prog="app.cli", description=f"{settings.PROJECT_NAME} management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    calibrate_parser = subparsers.add_parser("calibrate", help="Calibrate Docling pipeline batch sizes & thread counts for this host")
+    calibrate_parser.add_argument("--samples", required=True, help="Directory of sample documentation files to benchmark against")
+    calibrate_parser.add_argument("--max-files", type=int, default=20, help="Maximum number of sample files to convert per candidate")
+    calibrate_parser.set_defaults(func=calibrate_conversion)
+
+    batching_parser = subparsers.add_parser("benchmark-batching", help="Benchmark length bucketed embedding batches against fixed count batches")
+    batching_parser.add_argument("--samples", required=True, help="Directory of sample markdown / text files to chunk by paragraph")
+    batching_parser.add_argument("--model", default=settings.DOCS_EMBEDDING_MODEL, help="HuggingFace embedding model to benchmark")
+    batching_parser.add_argument("--max-chunks", type=int, default=2000, help="Maximum number of chunks to embed")
+    batching_parser.set_defaults(func=benchmark_embedding_batching)
+
+    onnx_parser = subparsers.add_parser("benchmark-onnx", help="Check accuracy & benchmark the ONNX Runtime embedding model against torch")
+    onnx_parser.add_argument("--samples", required=True, help="Directory of sample markdown / text files to chunk by paragraph")
+    onnx_parser.add_argument("--model", default=settings.DOCS_EMBEDDING_MODEL, help="HuggingFace embedding model to export & benchmark")
+    onnx_parser.add_argument("--quantization", default=settings.ONNX_QUANTIZATION or "none", help="int8 quantization config (arm64, avx2, avx512, avx512_vnni) or none")
+    onnx_parser.add_argument("--max-chunks", type=int, default=2000, help="Maximum number of chunks to embed")
+    onnx_parser.set_defaults(func=benchmark_onnx_embedding)
+
+    fit_projection_parser = subparsers.add_parser("fit-projection", help="Fit & persist a PCA projection reducing the dimensionality of stored embeddings")
+    fit_projection_parser.add_argument("--samples", required=True, help="Directory of sample markdown / text files to chunk by paragraph")
+    fit_projection_parser.add_argument("--model", default=settings.DOCS_EMBEDDING_MODEL, help="HuggingFace embedding model to fit the projection for")
+    fit_projection_parser.add_argument("--dimensions", type=int, required=True, help="Dimensionality to project embeddings to")
+    fit_projection_parser.add_argument("--max-chunks", type=int, default=5000, help="Maximum number of chunks to fit against")
+    fit_projection_parser.set_defaults(func=fit_embedding_projection)
+
+    projection_parser = subparsers.add_parser("benchmark-projection", help="Benchmark recall of Matryoshka & PCA reduced embeddings against full embeddings")
+    projection_parser.add_argument("--samples", required=True, help="Directory of sample markdown / text files to chunk by paragraph")
+    projection_parser.add_argument("--model", default=settings.DOCS_EMBEDDING_MODEL, help="HuggingFace embedding model to benchmark")
+    projection_parser.add_argument("--dimensions", type=int, required=True, help="Dimensionality to project embeddings to")
+    projection_parser.add_argument("--k", type=int, default=10, help="Number of neighbours retrieved per query")
+    projection_parser.add_argument("--queries", type=int, default=200, help="Number of sample chunks used as queries")
+    projection_parser.add_argument("--max-chunks", type=int, default=5000, help="Maximum number of chunks to embed")
+    projection_parser.set_defaults(func=benchmark_embedding_projection)
+
+    export_parser = subparsers.add_parser("export-collections", help="Export a project's Chroma collections to a tar archive")
+    export_parser.add_argument("--project", required=True, help="Name of the project to export collections for")
+    export_parser.add_argument("--output", required=True, help="Path of the archive to write")
+    export_parser.add_argument("--source-type", default="N/A", choices=["DOCS", "CODE", "N/A"], help="Collection to export (both when N/A)")
+    export_parser.set_defaults(func=export_project_collections)
+
+    import_parser = subparsers.add_parser("import-collections", help="Restore a project's Chroma collections from an exported archive")
+    import_parser.add_argument("--project", required=True, help="Name of the project to restore collections for")
+    import_parser.add_argument("--input", required=True, help="Path of the archive to read")
+    import_parser.add_argument("--source-type", default="N/A", choices=["DOCS", "CODE", "N/A"], help="Collection to restore (both when N/A)")
+    import_parser.set_defaults(func=import_project_collections)
+
+    rebuild_parser = subparsers.add_parser("rebuild-collections", help="Blue/green rebuild a project's Chroma collections")
+    rebuild_parser.add_argument("--project", required=True, help="Name of the project to rebuild collections for")
+    rebuild_parser.add_argument("--source-type", default="N/A", choices=["DOCS", "CODE", "N/A"], help="Collection to rebuild (both when N/A)")
+    rebuild_parser.set_defaults(func=rebuild_project_collections)
+
+    gc_parser = subparsers.add_parser("gc-collections", help="Delete collection versions retired by rebuilds")
+    gc_parser.add_argument("--grace-seconds", type=float, default=settings.COLLECTION_GC_GRACE_SECONDS, help="Seconds retired versions are kept for")
+    gc_parser.set_defaults(func=garbage_collect_project_collections)
+
+    migrate_parser = subparsers.add_parser("migrate-embeddings", help="Re-embed a project's stored chunks with another embedding model")
+    migrate_parser.add_argument("--project-id", required=True, help="Id of the project to re-embed chunks for")
+    migrate_parser.add_argument("--source-type", required=True, choices=["DOCS", "CODE"], help="Collection to re-embed")
+    migrate_parser.add_argument("--provider", default="HuggingFace", help="Embedding provider of the new model")
+    migrate_parser.add_argument("--model", required=True, help="Embedding model to re-embed chunks with")
+    migrate_parser.add_argument("--dimensions", type=int, default=None, help="Dimensionality to reduce embeddings to")
+    migrate_parser.set_defaults(func=migrate_project_embeddings)
+
+    layouts_parser = subparsers.add_parser("benchmark-collections", help="Benchmark per-project collections against a shared partitioned collection")
+    layouts_parser.add_argument("--projects", type=int, default=200, help="Number of projects stored")
+    layouts_parser.add_argument("--chunks", type=int, default=500, help="Number of chunks stored per project")
+    layouts_parser.add_argument("--dimensions", type=int, default=1024, help="Dimensionality of the stored vectors")
+    layouts_parser.add_argument("--queries", type=int, default=500, help="Number of queries, each against a random project")
+    layouts_parser.add_argument("--k", type=int, default=10, help="Number of neighbours retrieved per query")
+    layouts_parser.set_defaults(func=benchmark_collection_layouts)
+
+    server_parser = subparsers.add_parser("embedding-server", help="Run the local embedding server on a Unix socket")
+    server_parser.add_argument("--socket", default=settings.EMBEDDING_SERVER_SOCKET, help="Path of the Unix socket to listen on")
+    server_parser.set_defaults(func=serve_embeddings)
+
+    return parser
+
+
+def main():
+    setup_logging()
+
+    args = create_parser().parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
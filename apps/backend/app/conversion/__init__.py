@@ -0,0 +1,13 @@
+from .manager import ConversionManager
+from .supervisor import ConversionSupervisor
+from .stats import ConversionStats
+from .tuning import PipelineTuning, get_pipeline_tuning, calibrate
+
+__all__ = [
+    "ConversionManager",
+    "ConversionSupervisor",
+    "ConversionStats",
+    "PipelineTuning",
+    "get_pipeline_tuning",
+    "calibrate"
+]
@@ -0,0 +1,328 @@
+from app.core import settings
+from app.models import TableStructureMode
+from .stats import ConversionStats
+from .pipeline import AdaptiveTablePdfPipeline, AdaptiveTablePdfPipelineOptions
+from .tuning import PipelineTuning, get_pipeline_tuning
+
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+import logging
+import threading
+
+import pypdfium2 as pdfium
+
+from docling.document_converter import DocumentConverter, PdfFormatOption
+from docling.datamodel.base_models import InputFormat
+from docling.exceptions import ConversionError
+from docling.datamodel.pipeline_options import OcrAutoOptions
+from docling.datamodel.accelerator_options import AcceleratorDevice, AcceleratorOptions
+from docling.datamodel.document import ConversionResult
+from docling.utils.locks import pypdfium2_lock
+from docling_core.types.doc import DoclingDocument
+
+
+logger = logging.getLogger(__name__)
+
+
+class PageRange(NamedTuple):
+    """
+    Inclusive, 1-indexed range of pages within a document & whether they require OCR
+    """
+    start: int
+    end: int
+    do_ocr: bool
+
+
+class ConversionManager:
+    """
+    Handles converting downloaded Documentation files into Docling documents
+
+    NOTE: Large PDFs, and PDFs mixing scanned & born-digital pages, are split into page ranges that are
+    converted in parallel and stitched back together in page order. OCR only runs on the page ranges
+    that have no extractable text layer.
+    """
+
+    def __init__(
+            self,
+            table_structure_mode: Optional[TableStructureMode] = None,
+            tuning: Optional[PipelineTuning] = None
+    ):
+        self.stats = ConversionStats()
+        self._table_structure_mode = table_structure_mode or TableStructureMode(settings.DOCLING_TABLE_STRUCTURE_MODE)
+        self._tuning = tuning or get_pipeline_tuning()
+
+        self._converter = self._create_converter(do_ocr=False)
+
+        # NOTE: OCR converter is only created once a page without a text layer is found
+        self._ocr_converter: Optional[DocumentConverter] = None
+        self._ocr_converter_lock = threading.Lock()
+
+
+    def convert_all(self, files: List[Path]) -> Iterator[ConversionResult]:
+        """
+        Convert each of the specified files to a Docling document
+
+        Args:
+            files (List[Path]): documentation files to convert
+        """
+
+        paged_files, whole_files = self._partition_files(files)
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self._tuning.shard_workers,
+                thread_name_prefix="docling-shard"
+            ) as executor:
+
+                # kick off page range conversions first, so they overlap with the remaining documents
+                pending: List[Tuple[Path, List[Future]]] = [
+                    (
+                        file,
+                        [executor.submit(self._convert_page_range, file, page_range) for page_range in page_ranges]
+                    )
+                    for file, page_ranges in paged_files
+                ]
+
+                if whole_files:
+                    yield from self._converter.convert_all(whole_files)
+
+                # stitch paged documents back together in page order
+                for file, futures in pending:
+                    yield self._stitch_page_ranges(file, [future.result() for future in futures])
+
+        except ConversionError as e:
+            logger.error(f"Failed to convert all documents ingested", exc_info=True)
+            raise e
+
+        logger.debug(
+            f"Successfully converted {len(files)} Documentation files to Docling files "
+            f"(OCR pages={self.stats.ocr_pages}, OCR skipped pages={self.stats.ocr_skipped_pages})"
+        )
+
+
+    def warm_up(self):
+        """
+        Initialize the PDF pipeline (loading its models) ahead of the first conversion
+        """
+
+        self._converter.initialize_pipeline(InputFormat.PDF)
+
+
+    def _create_converter(self, do_ocr: bool) -> DocumentConverter:
+        """
+        Create converter for creating Docling Documents from our local files
+
+        Args:
+            do_ocr (bool): whether every page converted should have full page OCR applied
+
+        NOTE: OCR engines running on onnxruntime (i.e RapidOCR) take their device & thread count from the accelerator options
+        """
+
+        # convert configured docs file extensions to docling InputFormats
+        allowed_formats = [
+            InputFormat(allowed_format.lower())
+            for allowed_format in settings.DOCS_FILE_EXTENSIONS
+        ]
+
+        # setup pipeline pipeline options
+        try:
+            pipeline_options = AdaptiveTablePdfPipelineOptions(
+                accelerator_options=AcceleratorOptions(
+                    device=AcceleratorDevice(settings.DOCLING_ACCELERATOR_DEVICE),
+                    num_threads=self._tuning.num_threads,
+                ),
+                table_batch_size=self._tuning.table_batch_size,
+                layout_batch_size=self._tuning.layout_batch_size,
+                ocr_batch_size=self._tuning.ocr_batch_size,
+                do_ocr=do_ocr,
+                ocr_options=OcrAutoOptions(force_full_page_ocr=do_ocr),
+                # NOTE: in AUTO mode, the table structure model is loaded lazily by the pipeline itself
+                do_table_structure=self._table_structure_mode == TableStructureMode.ALWAYS,
+                adaptive_table_structure=self._table_structure_mode == TableStructureMode.AUTO,
+            )
+        except ValueError as e:
+            logger.error(f"Failed to created ThreadStandardPdfPipeline", exc_info=True)
+            raise e
+
+        return DocumentConverter(
+            allowed_formats=allowed_formats,
+            format_options={
+                InputFormat.PDF: PdfFormatOption(
+                    pipeline_cls=AdaptiveTablePdfPipeline,
+                    pipeline_options=pipeline_options,
+                )
+            },
+        )
+
+
+    def _get_ocr_converter(self) -> DocumentConverter:
+        """
+        Retrieve converter used for pages without a text layer, creating it if needed
+        """
+
+        with self._ocr_converter_lock:
+            if not self._ocr_converter:
+                self._ocr_converter = self._create_converter(do_ocr=True)
+
+        return self._ocr_converter
+
+
+    def _partition_files(self, files: List[Path]) -> Tuple[List[Tuple[Path, List[PageRange]]], List[Path]]:
+        """
+        Split files into PDFs that should be converted as page ranges (along with those page ranges) and
+        files that should be converted as a single unit
+
+        Args:
+            files (List[Path]): documentation files to convert
+        """
+
+        paged_files = []
+        whole_files = []
+
+        for file in files:
+
+            if file.suffix.lower() != ".pdf":
+                whole_files.append(file)
+                continue
+
+            pages_needing_ocr = self._get_pages_needing_ocr(file)
+            page_ranges = self._get_page_ranges(pages_needing_ocr)
+
+            # pages are only skipped when OCR could have otherwise been applied to them
+            ocr_pages = sum(pages_needing_ocr)
+            if settings.DOCLING_OCR_ENABLED:
+                self.stats.ocr_pages += ocr_pages
+                self.stats.ocr_skipped_pages += len(pages_needing_ocr) - ocr_pages
+
+            # born-digital PDFs small enough to not be sharded are converted as-is
+            if len(page_ranges) == 1 and not page_ranges[0].do_ocr:
+                whole_files.append(file)
+                continue
+
+            logger.debug(
+                f"Converting Document={file.name} as {len(page_ranges)} page ranges "
+                f"({ocr_pages} of {len(pages_needing_ocr)} pages require OCR)"
+            )
+            paged_files.append((file, page_ranges))
+
+        return paged_files, whole_files
+
+
+    def _get_pages_needing_ocr(self, file: Path) -> List[bool]:
+        """
+        Determine which pages of a PDF have no extractable text layer & therefore require OCR
+
+        Args:
+            file (Path): PDF file to inspect
+        """
+
+        pages_needing_ocr = []
+
+        try:
+            # NOTE: pdfium is not thread safe, so share Docling's lock with any in-flight conversions
+            with pypdfium2_lock:
+                pdf = pdfium.PdfDocument(file)
+                page_count = len(pdf)
+
+            # NOTE: no page requires OCR when disabled, so text layers aren't extracted (which would hold Docling's lock)
+            if not settings.DOCLING_OCR_ENABLED:
+                with pypdfium2_lock:
+                    pdf.close()
+                return [False] * page_count
+
+            try:
+                for page_idx in range(page_count):
+                    with pypdfium2_lock:
+                        page = pdf[page_idx]
+                        text_page = page.get_textpage()
+                        text = text_page.get_text_range()
+                        text_page.close()
+                        page.close()
+
+                    pages_needing_ocr.append(len(text.strip()) < settings.DOCLING_OCR_MIN_PAGE_CHARS)
+            finally:
+                with pypdfium2_lock:
+                    pdf.close()
+
+        except Exception as e:
+            # let Docling surface the failure when converting the document as a whole
+            logger.warning(f"Failed to inspect text layer of Document={file.name}: {str(e)}")
+            return []
+
+        return pages_needing_ocr
+
+
+    def _get_page_ranges(self, pages_needing_ocr: List[bool]) -> List[PageRange]:
+        """
+        Group contiguous pages with the same OCR requirement into page ranges, splitting ranges
+        of documents large enough to be sharded
+
+        Args:
+            pages_needing_ocr (List[bool]): whether each page of the document requires OCR
+        """
+
+        page_count = len(pages_needing_ocr)
+        if not page_count:
+            return [PageRange(1, 1, False)] # unknown page count, convert document as a whole
+
+        shard_size = page_count
+        if page_count > settings.DOCLING_SHARD_MIN_PAGES:
+            shard_size = settings.DOCLING_SHARD_PAGE_SIZE
+
+        page_ranges = []
+        start = 1
+        for page_no in range(1, page_count + 1):
+            do_ocr = pages_needing_ocr[start - 1]
+
+            # close current range when OCR requirement changes, the shard is full, or the document ends
+            is_last_page = page_no == page_count
+            if (
+                is_last_page
+                or pages_needing_ocr[page_no] != do_ocr
+                or page_no - start + 1 == shard_size
+            ):
+                page_ranges.append(PageRange(start, page_no, do_ocr))
+                start = page_no + 1
+
+        return page_ranges
+
+
+    def _convert_page_range(self, file: Path, page_range: PageRange) -> ConversionResult:
+        """
+        Convert a single page range of a document
+
+        Args:
+            file (Path): document to convert
+            page_range (PageRange): inclusive page range to convert
+        """
+
+        converter = self._get_ocr_converter() if page_range.do_ocr else self._converter
+
+        logger.debug(f"Converting pages {page_range.start}-{page_range.end} of Document={file.name} (OCR={page_range.do_ocr})")
+        return converter.convert(file, page_range=(page_range.start, page_range.end))
+
+
+    def _stitch_page_ranges(self, file: Path, range_results: List[ConversionResult]) -> ConversionResult:
+        """
+        Stitch the converted page ranges of a document back together in page order
+
+        Args:
+            file (Path): document the page ranges belong to
+            range_results (List[ConversionResult]): conversion results ordered by page range
+        """
+
+        if len(range_results) == 1:
+            return range_results[0]
+
+        documents = [res.document for res in range_results]
+
+        # NOTE: page numbers & provenance are preserved since each range only contains its own pages
+        stitched = DoclingDocument.concatenate(docs=documents)
+
+        # concatenation joins the range names & drops the origin, restore both for chunk metadata
+        stitched.name = documents[0].name
+        stitched.origin = documents[0].origin
+
+        logger.debug(f"Stitched {len(range_results)} page ranges of Document={file.name} back together")
+        return range_results[0].model_copy(update={"document": stitched})
@@ -0,0 +1,99 @@
+from collections.abc import Iterable
+from typing import List, Optional
+import logging
+import threading
+
+from docling.datamodel.base_models import Page
+from docling.datamodel.document import ConversionResult
+from docling.datamodel.pipeline_options import ThreadedPdfPipelineOptions
+from docling.models.table_structure_model import TableStructureModel
+from docling.pipeline.threaded_standard_pdf_pipeline import ThreadedStandardPdfPipeline
+from docling_core.types.doc import DocItemLabel
+
+
+logger = logging.getLogger(__name__)
+
+# layout labels the table structure model is ran against
+TABLE_LABELS = {DocItemLabel.TABLE, DocItemLabel.DOCUMENT_INDEX}
+
+
+class AdaptiveTablePdfPipelineOptions(ThreadedPdfPipelineOptions):
+    """
+    Threaded PDF pipeline options allowing the table structure model to only be ran on pages
+    where layout analysis found table regions
+    """
+
+    adaptive_table_structure: bool = False
+
+
+class LazyTableStructureModel:
+    """
+    Table structure model that is only loaded once a page with a table region is found, and is
+    skipped entirely for batches of pages without any table regions
+    """
+
+    def __init__(self, pipeline_options: AdaptiveTablePdfPipelineOptions, artifacts_path):
+        self._pipeline_options = pipeline_options
+        self._artifacts_path = artifacts_path
+        self._model: Optional[TableStructureModel] = None
+        self._lock = threading.Lock()
+
+
+    def __call__(self, conv_res: ConversionResult, page_batch: Iterable[Page]) -> Iterable[Page]:
+        pages: List[Page] = list(page_batch)
+
+        # skip table structure model when layout analysis found no tables in current batch
+        if not any(self._has_table_region(page) for page in pages):
+            yield from pages
+            return
+
+        # NOTE: the model only processes the table regions of each page, so remaining pages in batch pass through
+        yield from self._get_model()(conv_res, pages)
+
+
+    def _get_model(self) -> TableStructureModel:
+        """
+        Retrieve the table structure model, loading it if needed
+        """
+
+        with self._lock:
+            if not self._model:
+                logger.debug("Table region detected; loading table structure model")
+                self._model = TableStructureModel(
+                    enabled=True,
+                    artifacts_path=self._artifacts_path,
+                    options=self._pipeline_options.table_structure_options,
+                    accelerator_options=self._pipeline_options.accelerator_options,
+                )
+
+        return self._model
+
+
+    def _has_table_region(self, page: Page) -> bool:
+        """
+        Determine if layout analysis found a table region on the specified page
+
+        Args:
+            page (Page): page to check layout predictions for
+        """
+
+        layout = page.predictions.layout
+        if layout is None:
+            return False
+
+        return any(cluster.label in TABLE_LABELS for cluster in layout.clusters)
+
+
+class AdaptiveTablePdfPipeline(ThreadedStandardPdfPipeline):
+    """
+    Threaded PDF pipeline that defers the table structure model to pages with table regions
+    """
+
+    def _init_models(self) -> None:
+        super()._init_models()
+
+        if self.pipeline_options.adaptive_table_structure:
+            self.table_model = LazyTableStructureModel(
+                pipeline_options=self.pipeline_options,
+                artifacts_path=self.artifacts_path
+            )
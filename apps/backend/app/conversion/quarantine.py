@@ -0,0 +1,66 @@
+from app.core import get_sync_session_maker
+from app.models import QuarantinedFile, QuarantineReason
+
+from sqlalchemy import select
+
+from hashlib import sha256
+from pathlib import Path
+from typing import List, Set
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def hash_file(path: Path) -> str:
+    """
+    Hash a file based on strictly its content, matching the hash persisted for ingested Files
+
+    Args:
+        path (Path): file to hash
+    """
+
+    sha256_hash = sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256_hash.update(chunk)
+
+    return sha256_hash.hexdigest()
+
+
+def get_quarantined_hashes(hashes: List[str]) -> Set[str]:
+    """
+    Determine which of the specified file hashes are currently quarantined
+
+    Args:
+        hashes (List[str]): hashed content of the files about to be converted
+    """
+
+    if not hashes:
+        return set()
+
+    session_maker = get_sync_session_maker()
+    with session_maker() as session:
+        stmt = select(QuarantinedFile.hash).where(QuarantinedFile.hash.in_(hashes))
+        return set(session.execute(stmt).scalars().all())
+
+
+def quarantine_file(file_hash: str, file_name: str, reason: QuarantineReason, detail: str):
+    """
+    Record a file that failed to convert so later IngestionJobs skip it until its content changes
+
+    Args:
+        file_hash (str): hashed content of the file
+        file_name (str): name of the file
+        reason (QuarantineReason): why conversion was aborted
+        detail (str): error message captured when conversion was aborted
+    """
+
+    session_maker = get_sync_session_maker()
+    with session_maker() as session:
+        session.merge(
+            QuarantinedFile(hash=file_hash, name=file_name, reason=reason, detail=detail)
+        )
+        session.commit()
+
+    logger.warning(f"Quarantined Document={file_name} with hash={file_hash} due to reason={reason.value}: {detail}")
@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ConversionStats:
+    """
+    Page level statistics gathered while converting the documents of an IngestionJob
+    """
+
+    ocr_pages: int = 0
+    ocr_skipped_pages: int = 0
+    quarantined_files: int = 0
+
+
+    def merge(self, other: "ConversionStats"):
+        """
+        Add the statistics of another conversion to these statistics
+
+        Args:
+            other (ConversionStats): statistics to add
+        """
+
+        self.ocr_pages += other.ocr_pages
+        self.ocr_skipped_pages += other.ocr_skipped_pages
+        self.quarantined_files += other.quarantined_files
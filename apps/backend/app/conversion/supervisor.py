@@ -0,0 +1,203 @@
+from app.core import settings, setup_logging
+from app.models import TableStructureMode, QuarantineReason
+from app.workers import ProcessWorker, WorkerError, WorkerTimeoutError, WorkerMemoryError, WorkerCrashedError, WorkerTaskError
+from .manager import ConversionManager
+from .stats import ConversionStats
+from .tuning import PipelineTuning, get_pipeline_tuning
+from .quarantine import hash_file, get_quarantined_hashes, quarantine_file
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import replace
+from pathlib import Path
+from queue import Queue
+from typing import Deque, Iterator, List, Optional, Tuple
+import itertools
+import logging
+
+from docling_core.types.doc import DoclingDocument
+
+
+logger = logging.getLogger(__name__)
+
+# failures attributable to the document itself, which are quarantined rather than failing the IngestionJob
+QUARANTINE_ERRORS = (WorkerTimeoutError, WorkerMemoryError, WorkerCrashedError)
+
+
+def _init_conversion_worker(table_structure_mode: TableStructureMode, tuning: PipelineTuning) -> ConversionManager:
+    """
+    Initialize conversion worker process by loading the Docling pipeline models
+
+    Args:
+        table_structure_mode (TableStructureMode): table structure mode to convert documents with
+        tuning (PipelineTuning): batch sizes & thread counts to convert documents with
+    """
+
+    setup_logging()
+
+    manager = ConversionManager(table_structure_mode=table_structure_mode, tuning=tuning)
+    manager.warm_up()
+
+    return manager
+
+
+def _convert_document(manager: ConversionManager, file: Path) -> Tuple[DoclingDocument, ConversionStats]:
+    """
+    Convert a single document within the conversion worker process
+
+    Args:
+        manager (ConversionManager): conversion manager owned by the worker process
+        file (Path): document to convert
+    """
+
+    manager.stats = ConversionStats()
+
+    res = list(manager.convert_all([file]))[0]
+    logger.debug(f"Conversion result confidence for Document={res.document.name} = {res.confidence}")
+
+    return res.document, manager.stats
+
+
+class ConversionSupervisor:
+    """
+    Converts documentation files across a pool of dedicated worker processes, enforcing a time limit &
+    RSS ceiling per document
+
+    NOTE: Documents exceeding either limit (or crashing their worker) are quarantined by their hash, and the
+    rest of the batch carries on with a fresh worker process. Any other exception raised while converting a document
+    (WorkerTaskError) fails the whole IngestionJob rather than quarantining the document, as the error is not necessarily
+    the document's fault (i.e transient or code level errors) & the job can simply be re-ran once resolved.
+    Worker processes are also recycled after a number of documents or above an RSS threshold to keep memory
+    steady across long IngestionJobs
+    """
+
+    def __init__(self, table_structure_mode: Optional[TableStructureMode] = None):
+        self.stats = ConversionStats()
+
+        # NOTE: documents are converted concurrently by one worker per shard worker, each worker converting
+        # its document with the threads & batches tuned for a single shard worker
+        tuning = get_pipeline_tuning()
+        self._pool_size = tuning.shard_workers
+        worker_tuning = replace(tuning, shard_workers=1)
+
+        self._workers = [
+            ProcessWorker(
+                name=f"docling-conversion-{idx}",
+                initializer=_init_conversion_worker,
+                init_args=(table_structure_mode, worker_tuning),
+                handler=_convert_document,
+                task_timeout=settings.CONVERSION_DOCUMENT_TIMEOUT_SECONDS,
+                max_rss=settings.CONVERSION_MAX_RSS_MB * 1024**2,
+                max_tasks=settings.CONVERSION_WORKER_MAX_TASKS,
+                recycle_rss=settings.CONVERSION_WORKER_RECYCLE_RSS_MB * 1024**2
+            )
+            for idx in range(self._pool_size)
+        ]
+        self._idle_workers: Queue[ProcessWorker] = Queue()
+
+
+    def convert_all(self, files: List[Path]) -> Iterator[DoclingDocument]:
+        """
+        Convert each of the specified files to a Docling document, skipping quarantined files
+
+        Args:
+            files (List[Path]): documentation files to convert
+        """
+
+        file_hashes = {file: hash_file(file) for file in files}
+        quarantined_hashes = get_quarantined_hashes(list(file_hashes.values()))
+
+        pending_files = []
+        for file, file_hash in file_hashes.items():
+            if file_hash in quarantined_hashes:
+                logger.warning(f"Skipping quarantined Document={file.name} with hash={file_hash}")
+                self.stats.quarantined_files += 1
+                continue
+            pending_files.append((file, file_hash))
+
+        # only spawn as many workers as there are documents to convert
+        workers = self._workers[:max(1, min(self._pool_size, len(pending_files)))]
+        for worker in workers:
+            self._idle_workers.put(worker)
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(workers), thread_name_prefix="docling-supervisor") as executor:
+
+                # NOTE: limit documents in flight, so converted documents don't pile up ahead of chunking
+                in_flight: Deque[Tuple[Path, str, Future]] = deque()
+                remaining = iter(pending_files)
+
+                for file, file_hash in itertools.islice(remaining, len(workers) * 2):
+                    in_flight.append((file, file_hash, executor.submit(self._convert_document, file)))
+
+                while in_flight:
+                    file, file_hash, future = in_flight.popleft()
+
+                    try:
+                        document, stats = future.result()
+                    except QUARANTINE_ERRORS as e:
+                        logger.error(f"Failed to convert Document={file.name}: {str(e)}")
+                        quarantine_file(file_hash, file.name, self._get_quarantine_reason(e), str(e))
+                        self.stats.quarantined_files += 1
+                        document = None
+                    except WorkerTaskError as e:
+                        for _, _, other in in_flight:
+                            other.cancel()
+                        raise Exception(f"Failed to convert Document={file.name}: {str(e)}") from e
+
+                    for next_file, next_hash in itertools.islice(remaining, 1):
+                        in_flight.append((next_file, next_hash, executor.submit(self._convert_document, next_file)))
+
+                    if document is not None:
+                        self.stats.merge(stats)
+                        yield document
+        finally:
+            for worker in workers:
+                worker.stop()
+
+            while not self._idle_workers.empty():
+                self._idle_workers.get_nowait()
+
+        logger.info(
+            f"Successfully converted ingested Documentation files to Docling files "
+            f"(OCR pages={self.stats.ocr_pages}, OCR skipped pages={self.stats.ocr_skipped_pages}, "
+            f"quarantined files={self.stats.quarantined_files})"
+        )
+
+
+    def _convert_document(self, file: Path) -> Tuple[DoclingDocument, ConversionStats]:
+        """
+        Convert a single document using the next idle worker process
+
+        Args:
+            file (Path): document to convert
+        """
+
+        worker = self._idle_workers.get()
+        try:
+            # NOTE: worker failing to initialize is not the fault of the current document, so fail the job
+            if not worker.is_alive:
+                try:
+                    worker.start()
+                except WorkerError as e:
+                    raise Exception(f"Failed to start conversion worker={worker.name}: {str(e)}") from e
+
+            return worker.run(file)
+        finally:
+            self._idle_workers.put(worker)
+
+
+    def _get_quarantine_reason(self, error: WorkerError) -> QuarantineReason:
+        """
+        Map worker failure to the reason a document is quarantined
+
+        Args:
+            error (WorkerError): failure raised while converting the document
+        """
+
+        if isinstance(error, WorkerTimeoutError):
+            return QuarantineReason.TIMEOUT
+        if isinstance(error, WorkerMemoryError):
+            return QuarantineReason.MEMORY
+
+        return QuarantineReason.CRASH
@@ -0,0 +1,230 @@
+from app.core import settings, get_sync_session_maker
+from app.models import ConversionTuning
+
+from dataclasses import dataclass, asdict, replace
+from pathlib import Path
+from typing import Optional, List
+import logging
+import os
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# rough per-unit memory costs used when sizing batches (CPU, images_scale=1.0)
+_MODEL_OVERHEAD_BYTES = 3 * 1024**3 # layout, table & OCR weights plus interpreter
+_LAYOUT_PAGE_BYTES = 40 * 1024**2
+_TABLE_PAGE_BYTES = 200 * 1024**2
+_OCR_PAGE_BYTES = 120 * 1024**2
+
+
+@dataclass(frozen=True)
+class PipelineTuning:
+    """
+    Batch sizes & thread counts used by the Docling PDF pipeline
+    """
+
+    layout_batch_size: int = 64
+    table_batch_size: int = 4
+    ocr_batch_size: int = 4
+    num_threads: int = 4
+    shard_workers: int = 4
+
+
+def get_available_cpus() -> int:
+    """
+    Determine the number of CPUs available to this process, respecting cgroup quotas & CPU affinity
+    """
+
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+    # cgroup v2 (i.e "200000 100000" or "max 100000")
+    quota = _read_cgroup_file("/sys/fs/cgroup/cpu.max")
+    if quota:
+        limit, period = quota.split()[:2]
+        if limit != "max":
+            cpus = min(cpus, max(1, int(int(limit) / int(period))))
+        return cpus
+
+    # cgroup v1
+    limit = _read_cgroup_file("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+    period = _read_cgroup_file("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if limit and period and int(limit) > 0:
+        cpus = min(cpus, max(1, int(int(limit) / int(period))))
+
+    return cpus
+
+
+def get_available_memory() -> int:
+    """
+    Determine the number of bytes of memory available to this process, respecting cgroup memory limits
+    """
+
+    physical = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+    for path in ["/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"]:
+        limit = _read_cgroup_file(path)
+
+        # NOTE: unlimited cgroups report either "max" or a value larger than physical memory
+        if limit and limit != "max":
+            return min(physical, int(limit))
+
+    return physical
+
+
+def get_host_signature() -> str:
+    """
+    Key identifying the resources of the current host, used to persist calibrated tuning
+    """
+
+    memory_gb = round(get_available_memory() / 1024**3)
+    return f"cpus={get_available_cpus()}:memory={memory_gb}GB:device={settings.DOCLING_ACCELERATOR_DEVICE}"
+
+
+def recommend_tuning(cpus: int, memory: int) -> PipelineTuning:
+    """
+    Pick batch sizes & thread counts for the specified resources
+
+    Args:
+        cpus (int): number of available CPUs
+        memory (int): number of bytes of available memory
+    """
+
+    # favour a few shard workers with several threads each over many single threaded workers
+    shard_workers = max(1, min(8, cpus // 4))
+    num_threads = max(1, cpus // shard_workers)
+
+    # split memory left over after loading models across each shard worker's batches
+    per_worker = max(0, memory - _MODEL_OVERHEAD_BYTES) // shard_workers
+
+    return PipelineTuning(
+        layout_batch_size=_clamp(per_worker // 2 // _LAYOUT_PAGE_BYTES, 1, 64),
+        table_batch_size=_clamp(per_worker // 4 // _TABLE_PAGE_BYTES, 1, 16),
+        ocr_batch_size=_clamp(per_worker // 4 // _OCR_PAGE_BYTES, 1, 16),
+        num_threads=num_threads,
+        shard_workers=shard_workers,
+    )
+
+
+def get_pipeline_tuning() -> PipelineTuning:
+    """
+    Retrieve the tuning to use for the current host, preferring settings persisted by calibration
+    """
+
+    if not settings.DOCLING_AUTO_TUNE:
+        return PipelineTuning(shard_workers=settings.DOCLING_SHARD_WORKERS)
+
+    host_signature = get_host_signature()
+
+    try:
+        session_maker = get_sync_session_maker()
+        with session_maker() as session:
+            calibrated = session.get(ConversionTuning, host_signature)
+            if calibrated:
+                logger.debug(f"Using calibrated Docling pipeline tuning for host={host_signature}")
+                return PipelineTuning(
+                    layout_batch_size=calibrated.layout_batch_size,
+                    table_batch_size=calibrated.table_batch_size,
+                    ocr_batch_size=calibrated.ocr_batch_size,
+                    num_threads=calibrated.num_threads,
+                    shard_workers=calibrated.shard_workers,
+                )
+    except Exception as e:
+        logger.warning(f"Failed to retrieve calibrated Docling pipeline tuning: {str(e)}")
+
+    tuning = recommend_tuning(get_available_cpus(), get_available_memory())
+    logger.debug(f"Using recommended Docling pipeline tuning for host={host_signature}: {tuning}")
+    return tuning
+
+
+def get_candidate_tunings(recommended: PipelineTuning) -> List[PipelineTuning]:
+    """
+    Generate candidate tunings around the recommended tuning to benchmark during calibration
+
+    Args:
+        recommended (PipelineTuning): tuning recommended based on available resources
+    """
+
+    cpus = get_available_cpus()
+    candidates = [recommended]
+
+    for shard_workers in {max(1, recommended.shard_workers // 2), recommended.shard_workers, min(cpus, recommended.shard_workers * 2)}:
+        for scale in [0.5, 1, 2]:
+            candidates.append(
+                replace(
+                    recommended,
+                    shard_workers=shard_workers,
+                    num_threads=max(1, cpus // shard_workers),
+                    layout_batch_size=_clamp(int(recommended.layout_batch_size * scale), 1, 128),
+                    table_batch_size=_clamp(int(recommended.table_batch_size * scale), 1, 32),
+                )
+            )
+
+    # remove duplicates while preserving order
+    return list(dict.fromkeys(candidates))
+
+
+def calibrate(sample_files: List[Path]) -> PipelineTuning:
+    """
+    Benchmark candidate tunings against a sample set of documents & persist the fastest for the current host
+
+    Args:
+        sample_files (List[Path]): sample documents to convert
+    """
+
+    # NOTE: imported here to avoid circular import, as ConversionManager depends on tuning
+    from .manager import ConversionManager
+
+    recommended = recommend_tuning(get_available_cpus(), get_available_memory())
+    host_signature = get_host_signature()
+
+    best: Optional[PipelineTuning] = None
+    best_pages_per_second = 0.0
+
+    for candidate in get_candidate_tunings(recommended):
+
+        # load models prior to timing conversions
+        manager = ConversionManager(tuning=candidate)
+        manager.warm_up()
+
+        start = time.perf_counter()
+        pages = sum(len(res.document.pages) or 1 for res in manager.convert_all(sample_files))
+        pages_per_second = pages / (time.perf_counter() - start)
+
+        logger.info(f"Calibration candidate {candidate} converted {pages} pages at {pages_per_second:.2f} pages/sec")
+
+        if pages_per_second > best_pages_per_second:
+            best, best_pages_per_second = candidate, pages_per_second
+
+    # persist fastest tuning for later IngestionJobs
+    session_maker = get_sync_session_maker()
+    with session_maker() as session:
+        session.merge(
+            ConversionTuning(
+                host_signature=host_signature,
+                pages_per_second=best_pages_per_second,
+                **asdict(best)
+            )
+        )
+        session.commit()
+
+    logger.info(f"Persisted calibrated Docling pipeline tuning for host={host_signature}: {best}")
+    return best
+
+
+def _read_cgroup_file(path: str) -> Optional[str]:
+    """
+    Read a cgroup control file, returning None when it does not exist
+
+    Args:
+        path (str): path of the cgroup file
+    """
+
+    try:
+        return Path(path).read_text().strip()
+    except OSError:
+        return None
+
+
+def _clamp(value: int, minimum: int, maximum: int) -> int:
+    return int(max(minimum, min(maximum, value)))
@@ -8,7 +8,23 @@ from .relational_db import (
     get_sync_session_maker,
     get_async_session_maker
 )
-from .vector_db import ChromaClientManager
+from .vector_db import (
+    ChromaClientManager,
+    VectorStoreBackend,
+    HttpVectorStoreBackend,
+    EmbeddedVectorStoreBackend,
+    get_vector_store_backend
+)
+from .collections import (
+    CollectionTarget,
+    is_shared_collection_mode,
+    get_shared_collection_name,
+    resolve_hnsw_params,
+    get_hnsw_configuration,
+    get_normalized_project_name,
+    get_collection_names,
+    get_collection_targets
+)
 
 __all__ = [
     "settings",
@@ -18,7 +34,19 @@ __all__ = [
     "sync_engine",
     "async_engine",
     "ChromaClientManager",
+    "VectorStoreBackend",
+    "HttpVectorStoreBackend",
+    "EmbeddedVectorStoreBackend",
+    "get_vector_store_backend",
     "setup_logging",
     "get_sync_session_maker",
-    "get_async_session_maker"
+    "get_async_session_maker",
+    "CollectionTarget",
+    "is_shared_collection_mode",
+    "get_shared_collection_name",
+    "resolve_hnsw_params",
+    "get_hnsw_configuration",
+    "get_normalized_project_name",
+    "get_collection_names",
+    "get_collection_targets"
 ]
@@ -0,0 +1,174 @@
+import chromadb
+import numpy as np
+
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict
+import tempfile
+import logging
+import time
+import os
+
+from .config import settings
+from app.workers import get_process_rss
+
+
+logger = logging.getLogger(__name__)
+
+LAYOUTS = ("per_project", "shared")
+
+
+def benchmark_collection_layouts(
+        projects: int,
+        chunks_per_project: int,
+        dimensions: int,
+        queries: int = 500,
+        k: int = 10
+) -> Dict[str, Dict[str, float]]:
+    """
+    Compare memory use, query latency & recall of per-project collections against a single shared collection
+    partitioned by project_id metadata, using random unit vectors
+
+    NOTE: Each layout is built in one process & queried from a fresh process against an embedded Chroma
+    persisted to a temporary directory, so the query process' memory reflects the indexes it had to load (the
+    Chroma server's memory can't be measured over HTTP)
+
+    Args:
+        projects (int): number of projects stored
+        chunks_per_project (int): number of chunks stored per project
+        dimensions (int): dimensionality of the vectors
+        queries (int): number of queries, each against a random project
+        k (int): number of neighbours retrieved per query
+    """
+
+    results = {}
+    context = get_context("spawn")
+
+    Path(settings.TMP).mkdir(parents=True, exist_ok=True)
+    for layout in LAYOUTS:
+        with tempfile.TemporaryDirectory(dir=settings.TMP) as path:
+            with context.Pool(1) as pool:
+                build_seconds = pool.apply(_build_layout, (layout, path, projects, chunks_per_project, dimensions))
+
+            with context.Pool(1) as pool:
+                results[layout] = pool.apply(_query_layout, (layout, path, projects, chunks_per_project, dimensions, queries, k))
+
+            results[layout]["build_seconds"] = build_seconds
+            results[layout]["disk_mb"] = sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file()) / 1024**2
+
+        logger.info(f"Benchmarked {layout} collection layout: {results[layout]}")
+
+    return results
+
+
+def _get_project_vectors(project: int, chunks_per_project: int, dimensions: int) -> np.ndarray:
+    """
+    Generate the random unit vectors of a project (seeded by the project, so every process generates the same vectors)
+
+    Args:
+        project (int): index of the project
+        chunks_per_project (int): number of vectors
+        dimensions (int): dimensionality of the vectors
+    """
+
+    vectors = np.random.default_rng(project).standard_normal((chunks_per_project, dimensions), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _build_layout(layout: str, path: str, projects: int, chunks_per_project: int, dimensions: int) -> float:
+    """
+    Store each project's vectors using the collection layout, returning the seconds taken
+
+    Args:
+        layout (str): per_project or shared
+        path (str): directory Chroma persists to
+        projects (int): number of projects
+        chunks_per_project (int): number of vectors per project
+        dimensions (int): dimensionality of the vectors
+    """
+
+    client = chromadb.PersistentClient(path=path)
+    max_batch_size = client.get_max_batch_size()
+
+    start = time.perf_counter()
+    shared = client.create_collection("BENCH_SHARED") if layout == "shared" else None
+
+    for project in range(projects):
+        collection = shared if shared is not None else client.create_collection(f"BENCH_P{project}")
+        vectors = _get_project_vectors(project, chunks_per_project, dimensions)
+
+        for offset in range(0, chunks_per_project, max_batch_size):
+            batch = vectors[offset : offset + max_batch_size]
+            collection.add(
+                ids=[f"{project}_{offset + i}" for i in range(len(batch))],
+                embeddings=batch,
+                metadatas=[{"project_id": str(project)} for _ in range(len(batch))]
+            )
+
+    return time.perf_counter() - start
+
+
+def _query_layout(
+        layout: str,
+        path: str,
+        projects: int,
+        chunks_per_project: int,
+        dimensions: int,
+        queries: int,
+        k: int
+) -> Dict[str, float]:
+    """
+    Query random projects using the collection layout, measuring latency, recall@k against exact search
+    & memory of the process
+
+    Args:
+        layout (str): per_project or shared
+        path (str): directory Chroma persisted to
+        projects (int): number of projects
+        chunks_per_project (int): number of vectors per project
+        dimensions (int): dimensionality of the vectors
+        queries (int): number of queries
+        k (int): number of neighbours retrieved per query
+    """
+
+    rss_start = get_process_rss(os.getpid())
+    client = chromadb.PersistentClient(path=path)
+    rng = np.random.default_rng(0)
+
+    # NOTE: handles are cached as ChromaClientManager does, so only the queries themselves are timed
+    collections = {}
+
+    latencies = []
+    recalls = []
+    for _ in range(queries):
+        project = int(rng.integers(projects))
+        query = rng.standard_normal(dimensions, dtype=np.float32)
+        query /= np.linalg.norm(query)
+
+        name = "BENCH_SHARED" if layout == "shared" else f"BENCH_P{project}"
+        if name not in collections:
+            collections[name] = client.get_collection(name)
+
+        start = time.perf_counter()
+        if layout == "shared":
+            res = collections[name].query(
+                query_embeddings=[query], n_results=k, where={"project_id": str(project)}, include=[]
+            )
+        else:
+            res = collections[name].query(query_embeddings=[query], n_results=k, include=[])
+        latencies.append(time.perf_counter() - start)
+
+        # NOTE: vectors are unit length, so the smallest L2 distances are the largest dot products
+        exact = np.argsort(-(_get_project_vectors(project, chunks_per_project, dimensions) @ query))[:k]
+        expected = {f"{project}_{i}" for i in exact}
+        recalls.append(len(expected.intersection(res["ids"][0])) / len(expected))
+
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "latency_p50_ms": float(np.percentile(latencies_ms, 50)),
+        "latency_p95_ms": float(np.percentile(latencies_ms, 95)),
+        "latency_mean_ms": float(latencies_ms.mean()),
+        "first_query_ms": float(latencies_ms[0]),
+        f"recall@{k}": float(np.mean(recalls)),
+        "query_rss_mb": (get_process_rss(os.getpid()) - rss_start) / 1024**2
+    }
@@ -0,0 +1,244 @@
+from .config import settings
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, TYPE_CHECKING
+import logging
+
+if TYPE_CHECKING:
+    from app.models import Project, ModelConfigs
+
+
+logger = logging.getLogger(__name__)
+
+
+# metadata keys partitioning shared collections
+PARTITION_KEYS = ("project_id", "source_type")
+
+
+@dataclass(frozen=True, slots=True)
+class CollectionTarget:
+    """
+    Chroma collection a Project's chunks of a source type are stored within, plus the partition of the
+    collection they occupy when collections are shared between Projects
+
+    NOTE: Chunk ids are prefixed by the partition within shared collections, as chunk ids are only unique per Project
+    """
+
+    name: str
+    source_type: str
+    project_id: Optional[str] = None
+
+
+    @property
+    def shared(self) -> bool:
+        return self.project_id is not None
+
+
+    @property
+    def partition(self) -> Dict[str, str]:
+        """
+        Metadata tagging each chunk stored within the partition
+        """
+
+        if not self.shared:
+            return {}
+
+        return {"project_id": self.project_id, "source_type": self.source_type}
+
+
+    @property
+    def id_prefix(self) -> str:
+        return f"{self.project_id}_{self.source_type}_" if self.shared else ""
+
+
+    def scope(self, where: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Restrict Chroma metadata filter to the partition (if any)
+
+        Args:
+            where (Optional[Dict[str, Any]]): Chroma metadata filter
+        """
+
+        if not self.shared:
+            return where or None
+
+        partition = {"$and": [{key: value} for key, value in self.partition.items()]}
+        return {"$and": [partition, where]} if where else partition
+
+
+# HNSW index parameters of each index preset (Chroma defaults to M=16, construction ef=100 & search ef=100)
+HNSW_PRESETS: Dict[str, Dict[str, int]] = {
+    "small": {"m": 16, "construction_ef": 100, "search_ef": 40},
+    "large": {"m": 32, "construction_ef": 256, "search_ef": 200},
+}
+
+# HNSW configuration which can only be set when a collection is created, and so is carried over to rebuilt versions
+HNSW_CREATE_KEYS = (
+    "space", "ef_construction", "max_neighbors", "ef_search", "num_threads", "batch_size", "sync_threshold", "resize_factor"
+)
+
+
+def resolve_hnsw_params(
+        preset: Optional[str] = None,
+        space: Optional[str] = None,
+        m: Optional[int] = None,
+        construction_ef: Optional[int] = None,
+        search_ef: Optional[int] = None
+) -> Dict[str, Optional[Any]]:
+    """
+    Resolve HNSW index parameters from a preset, with explicitly specified parameters taking precedence
+
+    Args:
+        preset (Optional[str]): index preset (small or large)
+        space (Optional[str]): distance metric (l2, cosine or ip)
+        m (Optional[int]): neighbours per node
+        construction_ef (Optional[int]): candidate list size while building the index
+        search_ef (Optional[int]): candidate list size while searching the index
+    """
+
+    params = dict(HNSW_PRESETS[preset]) if preset else {}
+    overrides = {"space": space, "m": m, "construction_ef": construction_ef, "search_ef": search_ef}
+
+    return {key: value if value is not None else params.get(key) for key, value in overrides.items()}
+
+
+def get_hnsw_configuration(
+        space: Optional[str] = None,
+        m: Optional[int] = None,
+        construction_ef: Optional[int] = None,
+        search_ef: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Build Chroma collection configuration for HNSW index parameters, leaving unspecified parameters to Chroma
+
+    Args:
+        space (Optional[str]): distance metric (l2, cosine or ip)
+        m (Optional[int]): neighbours per node
+        construction_ef (Optional[int]): candidate list size while building the index
+        search_ef (Optional[int]): candidate list size while searching the index
+    """
+
+    hnsw = {
+        key: value for key, value in
+        (("space", space), ("max_neighbors", m), ("ef_construction", construction_ef), ("ef_search", search_ef))
+        if value is not None
+    }
+
+    return {"hnsw": hnsw} if hnsw else None
+
+
+def is_shared_collection_mode() -> bool:
+    """
+    Check whether Projects share a collection per embedding model rather than owning their own collections
+    """
+
+    match settings.CHROMA_COLLECTION_MODE:
+        case "per_project": # CODE & DOCS collections per Project
+            return False
+        case "shared": # collection per embedding model, partitioned by project_id & source_type metadata
+            return True
+        case _:
+            raise Exception(f"Unknown Chroma collection mode specified: {settings.CHROMA_COLLECTION_MODE}")
+
+
+def get_shared_collection_name(model_name: str, dimensions: Optional[int] = None, dimension_reduction: Optional[str] = None) -> str:
+    """
+    Helper function to get the name of the collection shared by Projects embedding chunks with a model
+
+    NOTE: Embeddings reduced to a different dimensionality (or by a different method) are not comparable, so
+    they are stored within separate collections
+
+    Args:
+        model_name (str): embedding model name
+        dimensions (Optional[int]): dimensionality embeddings are reduced to
+        dimension_reduction (Optional[str]): how embeddings are reduced (i.e matryoshka or pca)
+    """
+
+    name = "SHARED_" + "".join(c.upper() for c in model_name if c.isalnum())
+    if dimensions:
+        name += f"_{(dimension_reduction or 'matryoshka').upper()}{dimensions}"
+
+    return name
+
+
+def get_normalized_project_name(project_name: str):
+    """
+    Helper function to get normalized project name, which is used when 
+    naming our ChromaDb collections 
+
+    Args:
+        project_name (str): project name to normalize 
+    """
+    return "".join(c.upper() for c in project_name if c.isalnum())
+
+
+def get_collection_names(project_name: str, source_type: str = "N/A") -> Dict[str, str]:
+    """
+    Helper function to get the ChromaDb collection names of a project keyed by source type
+
+    Args:
+        project_name (str): project name (normalized or not)
+        source_type (str): source type of the collection (DOCS, CODE, or N/A for both)
+    """
+    match source_type:
+        case "DOCS" | "CODE":
+            source_types = [source_type]
+        case "N/A":
+            source_types = ["CODE", "DOCS"]
+        case _:
+            raise Exception("Unknown source_type specified")
+
+    normalized_name = get_normalized_project_name(project_name)
+    return {s: f"{normalized_name}_{s}" for s in source_types}
+
+
+def get_collection_targets(
+        project: "Project",
+        source_type: str = "N/A",
+        model_configs: Optional["ModelConfigs"] = None
+) -> Dict[str, CollectionTarget]:
+    """
+    Helper function to get the ChromaDb collections (and partitions of shared collections) a project's chunks
+    are stored within, keyed by source type
+
+    NOTE: In shared mode, source types without a configured embedding model are left out (or raise when
+    explicitly requested)
+
+    Args:
+        project (Project): project to get the collections of
+        source_type (str): source type of the collection (DOCS, CODE, or N/A for both)
+        model_configs (Optional[ModelConfigs]): model configurations to use rather than the project's own
+    """
+    collection_names = get_collection_names(project.project_name, source_type)
+    if not is_shared_collection_mode():
+        return {s: CollectionTarget(name=name, source_type=s) for s, name in collection_names.items()}
+
+    model_configs = model_configs or project.model_configs
+    dimension_reduction = model_configs.dimension_reduction.value if model_configs and model_configs.dimension_reduction else None
+
+    targets = {}
+    for s in collection_names:
+        if s == "DOCS":
+            model_name = (model_configs and model_configs.docs_embedding_model) or settings.DOCS_EMBEDDING_MODEL
+            dimensions = model_configs.docs_embedding_dimensions if model_configs else None
+        else:
+            model_name = (model_configs and model_configs.code_embedding_model) or settings.CODE_EMBEDDING_MODEL
+            dimensions = model_configs.code_embedding_dimensions if model_configs else None
+
+        # NOTE: shared collections are named by embedding model, so source types without a model have no collection
+        if not model_name:
+            if source_type == s:
+                raise Exception(
+                    f"No {s} embedding model configured for Project={project.project_name}, "
+                    f"unable to determine its shared collection"
+                )
+            logger.debug(f"No {s} embedding model configured for Project={project.project_name}, skipping {s} collection")
+            continue
+
+        targets[s] = CollectionTarget(
+            name=get_shared_collection_name(model_name, dimensions, dimension_reduction),
+            source_type=s,
+            project_id=str(project.id)
+        )
+
+    return targets
@@ -15,8 +15,11 @@ class Settings(BaseSettings):
     SYNC_REL_DB_URL: str = ""
     ASYNC_REL_DB_URL: str = ""
 
+    # vector store backend (http: separate Chroma server, embedded: in-process Chroma persisting to VECTOR_DB_PATH, for single node deployments)
+    VECTOR_DB_BACKEND: str = "http"
     VECTOR_DB_HOST: str = "localhost"
     VECTOR_DB_PORT: int = 8000
+    VECTOR_DB_PATH: str = "data/chroma"
 
     LL_MODEL_PROVIDER: str = "Ollama"
     LL_MODEL: str = "gpt-oss"
@@ -31,7 +34,7 @@ class Settings(BaseSettings):
     HUGGING_FACE_API_KEY: Optional[str] = None
     OPEN_AI_API_KEY: Optional[str] = None
 
-    VALID_MODEL_PROIVDERS: list = ["OpenAI", "HuggingFace"]
+    VALID_MODEL_PROIVDERS: list = ["OpenAI", "HuggingFace", "HuggingFaceONNX"]
 
     TMP: Optional[str] = "tmp"
     PROCESSED_DIR: Optional[str] = "/processed"
@@ -42,6 +45,98 @@ class Settings(BaseSettings):
 
     DOCLING_ACCELERATOR_DEVICE: Optional[str] = "cpu"
 
+    # PDFs with more pages than this are split into page ranges & converted in parallel
+    DOCLING_SHARD_MIN_PAGES: int = 100
+    DOCLING_SHARD_PAGE_SIZE: int = 50
+    DOCLING_SHARD_WORKERS: int = 4
+
+    # OCR is only applied to PDF pages with fewer extractable characters than this
+    DOCLING_OCR_ENABLED: bool = True
+    DOCLING_OCR_MIN_PAGE_CHARS: int = 32
+
+    # default table structure mode for projects (off, auto, or always)
+    DOCLING_TABLE_STRUCTURE_MODE: str = "auto"
+
+    # pick Docling batch sizes & thread counts from available CPUs & memory (or calibrated settings)
+    DOCLING_AUTO_TUNE: bool = True
+
+    # per-document limits enforced on the conversion worker process, offending files are quarantined
+    CONVERSION_DOCUMENT_TIMEOUT_SECONDS: float = 900
+    CONVERSION_MAX_RSS_MB: int = 8192
+
+    # loaded embedding models are shared across jobs & evicted (least recently used first) above this budget
+    EMBEDDING_MODEL_MEMORY_BUDGET_MB: int = 8192
+    EMBEDDING_DEVICE: Optional[str] = None
+
+    # local embedding batches are formed from chunks of similar token length within a padded token budget
+    EMBEDDING_TOKEN_BUDGET: int = 16384
+    EMBEDDING_MAX_BATCH_SIZE: int = 128
+
+    # HuggingFaceONNX provider: models are exported to ONNX (optionally int8 quantized) & ran via onnxruntime
+    ONNX_EMBEDDING_DIR: str = "models/onnx"
+    ONNX_QUANTIZATION: Optional[str] = "avx512_vnni" # arm64, avx2, avx512, avx512_vnni or None for fp32
+    ONNX_INTRA_OP_THREADS: int = 0 # 0 lets onnxruntime pick
+    ONNX_MIN_COSINE_SIMILARITY: float = 0.99
+
+    # conversion & embedding worker processes are recycled after this many tasks or above this RSS
+    CONVERSION_WORKER_MAX_TASKS: int = 50
+    CONVERSION_WORKER_RECYCLE_RSS_MB: int = 6144
+    EMBEDDING_WORKERS_ENABLED: bool = True
+    EMBEDDING_WORKERS_PER_MODEL: int = 1
+    EMBEDDING_WORKER_MAX_TASKS: int = 2000
+    EMBEDDING_WORKER_RECYCLE_RSS_MB: int = 6144
+
+    # load tokenizers for each configured embedding model on startup rather than during the first IngestionJob
+    TOKENIZER_PRELOAD: bool = True
+
+    # embedding worker pools are owned by a local embedding server shared by API requests & IngestionJobs
+    EMBEDDING_SERVER_ENABLED: bool = True
+    EMBEDDING_SERVER_AUTOSTART: bool = True
+    EMBEDDING_SERVER_SOCKET: str = "/tmp/project-context-embedding.sock"
+    EMBEDDING_SERVER_TIMEOUT_SECONDS: Optional[float] = 600
+
+    # concurrent query embeddings are collected for up to this long (or this many queries) & embedded together
+    QUERY_BATCH_MAX_SIZE: int = 32
+    QUERY_BATCH_MAX_WAIT_MS: float = 5
+
+    # documents stream through chunking, embedding & upsert stages connected by bounded queues
+    INGESTION_QUEUE_SIZE: int = 4
+    INGESTION_BATCH_SIZE: int = 256
+
+    # how Project chunks are laid out within Chroma (per_project or shared), chosen per deployment
+    # NOTE: shared keeps one collection per embedding model, with chunks partitioned by project_id & source_type metadata
+    CHROMA_COLLECTION_MODE: str = "per_project"
+
+    # embedded chunks are upserted directly into Chroma in batches of this size, several batches in flight at once
+    CHROMA_UPSERT_BATCH_SIZE: int = 512
+    CHROMA_UPSERT_MAX_IN_FLIGHT: int = 4
+    CHROMA_UPSERT_MAX_RETRIES: int = 3
+    CHROMA_UPSERT_RETRY_BACKOFF_SECONDS: float = 1.0
+
+    # pooled Chroma HTTP connections, kept alive between requests
+    CHROMA_HTTP_MAX_CONNECTIONS: int = 32
+    CHROMA_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 16
+    CHROMA_HTTP_KEEPALIVE_SECONDS: float = 60
+    CHROMA_HTTP_CONNECT_TIMEOUT_SECONDS: float = 5
+    CHROMA_HTTP_TIMEOUT_SECONDS: float = 120
+    CHROMA_HEALTH_CHECK_TTL_SECONDS: float = 10 # successful health checks are reused for this long
+
+    # documents listed from Chroma collections are paged, NDJSON streams fetch pages of this size
+    CHROMA_LIST_DEFAULT_LIMIT: int = 100
+    CHROMA_LIST_MAX_LIMIT: int = 1000
+    CHROMA_STREAM_PAGE_SIZE: int = 500
+
+    # collections are restored from exported archives in upserts of this many vectors (capped by Chroma's max batch size)
+    CHROMA_IMPORT_BATCH_SIZE: int = 5000
+
+    # logical collections resolve to versioned physical collections, retired versions are deleted after a grace period
+    COLLECTION_ALIAS_CACHE_TTL_SECONDS: float = 5
+    COLLECTION_GC_GRACE_SECONDS: float = 300 # must exceed the alias cache TTL & the longest running query
+    COLLECTION_REBUILD_STALE_SECONDS: float = 86400 # versions left building this long are treated as failed
+
+    # stored chunks are re-embedded with a newly configured model in batches of this many chunks
+    EMBEDDING_MIGRATION_BATCH_SIZE: int = 2048
+
     VALID_DATA_PROVIDERS: Set[str] = {"GitHub", "BitBucket", "Confluence"}
 
     CODE_FILE_EXTENSIONS: Set[str] = {
@@ -1,22 +1,185 @@
 import chromadb
-from app.core import settings
+import httpx
+from app.core import settings, sync_engine, get_sync_session_maker
+from app.models import CollectionAlias, CollectionVersion
+from sqlalchemy import select, delete
+from sqlalchemy.orm import sessionmaker
 from chromadb.api import ClientAPI
 from chromadb.api import AsyncClientAPI
-from typing import Optional, cast
+from chromadb.api.models.Collection import Collection
+from chromadb.api.fastapi import FastAPI
+from chromadb.config import Settings as ChromaSettings
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Optional, Tuple, cast
+import threading
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# chromadb release the HTTP session tuning was verified against (must match the version pinned within requirements.txt)
+TUNED_HTTP_SESSION_CHROMA_VERSION = "1.2.1"
+
+# NOTE: alias lookups happen on the query path from any thread, so they share the pooled main engine rather than
+# creating a NullPool engine (& connection) per lookup like get_sync_session_maker does on worker threads
+_alias_session_maker = sessionmaker(autoflush=False, autocommit=False, bind=sync_engine)
+
+
+class VectorStoreBackend(ABC):
+    """
+    Creates the Chroma clients handed out by ChromaClientManager, so services & ingestion code against the same
+    client & collection API whichever backend stores the vectors
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def create_sync_client(self) -> ClientAPI:
+        """
+        Create sync client, verifying the vector store is reachable
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_async_client(self) -> AsyncClientAPI:
+        """
+        Create async client, verifying the vector store is reachable
+        """
+        raise NotImplementedError
+
+
+class HttpVectorStoreBackend(VectorStoreBackend):
+    """
+    Vectors are stored by a separate Chroma server, each read & write crossing HTTP
+    """
+
+    name = "http"
+
+    def create_sync_client(self) -> ClientAPI:
+        """
+        Create sync client with a tuned, pooled HTTP session
+        """
+        chroma_client = chromadb.HttpClient(
+            host=settings.VECTOR_DB_HOST, port=settings.VECTOR_DB_PORT
+        )
+        self._tune_http_session(chroma_client)
+
+        # NOTE: checks connection via the pre-flight checks Chroma caches & needs before any write anyway,
+        # rather than a separate heartbeat round trip
+        chroma_client.get_max_batch_size()
+        return chroma_client
+
+    async def create_async_client(self) -> AsyncClientAPI:
+        chroma_client = await chromadb.AsyncHttpClient(
+            host=settings.VECTOR_DB_HOST, port=settings.VECTOR_DB_PORT
+        )
+        await chroma_client.get_max_batch_size()  # check connection
+        return chroma_client
+
+    def _tune_http_session(self, chroma_client: ClientAPI):
+        """
+        Replace the HTTP session of the Chroma client with one configured for keep-alive, pool size & timeouts
+
+        NOTE: Chroma does not expose its session settings (no Settings or client option covers pool size & timeouts),
+        so the session is swapped out (keeping its headers & TLS verification). As this relies on Chroma's private
+        attributes, it is only done for the chromadb release pinned within requirements.txt
+
+        Args:
+            chroma_client (ClientAPI): Chroma HTTP client
+        """
+        if chromadb.__version__ != TUNED_HTTP_SESSION_CHROMA_VERSION:
+            logger.warning(
+                f"Chroma HTTP session tuning is only supported for chromadb=={TUNED_HTTP_SESSION_CHROMA_VERSION} "
+                f"(installed {chromadb.__version__}), using Chroma's default HTTP session"
+            )
+            return
+
+        server = getattr(chroma_client, "_server", None)
+        session = getattr(server, "_session", None)
+        if not isinstance(server, FastAPI) or not isinstance(session, httpx.Client):
+            logger.warning("Unable to tune Chroma HTTP session, using Chroma's default HTTP session")
+            return
+
+        verify = server._settings.chroma_server_ssl_verify
+        server._session = httpx.Client(
+            headers=session.headers,
+            verify=True if verify is None else verify,
+            timeout=httpx.Timeout(
+                settings.CHROMA_HTTP_TIMEOUT_SECONDS,
+                connect=settings.CHROMA_HTTP_CONNECT_TIMEOUT_SECONDS
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.CHROMA_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CHROMA_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.CHROMA_HTTP_KEEPALIVE_SECONDS
+            )
+        )
+        session.close()
+
+
+class EmbeddedVectorStoreBackend(VectorStoreBackend):
+    """
+    Vectors are stored in-process by Chroma persisting to a local directory, so reads & writes skip HTTP
+    & JSON serialization entirely (for single node deployments)
+
+    NOTE: The directory must only be opened by one process at a time, so management commands (app.cli) touching
+    collections should not be ran while the API is serving with this backend
+    """
+
+    name = "embedded"
+
+    def create_sync_client(self) -> ClientAPI:
+        Path(settings.VECTOR_DB_PATH).mkdir(parents=True, exist_ok=True)
+
+        # NOTE: Chroma shares one system per path, so every manager within the process uses the same index & caches
+        chroma_client = chromadb.PersistentClient(
+            path=settings.VECTOR_DB_PATH,
+            settings=ChromaSettings(anonymized_telemetry=False)
+        )
+        chroma_client.get_max_batch_size()
+        return chroma_client
+
+    async def create_async_client(self) -> AsyncClientAPI:
+        raise Exception("Async Chroma clients are not supported by the embedded vector store backend")
+
+
+def get_vector_store_backend() -> VectorStoreBackend:
+    """
+    Retrieve the vector store backend configured for the deployment
+    """
+    match settings.VECTOR_DB_BACKEND:
+        case "http":
+            return HttpVectorStoreBackend()
+        case "embedded":
+            return EmbeddedVectorStoreBackend()
+        case _:
+            raise Exception(f"Unknown vector store backend specified: {settings.VECTOR_DB_BACKEND}")
 
 
 class ChromaClientManager:
 
-    def __init__(self) -> None:
+    def __init__(self, backend: Optional[VectorStoreBackend] = None) -> None:
+        self.backend = backend or get_vector_store_backend()
         self.sync_client: Optional[ClientAPI] = None
         self.async_client: Optional[AsyncClientAPI] = None
 
+        # collection handles keyed by physical collection name, invalidated when collections are created or deleted
+        self._collections: Dict[str, Collection] = {}
+
+        # physical collection name & when it was resolved, keyed by logical collection name (alias)
+        self._aliases: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._last_healthy: float = 0.0
+
     def get_sync_client(self) -> ClientAPI:
         """
         Retrieve sync client for handling Chroma Db collection manipulation
         """
-        if not self.sync_client:
-            self.setup_sync_client()
+        with self._lock:
+            if not self.sync_client:
+                self.setup_sync_client()
 
         return cast(ClientAPI, self.sync_client)
 
@@ -29,16 +192,164 @@ class ChromaClientManager:
 
         return cast(AsyncClientAPI, self.async_client)
 
+    def get_collection(self, name: str) -> Collection:
+        """
+        Retrieve cached handle of a Chroma collection (resolving logical collection names to the physical
+        collection version currently served), fetching it on first use
+
+        NOTE: Chroma raises an exception when no collection exists by name (nothing is cached in that case)
+
+        Args:
+            name (str): logical or physical name of the collection
+        """
+        name = self.resolve_collection_name(name)
+
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self.get_sync_client().get_collection(name)
+            with self._lock:
+                self._collections[name] = collection
+
+        return collection
+
+    def resolve_collection_name(self, name: str) -> str:
+        """
+        Resolve logical collection name to the physical collection currently served, names without an alias
+        (i.e collections never rebuilt) are physical collections themselves
+
+        NOTE: Resolutions are cached for COLLECTION_ALIAS_CACHE_TTL_SECONDS, so queries don't hit Postgres;
+        retired versions are kept for a grace period exceeding the TTL so stale resolutions still succeed
+
+        Args:
+            name (str): logical collection name
+        """
+        cached = self._aliases.get(name)
+        if cached and time.monotonic() - cached[1] < settings.COLLECTION_ALIAS_CACHE_TTL_SECONDS:
+            return cached[0]
+
+        with _alias_session_maker() as session:
+            alias = session.get(CollectionAlias, name)
+            collection_name = alias.collection_name if alias else name
+
+        with self._lock:
+            self._aliases[name] = (collection_name, time.monotonic())
+
+        return collection_name
+
+    def invalidate_alias(self, name: str) -> None:
+        """
+        Drop cached resolution of a logical collection name (i.e once its alias is swapped)
+
+        Args:
+            name (str): logical collection name
+        """
+        with self._lock:
+            self._aliases.pop(name, None)
+
+    def create_collection(self, name: str, **kwargs) -> Collection:
+        """
+        Create a Chroma collection & cache its handle
+
+        Args:
+            name (str): name of the collection
+            kwargs: additional arguments passed to Chroma (i.e metadata)
+        """
+        self.invalidate_collection(name)
+
+        collection = self.get_sync_client().create_collection(name=name, **kwargs)
+        with self._lock:
+            self._collections[name] = collection
+
+        return collection
+
+    def get_or_create_collection(self, name: str, **kwargs) -> Collection:
+        """
+        Retrieve cached handle of a Chroma collection, creating the collection when it does not exist yet
+        (i.e collections shared between Projects)
+
+        Args:
+            name (str): logical or physical name of the collection
+            kwargs: additional arguments passed to Chroma when creating the collection (i.e metadata)
+        """
+        try:
+            return self.get_collection(name)
+        except Exception:
+            pass
+
+        # NOTE: created by get_or_create, so concurrent creation of the same collection doesn't fail
+        collection = self.get_sync_client().get_or_create_collection(name=name, **kwargs)
+        with self._lock:
+            self._collections[name] = collection
+
+        return collection
+
+    def delete_collection(self, name: str) -> None:
+        """
+        Delete a Chroma collection & drop its cached handle, deleting every physical version (and the alias)
+        of logical collections which were rebuilt
+
+        Args:
+            name (str): logical or physical name of the collection
+        """
+        session_maker = get_sync_session_maker()
+        with session_maker() as session:
+            versions = session.execute(
+                select(CollectionVersion.collection_name).where(CollectionVersion.alias == name)
+            ).scalars().all()
+
+            if not versions:
+                self.invalidate_collection(name)
+                self.get_sync_client().delete_collection(name=name)
+                return
+
+            for collection_name in versions:
+                self.invalidate_collection(collection_name)
+                try:
+                    self.get_sync_client().delete_collection(name=collection_name)
+                except Exception as e:
+                    logger.debug(f"Collection {collection_name} already deleted: {e}")
+
+            session.execute(delete(CollectionVersion).where(CollectionVersion.alias == name))
+            session.execute(delete(CollectionAlias).where(CollectionAlias.alias == name))
+            session.commit()
+
+        self.invalidate_alias(name)
+
+    def invalidate_collection(self, name: Optional[str] = None) -> None:
+        """
+        Drop cached handle of a collection (or every cached handle when no name is specified)
+
+        Args:
+            name (Optional[str]): name of the collection
+        """
+        with self._lock:
+            if name is None:
+                self._collections.clear()
+            else:
+                self._collections.pop(name, None)
+
+    def check_health(self) -> bool:
+        """
+        Check Chroma DB is reachable, reusing a recent successful check rather than sending a heartbeat every call
+        """
+        if time.monotonic() - self._last_healthy < settings.CHROMA_HEALTH_CHECK_TTL_SECONDS:
+            return True
+
+        try:
+            self.get_sync_client().heartbeat()
+        except Exception as e:
+            logger.warning(f"Chroma DB health check failed: {e}")
+            return False
+
+        self._last_healthy = time.monotonic()
+        return True
+
     async def setup_async_client(self):
         """
         Setup async client
         """
         try:
-            chroma_client = await chromadb.AsyncHttpClient(
-                host=settings.VECTOR_DB_HOST, port=settings.VECTOR_DB_PORT
-            )
-            await chroma_client.heartbeat()
-            self.async_client = chroma_client
+            self.async_client = await self.backend.create_async_client()
         except Exception as e:
             print(f"Failed to connect to Chroma DB: {e}")
             # TODO: raise custom exception
@@ -46,15 +357,11 @@ class ChromaClientManager:
 
     def setup_sync_client(self):
         """
-        Setup sync client
+        Setup sync client using the configured vector store backend
         """
         try:
-            chroma_client = chromadb.HttpClient(
-                host=settings.VECTOR_DB_HOST, port=settings.VECTOR_DB_PORT
-            )
-            chroma_client.heartbeat()  # check connection
-
-            self.sync_client = chroma_client
+            self.sync_client = self.backend.create_sync_client()
+            self._last_healthy = time.monotonic()
         except Exception as e:
             print(f"Failed to connect to Chroma DB: {e}")
             # TODO: raise custom exception
@@ -1,3 +1,45 @@
 from .manager import EmbeddingManager
+from .worker import WorkerEmbedding, EmbeddingWorkerPool, get_embedding_worker_pool, shutdown_embedding_workers
+from .client import EmbeddingClient, get_embedding_client
+from .server import EmbeddingServer, run_embedding_server, start_embedding_server, stop_embedding_server
+from .tokenizers import get_tokenizer, preload_tokenizers
+from .registry import EmbeddingModelRegistry, get_embedding_model_registry, load_embedding_model
+from .batching import embed_texts, embed_queries, embed_length_bucketed, benchmark_batching
+from .batcher import QueryMicroBatcher, BatchedQueryEmbedding, get_query_batcher
+from .onnx_backend import load_onnx_embedding_model, export_onnx_model, check_onnx_accuracy, benchmark_onnx
+from .projection import ProjectedEmbedding, get_projector, fit_pca, fit_pca_projection, benchmark_projection_recall
 
-__all__ = ["EmbeddingManager"]
+__all__ = [
+    "EmbeddingManager",
+    "WorkerEmbedding",
+    "EmbeddingWorkerPool",
+    "get_embedding_worker_pool",
+    "shutdown_embedding_workers",
+    "EmbeddingClient",
+    "get_embedding_client",
+    "EmbeddingServer",
+    "run_embedding_server",
+    "start_embedding_server",
+    "stop_embedding_server",
+    "get_tokenizer",
+    "preload_tokenizers",
+    "EmbeddingModelRegistry",
+    "get_embedding_model_registry",
+    "load_embedding_model",
+    "embed_texts",
+    "embed_queries",
+    "QueryMicroBatcher",
+    "BatchedQueryEmbedding",
+    "get_query_batcher",
+    "embed_length_bucketed",
+    "benchmark_batching",
+    "load_onnx_embedding_model",
+    "export_onnx_model",
+    "check_onnx_accuracy",
+    "benchmark_onnx",
+    "ProjectedEmbedding",
+    "get_projector",
+    "fit_pca",
+    "fit_pca_projection",
+    "benchmark_projection_recall"
+]
@@ -0,0 +1,192 @@
+from app.core import settings
+
+from .batching import embed_texts, embed_queries
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Queue, Empty
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import threading
+import asyncio
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryMicroBatcher:
+    """
+    Collects concurrent query embedding requests for up to max_wait seconds (or until max_batch_size queries
+    are waiting) & embeds them with a single forward pass, handing each caller back its own vector
+
+    NOTE: A larger wait trades per-query latency for throughput under concurrent load; a wait of 0 only batches
+    queries which were already waiting
+    """
+
+    def __init__(
+            self,
+            embed_queries: Callable[[List[str]], List[Embedding]],
+            max_batch_size: int = settings.QUERY_BATCH_MAX_SIZE,
+            max_wait: float = settings.QUERY_BATCH_MAX_WAIT_MS / 1000,
+            max_concurrent_batches: int = 1
+    ):
+        self._embed_queries = embed_queries
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+
+        self._queue: Queue = Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix="query-batch")
+        self._dispatcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+
+    def submit(self, query: str) -> Future:
+        """
+        Queue query to be embedded within the next batch
+
+        Args:
+            query (str): query to embed
+        """
+
+        with self._lock:
+            if not self._dispatcher:
+                self._dispatcher = threading.Thread(target=self._dispatch, name="query-batcher", daemon=True)
+                self._dispatcher.start()
+
+        future: Future = Future()
+        self._queue.put((query, future))
+        return future
+
+
+    def embed(self, query: str) -> Embedding:
+        """
+        Embed query, blocking until its batch is embedded
+
+        Args:
+            query (str): query to embed
+        """
+
+        return self.submit(query).result()
+
+
+    def _dispatch(self):
+        """
+        Form batches from queued queries & hand them to the executor
+        """
+
+        while True:
+            batch = [self._queue.get()]
+
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except Empty:
+                    break
+
+            self._executor.submit(self._embed_batch, batch)
+
+
+    def _embed_batch(self, batch: List[Tuple[str, Future]]):
+        """
+        Embed batch of queries, resolving each caller's future with its own vector
+
+        Args:
+            batch (List[Tuple[str, Future]]): queued queries & the futures of their callers
+        """
+
+        try:
+            embeddings = self._embed_queries([query for query, _ in batch])
+        except Exception as e:
+            logger.error(f"Failed to embed batch of {len(batch)} queries: {str(e)}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), embedding in zip(batch, embeddings):
+            future.set_result(embedding)
+
+
+class BatchedQueryEmbedding(BaseEmbedding):
+    """
+    Embedding model wrapper micro batching the query embeddings of a model loaded within the calling process,
+    so queries are coalesced whether or not embedding worker processes are enabled
+    """
+
+    provider: str = Field(description="Embedding provider of the wrapped model")
+    device: Optional[str] = Field(default=None, description="Device the wrapped model is loaded onto")
+
+    _base_model: BaseEmbedding = PrivateAttr()
+
+    def __init__(self, base_model: BaseEmbedding, provider: str, device: Optional[str] = None, **kwargs: Any):
+        # NOTE: whole batches of chunks are passed to the wrapped model, which buckets them by token length
+        kwargs.setdefault("embed_batch_size", settings.INGESTION_BATCH_SIZE)
+        super().__init__(provider=provider, model_name=base_model.model_name, device=device, **kwargs)
+        self._base_model = base_model
+
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "BatchedQueryEmbedding"
+
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return get_query_batcher(self.provider, self.model_name, self.device, in_process=True).embed(query)
+
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return await asyncio.to_thread(self._get_query_embedding, query)
+
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return embed_texts(self._base_model, texts)
+
+
+# micro batchers shared across requests, keyed by (provider, model name, device, in process)
+_batchers: Dict[Tuple[str, str, Optional[str], bool], QueryMicroBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_query_batcher(
+        provider: str,
+        model_name: str,
+        device: Optional[str] = None,
+        in_process: bool = False
+) -> QueryMicroBatcher:
+    """
+    Retrieve the query micro batcher in front of the embedding worker pool of the specified model, or in front
+    of the model loaded within the calling process
+
+    Args:
+        provider (str): embedding provider
+        model_name (str): embedding model name
+        device (Optional[str]): device the model is loaded onto
+        in_process (bool): whether queries are embedded by the model loaded within the calling process
+    """
+
+    # NOTE: imported here to avoid circular import, as WorkerEmbedding routes queries through the batcher
+    from .worker import get_embedding_worker_pool
+    from .registry import get_embedding_model_registry
+
+    with _batchers_lock:
+        key = (provider, model_name, device, in_process)
+        if key not in _batchers:
+            if in_process:
+                # NOTE: a single model is loaded within the process, so its batches are embedded one at a time
+                _batchers[key] = QueryMicroBatcher(
+                    lambda queries: embed_queries(get_embedding_model_registry().get(provider, model_name, device), queries)
+                )
+            else:
+                _batchers[key] = QueryMicroBatcher(
+                    lambda queries: get_embedding_worker_pool(provider, model_name, device).run(("query", queries)),
+                    max_concurrent_batches=settings.EMBEDDING_WORKERS_PER_MODEL
+                )
+
+        return _batchers[key]
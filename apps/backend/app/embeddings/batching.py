@@ -0,0 +1,133 @@
+from app.core import settings
+from .tokenizers import get_tokenizer
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+from typing import Dict, List, Optional
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_token_budget_batches(lengths: List[int], token_budget: int, max_batch_size: int) -> List[List[int]]:
+    """
+    Group inputs of similar token length into batches whose padded size stays within the token budget
+
+    NOTE: Inputs are padded to the longest input in their batch, so a batch costs (longest length * batch size) tokens
+
+    Args:
+        lengths (List[int]): token length of each input
+        token_budget (int): maximum number of padded tokens per batch
+        max_batch_size (int): maximum number of inputs per batch
+    """
+
+    batches = []
+    batch: List[int] = []
+
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+
+        # NOTE: sorted by length, so the current input is always the longest in its batch
+        if batch and (lengths[i] * (len(batch) + 1) > token_budget or len(batch) >= max_batch_size):
+            batches.append(batch)
+            batch = []
+
+        batch.append(i)
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+def embed_length_bucketed(
+        model: HuggingFaceEmbedding,
+        texts: List[str],
+        token_budget: int = settings.EMBEDDING_TOKEN_BUDGET,
+        max_batch_size: int = settings.EMBEDDING_MAX_BATCH_SIZE
+) -> List[Embedding]:
+    """
+    Embed texts in batches of similar token length formed by a token budget, returning embeddings in
+    the original order of the texts
+
+    Args:
+        model (HuggingFaceEmbedding): local embedding model
+        texts (List[str]): texts to embed
+        token_budget (int): maximum number of padded tokens per batch
+        max_batch_size (int): maximum number of texts per batch
+    """
+
+    tokenizer = get_tokenizer(model.model_name)
+    lengths = [
+        len(input_ids)
+        for input_ids in tokenizer(texts, truncation=True, max_length=model.max_length)["input_ids"]
+    ]
+
+    embeddings: List[Optional[Embedding]] = [None] * len(texts)
+    for batch in get_token_budget_batches(lengths, token_budget, max_batch_size):
+        for i, embedding in zip(batch, model.get_text_embedding_batch([texts[i] for i in batch])):
+            embeddings[i] = embedding
+
+    return embeddings
+
+
+def embed_texts(model: BaseEmbedding, texts: List[str]) -> List[Embedding]:
+    """
+    Embed texts, bucketing by token length for local models
+
+    Args:
+        model (BaseEmbedding): embedding model (local, remote or worker proxy)
+        texts (List[str]): texts to embed
+    """
+
+    if isinstance(model, HuggingFaceEmbedding):
+        return embed_length_bucketed(model, texts)
+
+    return model.get_text_embedding_batch(texts)
+
+
+def embed_queries(model: BaseEmbedding, queries: List[str]) -> List[Embedding]:
+    """
+    Embed batch of queries, using a single forward pass for local models
+
+    Args:
+        model (BaseEmbedding): embedding model
+        queries (List[str]): queries to embed
+    """
+
+    if isinstance(model, HuggingFaceEmbedding):
+        return model._embed(queries, prompt_name="query")
+
+    return [model.get_query_embedding(query) for query in queries]
+
+
+def benchmark_batching(model: HuggingFaceEmbedding, texts: List[str], fixed_batch_size: int = 10) -> Dict[str, float]:
+    """
+    Compare chunks/sec of fixed count batches (in input order) against length bucketed token budget batches
+
+    Args:
+        model (HuggingFaceEmbedding): local embedding model
+        texts (List[str]): sample chunks to embed
+        fixed_batch_size (int): number of chunks per fixed count batch (LlamaIndex default of 10)
+    """
+
+    # warm up model & tokenizer prior to timing
+    embed_length_bucketed(model, texts[:fixed_batch_size])
+
+    start = time.perf_counter()
+    for i in range(0, len(texts), fixed_batch_size):
+        model.get_text_embedding_batch(texts[i : i + fixed_batch_size])
+    fixed = len(texts) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    embed_length_bucketed(model, texts)
+    bucketed = len(texts) / (time.perf_counter() - start)
+
+    logger.info(
+        f"Embedded {len(texts)} chunks with model={model.model_name}: fixed batches={fixed:.2f} chunks/sec, "
+        f"length bucketed batches={bucketed:.2f} chunks/sec ({bucketed / fixed:.2f}x)"
+    )
+
+    return {"fixed_chunks_per_second": fixed, "bucketed_chunks_per_second": bucketed}
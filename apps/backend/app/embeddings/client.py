@@ -0,0 +1,97 @@
+from app.core import settings
+from .protocol import send_frame, recv_frame
+
+from llama_index.core.base.embeddings.base import Embedding
+
+from typing import List, Optional
+import threading
+import logging
+import socket
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingClient:
+    """
+    Client of the shared embedding server, keeping a Unix socket connection per thread
+    """
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        self._socket_path = socket_path
+        self._timeout = timeout
+        self._local = threading.local()
+
+
+    def embed(self, provider: str, model_name: str, device: Optional[str], kind: str, inputs: List[str]) -> List[Embedding]:
+        """
+        Embed a batch of texts or queries via the embedding server
+
+        Args:
+            provider (str): embedding provider
+            model_name (str): embedding model name
+            device (Optional[str]): device the server loads the model onto
+            kind (str): kind of input ("text" or "query")
+            inputs (List[str]): inputs to embed
+        """
+
+        request = {"provider": provider, "model_name": model_name, "device": device, "kind": kind, "inputs": inputs}
+
+        # NOTE: retry once on a fresh connection, as the server may have restarted since the last request
+        for attempt in range(2):
+            sock = self._get_connection()
+            try:
+                send_frame(sock, request)
+                header, payload = recv_frame(sock)
+                break
+            except (OSError, ConnectionError) as e:
+                self.close()
+                if attempt:
+                    raise Exception(f"Failed to reach embedding server at {self._socket_path}: {str(e)}")
+
+        if header["status"] == "error":
+            raise Exception(f"Embedding server failed to embed inputs: {header['error']}")
+
+        return np.frombuffer(payload, dtype=np.float32).reshape(header["shape"]).tolist()
+
+
+    def close(self):
+        """
+        Close the current thread's connection to the embedding server
+        """
+
+        sock = getattr(self._local, "sock", None)
+        if sock:
+            sock.close()
+            self._local.sock = None
+
+
+    def _get_connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if not sock:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self._timeout)
+            sock.connect(self._socket_path)
+            self._local.sock = sock
+
+        return sock
+
+
+_client: Optional[EmbeddingClient] = None
+_client_lock = threading.Lock()
+
+
+def get_embedding_client() -> EmbeddingClient:
+    """
+    Retrieve the process-wide embedding server client
+    """
+
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = EmbeddingClient(settings.EMBEDDING_SERVER_SOCKET, settings.EMBEDDING_SERVER_TIMEOUT_SECONDS)
+
+        return _client
@@ -1,6 +1,11 @@
 from app.core import settings
-from app.models import ModelConfigs
-from transformers import AutoTokenizer
+from app.models import ModelConfigs, DimensionReduction
+from .tokenizers import get_tokenizer
+from .registry import LOCAL_EMBEDDING_PROVIDERS, get_embedding_model_registry
+from .worker import WorkerEmbedding
+from .batcher import BatchedQueryEmbedding
+from .projection import ProjectedEmbedding, get_projector
+from typing import Optional
 import logging
 
 
@@ -8,13 +13,18 @@ class EmbeddingManager:
 
     def __init__(self, model_configs: ModelConfigs):
 
-        # Coding Embedding Specific Values
-        self._code_provider = model_configs.code_embedding_provider
-        self._code_model = model_configs.code_embedding_model 
+        # Coding Embedding Specific Values (falling back to application defaults)
+        self._code_provider = model_configs.code_embedding_provider or settings.CODE_EMBEDDING_PROVIDER
+        self._code_model = model_configs.code_embedding_model or settings.CODE_EMBEDDING_MODEL
 
-        # Docs Embedding Specific Values
-        self._docs_provider = model_configs.docs_embedding_provider
-        self._docs_model = model_configs.docs_embedding_model
+        # Docs Embedding Specific Values (falling back to application defaults)
+        self._docs_provider = model_configs.docs_embedding_provider or settings.DOCS_EMBEDDING_PROVIDER
+        self._docs_model = model_configs.docs_embedding_model or settings.DOCS_EMBEDDING_MODEL
+
+        # Reduced dimensionality of stored embeddings (full dimensionality when not configured)
+        self._code_dimensions = model_configs.code_embedding_dimensions
+        self._docs_dimensions = model_configs.docs_embedding_dimensions
+        self._dimension_reduction = model_configs.dimension_reduction or DimensionReduction.MATRYOSHKA
 
     def get_embedding_model(self, source_type: str):
         """
@@ -41,15 +51,15 @@ class EmbeddingManager:
     def get_code_tokenizer(self):
         """
         Use Docling to retrieve code tokenizer corresponding to 
-        configured model and provider 
+        configured model and provider (shared across IngestionJobs)
         """
 
         match self._code_provider:
 
-            case "HuggingFace":
+            case "HuggingFace" | "HuggingFaceONNX":
                 from docling_core.transforms.chunker.tokenizer.huggingface import HuggingFaceTokenizer
                 return HuggingFaceTokenizer(
-                    tokenizer=AutoTokenizer.from_pretrained(self._code_model)
+                    tokenizer=get_tokenizer(self._code_model)
                 )
             case _:
                 logging.error(
@@ -63,15 +73,15 @@ class EmbeddingManager:
     def get_docs_tokenizer(self):
         """
         Use Docling to retrieve docs tokenizer corresponding to 
-        configured model and provider 
+        configured model and provider (shared across IngestionJobs)
         """
         
         match self._docs_provider:
 
-            case "HuggingFace":
+            case "HuggingFace" | "HuggingFaceONNX":
                 from docling_core.transforms.chunker.tokenizer.huggingface import HuggingFaceTokenizer
                 return HuggingFaceTokenizer(
-                    tokenizer=AutoTokenizer.from_pretrained(self._docs_model)
+                    tokenizer=get_tokenizer(self._docs_model)
                 )
             case _:
                 logging.error(
@@ -83,35 +93,48 @@ class EmbeddingManager:
 
 
     def get_docs_embedding_model(self):
+        """
+        Retrieve docs embedding model corresponding to the Project's configured model and provider
+        """
 
-        match self._docs_provider:
+        return self._get_embedding_model(self._docs_provider, self._docs_model, self._docs_dimensions)
 
-            # Local Embedding Providers
-            case "HuggingFace":
-                from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-
-                return HuggingFaceEmbedding(model_name=settings.DOCS_EMBEDDING_MODEL)
-            case _:
-                logging.error(
-                    f"The embedidng provider specified, '{self._docs_provider}', is not curretly set up for this application"
-                )
-                raise Exception(
-                    f"Invalid embedding provider specified: {self._docs_provider}"
-                )
 
     def get_code_embedding_model(self):
+        """
+        Retrieve code embedding model corresponding to the Project's configured model and provider
+        """
 
-        match self._code_provider:
+        return self._get_embedding_model(self._code_provider, self._code_model, self._code_dimensions)
 
-            # Local Embedding Providers
-            case "HuggingFace":
-                from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 
-                return HuggingFaceEmbedding(model_name=settings.CODE_EMBEDDING_MODEL)
-            case _:
-                logging.error(
-                    f"The embedidng provider specified, '{self._code_provider}', is not curretly set up for this application"
-                )
-                raise Exception(
-                    f"Invalid embedding provider specified: {self._code_provider}"
-                )
+    def _get_embedding_model(self, provider: str, model_name: str, dimensions: Optional[int] = None):
+        """
+        Retrieve shared embedding model, proxying local models to recyclable embedding worker processes
+        (owned by the embedding server when enabled) so model weights are not held by the calling process
+
+        NOTE: When reduced dimensions are configured, both text & query embeddings are projected, so the
+        Project's collections must be re-embedded whenever the dimensionality changes
+
+        Args:
+            provider (str): embedding provider
+            model_name (str): embedding model name
+            dimensions (Optional[int]): dimensionality to project embeddings to
+        """
+
+        device = settings.EMBEDDING_DEVICE
+
+        if provider in LOCAL_EMBEDDING_PROVIDERS and settings.EMBEDDING_WORKERS_ENABLED:
+            embedding_model = WorkerEmbedding(provider=provider, model_name=model_name, device=device)
+        elif provider in LOCAL_EMBEDDING_PROVIDERS:
+            # micro batch queries of models loaded within this process, as the worker processes would
+            embedding_model = BatchedQueryEmbedding(
+                get_embedding_model_registry().get(provider, model_name, device), provider=provider, device=device
+            )
+        else:
+            embedding_model = get_embedding_model_registry().get(provider, model_name, device)
+
+        if not dimensions:
+            return embedding_model
+
+        return ProjectedEmbedding(embedding_model, get_projector(model_name, self._dimension_reduction, dimensions))
@@ -0,0 +1,205 @@
+from app.core import settings
+
+from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+from llama_index.embeddings.huggingface.utils import get_query_instruct_for_model_name, get_text_instruct_for_model_name
+
+from pathlib import Path
+from typing import Dict, List, Optional
+import threading
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# sentences compared against the torch model when validating a quantized export
+_PROBE_TEXTS = [
+    "Represent the meaning of this sentence for retrieval.",
+    "The ingestion job converts documentation files, chunks them & stores their embeddings.",
+    "def get_tokenizer(model_name: str) -> PreTrainedTokenizerBase:",
+    "| Column | Type | Description |\n| --- | --- | --- |\n| id | UUID | primary key |",
+    "Quarterly revenue grew 12% year over year, driven by subscription renewals.",
+]
+
+# NOTE: exports write to disk, so only a single export per process runs at a time
+_export_lock = threading.Lock()
+
+
+def get_onnx_export_dir(model_name: str) -> Path:
+    """
+    Directory the ONNX export of a model is persisted to
+
+    Args:
+        model_name (str): HuggingFace model name
+    """
+
+    return Path(settings.ONNX_EMBEDDING_DIR) / model_name.replace("/", "--")
+
+
+def get_onnx_file_name(quantization: Optional[str]) -> str:
+    """
+    File name (relative to the export directory) of the ONNX model for the quantization config
+
+    Args:
+        quantization (Optional[str]): int8 dynamic quantization config (arm64, avx2, avx512 or avx512_vnni)
+    """
+
+    return f"onnx/model_qint8_{quantization}.onnx" if quantization else "onnx/model.onnx"
+
+
+def get_onnx_marker_path(model_name: str, quantization: str) -> Path:
+    """
+    Marker file persisting which ONNX model file was chosen for the quantization config once its accuracy was checked
+
+    Args:
+        model_name (str): HuggingFace model name
+        quantization (str): int8 dynamic quantization config (arm64, avx2, avx512 or avx512_vnni)
+    """
+
+    return get_onnx_export_dir(model_name) / f"onnx/model_qint8_{quantization}.selected"
+
+
+def export_onnx_model(model_name: str, quantization: Optional[str] = None) -> str:
+    """
+    Export model to ONNX (optionally int8 quantized), returning the file name of the exported model
+
+    NOTE: Quantized exports are checked for accuracy against the torch model once, right after being exported,
+    falling back to the fp32 export if they fail. The chosen file is persisted to a marker file read by later loads
+
+    Args:
+        model_name (str): HuggingFace model name
+        quantization (Optional[str]): int8 dynamic quantization config (arm64, avx2, avx512 or avx512_vnni)
+    """
+
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    export_dir = get_onnx_export_dir(model_name)
+
+    with _export_lock:
+        if not (export_dir / get_onnx_file_name(None)).exists():
+            start = time.perf_counter()
+            SentenceTransformer(model_name, backend="onnx", device="cpu").save_pretrained(str(export_dir))
+            logger.info(f"Exported model={model_name} to ONNX in {time.perf_counter() - start:.2f} seconds")
+
+        if not quantization:
+            return get_onnx_file_name(None)
+
+        marker_path = get_onnx_marker_path(model_name, quantization)
+        if marker_path.exists() and (export_dir / (file_name := marker_path.read_text().strip())).exists():
+            return file_name
+
+        if not (export_dir / get_onnx_file_name(quantization)).exists():
+            model = SentenceTransformer(str(export_dir), backend="onnx", device="cpu")
+            export_dynamic_quantized_onnx_model(model, quantization, str(export_dir))
+            logger.info(f"Exported int8 quantized ({quantization}) ONNX model={model_name}")
+
+        file_name = get_onnx_file_name(quantization)
+        accuracy = check_onnx_accuracy(model_name, _PROBE_TEXTS, quantization)
+        if accuracy["min_cosine_similarity"] < settings.ONNX_MIN_COSINE_SIMILARITY:
+            logger.warning(
+                f"Quantized ({quantization}) ONNX model={model_name} diverges from torch output "
+                f"(min cosine similarity={accuracy['min_cosine_similarity']:.4f}); falling back to fp32 ONNX model"
+            )
+            file_name = get_onnx_file_name(None)
+
+        marker_path.write_text(file_name)
+
+    return file_name
+
+
+def load_onnx_embedding_model(model_name: str, quantization: Optional[str] = settings.ONNX_QUANTIZATION) -> HuggingFaceEmbedding:
+    """
+    Load ONNX Runtime version of a HuggingFace embedding model, exporting it on first use
+
+    Args:
+        model_name (str): HuggingFace model name
+        quantization (Optional[str]): int8 dynamic quantization config (arm64, avx2, avx512 or avx512_vnni)
+    """
+
+    import onnxruntime
+
+    file_name = export_onnx_model(model_name, quantization)
+
+    session_options = onnxruntime.SessionOptions()
+    if settings.ONNX_INTRA_OP_THREADS:
+        session_options.intra_op_num_threads = settings.ONNX_INTRA_OP_THREADS
+    session_options.inter_op_num_threads = 1
+
+    # NOTE: loaded from the export directory, so instructions keyed by model name are specified explicitly
+    return HuggingFaceEmbedding(
+        model_name=str(get_onnx_export_dir(model_name)),
+        query_instruction=get_query_instruct_for_model_name(model_name),
+        text_instruction=get_text_instruct_for_model_name(model_name),
+        device="cpu",
+        embed_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+        backend="onnx",
+        model_kwargs={
+            "file_name": file_name,
+            "provider": "CPUExecutionProvider",
+            "session_options": session_options
+        }
+    )
+
+
+def check_onnx_accuracy(model_name: str, texts: List[str], quantization: Optional[str] = settings.ONNX_QUANTIZATION) -> Dict[str, float]:
+    """
+    Compare embeddings of the ONNX model against the torch model via cosine similarity
+
+    Args:
+        model_name (str): HuggingFace model name
+        texts (List[str]): texts to embed with both models
+        quantization (Optional[str]): int8 dynamic quantization config of the ONNX model
+    """
+
+    from sentence_transformers import SentenceTransformer
+
+    torch_model = SentenceTransformer(model_name, device="cpu")
+    onnx_model = SentenceTransformer(
+        str(get_onnx_export_dir(model_name)),
+        backend="onnx",
+        device="cpu",
+        model_kwargs={"file_name": get_onnx_file_name(quantization), "provider": "CPUExecutionProvider"}
+    )
+
+    expected = torch_model.encode(texts, normalize_embeddings=True)
+    actual = onnx_model.encode(texts, normalize_embeddings=True)
+    similarities = (expected * actual).sum(axis=1)
+
+    return {
+        "min_cosine_similarity": float(similarities.min()),
+        "mean_cosine_similarity": float(similarities.mean())
+    }
+
+
+def benchmark_onnx(model_name: str, texts: List[str], quantization: Optional[str] = settings.ONNX_QUANTIZATION) -> Dict[str, float]:
+    """
+    Compare chunks/sec of the torch model against the ONNX Runtime model
+
+    Args:
+        model_name (str): HuggingFace model name
+        texts (List[str]): sample chunks to embed
+        quantization (Optional[str]): int8 dynamic quantization config of the ONNX model
+    """
+
+    # NOTE: imported here to avoid circular import, as the registry loads ONNX models
+    from .registry import load_embedding_model
+    from .batching import embed_length_bucketed
+
+    results = {}
+    for name, model in [
+        ("torch", load_embedding_model("HuggingFace", model_name, "cpu")),
+        ("onnx", load_onnx_embedding_model(model_name, quantization)),
+    ]:
+        # warm up model prior to timing
+        embed_length_bucketed(model, texts[:8])
+
+        start = time.perf_counter()
+        embed_length_bucketed(model, texts)
+        results[f"{name}_chunks_per_second"] = len(texts) / (time.perf_counter() - start)
+
+    logger.info(
+        f"Embedded {len(texts)} chunks with model={model_name}: torch={results['torch_chunks_per_second']:.2f} chunks/sec, "
+        f"onnx ({quantization or 'fp32'})={results['onnx_chunks_per_second']:.2f} chunks/sec"
+    )
+
+    return results
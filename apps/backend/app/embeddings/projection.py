@@ -0,0 +1,278 @@
+from app.core import get_sync_session_maker
+from app.models import DimensionReduction, EmbeddingProjection
+from .batching import embed_texts
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+import asyncio
+import logging
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingProjector(ABC):
+    """
+    Reduces embeddings to a lower dimensionality, re-normalizing them so cosine / l2 distances stay comparable
+    """
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+
+
+    def project(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Project batch of embeddings, returning unit length vectors
+
+        Args:
+            embeddings (np.ndarray): embeddings of shape (n, input dimensions)
+        """
+
+        projected = self._reduce(np.asarray(embeddings, dtype=np.float32))
+        norms = np.linalg.norm(projected, axis=1, keepdims=True)
+        return projected / np.maximum(norms, 1e-12)
+
+
+    @abstractmethod
+    def _reduce(self, embeddings: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+class MatryoshkaProjector(EmbeddingProjector):
+    """
+    Truncate embeddings to their leading dimensions (only meaningful for models trained with Matryoshka representation learning)
+    """
+
+    def _reduce(self, embeddings: np.ndarray) -> np.ndarray:
+        if embeddings.shape[1] < self.dimensions:
+            raise Exception(
+                f"Unable to truncate embeddings of {embeddings.shape[1]} dimensions to {self.dimensions} dimensions"
+            )
+
+        return embeddings[:, : self.dimensions]
+
+
+class PCAProjector(EmbeddingProjector):
+    """
+    Project embeddings onto the principal components fitted against sample embeddings of the model
+    """
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray):
+        super().__init__(components.shape[0])
+        self._mean = mean.astype(np.float32)
+        self._components = components.astype(np.float32)
+
+
+    @classmethod
+    def from_projection(cls, projection: EmbeddingProjection) -> "PCAProjector":
+        mean = np.frombuffer(projection.mean, dtype=np.float16)
+        components = np.frombuffer(projection.components, dtype=np.float16).reshape(
+            projection.dimensions, projection.input_dimensions
+        )
+        return cls(mean, components)
+
+
+    def _reduce(self, embeddings: np.ndarray) -> np.ndarray:
+        return (embeddings - self._mean) @ self._components.T
+
+
+def fit_pca(embeddings: np.ndarray, dimensions: int) -> Tuple[PCAProjector, float]:
+    """
+    Fit PCA projection against sample embeddings, returning the projector & the ratio of variance retained
+
+    Args:
+        embeddings (np.ndarray): sample embeddings of shape (n, input dimensions)
+        dimensions (int): dimensionality to project embeddings to
+    """
+
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if dimensions >= embeddings.shape[1]:
+        raise Exception(f"Projected dimensions ({dimensions}) must be less than the model's ({embeddings.shape[1]})")
+    if len(embeddings) < dimensions:
+        raise Exception(f"At least {dimensions} sample embeddings are needed to fit a {dimensions} dimension projection")
+
+    mean = embeddings.mean(axis=0)
+    _, singular_values, components = np.linalg.svd(embeddings - mean, full_matrices=False)
+
+    variance = singular_values ** 2
+    explained_variance = float(variance[:dimensions].sum() / variance.sum())
+
+    return PCAProjector(mean, components[:dimensions]), explained_variance
+
+
+def fit_pca_projection(model_name: str, embeddings: np.ndarray, dimensions: int) -> EmbeddingProjection:
+    """
+    Fit PCA projection against sample embeddings of the model & persist it (replacing any previous fit)
+
+    NOTE: mean & components are persisted as fp16, halving their size with negligible loss in recall
+
+    Args:
+        model_name (str): embedding model the sample embeddings were computed with
+        embeddings (np.ndarray): sample embeddings of shape (n, input dimensions)
+        dimensions (int): dimensionality to project embeddings to
+    """
+
+    projector, explained_variance = fit_pca(embeddings, dimensions)
+
+    projection = EmbeddingProjection(
+        model_name=model_name,
+        dimensions=dimensions,
+        input_dimensions=projector._components.shape[1],
+        mean=projector._mean.astype(np.float16).tobytes(),
+        components=projector._components.astype(np.float16).tobytes(),
+        explained_variance=explained_variance,
+        sample_count=len(embeddings)
+    )
+
+    session_maker = get_sync_session_maker()
+    with session_maker() as session:
+        projection = session.merge(projection)
+        session.commit()
+        session.refresh(projection)
+
+    with _projectors_lock:
+        _projectors.pop((model_name, DimensionReduction.PCA, dimensions), None)
+
+    logger.info(
+        f"Fitted PCA projection for model={model_name} to {dimensions} dimensions against {len(embeddings)} "
+        f"samples, retaining {explained_variance:.2%} of variance"
+    )
+
+    return projection
+
+
+# projectors shared across IngestionJobs & queries, keyed by (model name, reduction, dimensions)
+_projectors: Dict[Tuple[str, DimensionReduction, int], EmbeddingProjector] = {}
+_projectors_lock = threading.Lock()
+
+
+def get_projector(model_name: str, reduction: DimensionReduction, dimensions: int) -> EmbeddingProjector:
+    """
+    Retrieve projector reducing embeddings of the model to the specified dimensionality
+
+    Args:
+        model_name (str): embedding model name
+        reduction (DimensionReduction): how embeddings are reduced
+        dimensions (int): dimensionality to project embeddings to
+    """
+
+    key = (model_name, reduction, dimensions)
+
+    with _projectors_lock:
+        if key not in _projectors:
+            if reduction == DimensionReduction.MATRYOSHKA:
+                _projectors[key] = MatryoshkaProjector(dimensions)
+            else:
+                session_maker = get_sync_session_maker()
+                with session_maker() as session:
+                    projection = session.get(EmbeddingProjection, (model_name, dimensions))
+
+                if not projection:
+                    raise Exception(
+                        f"No PCA projection fitted for model={model_name} with {dimensions} dimensions, "
+                        f"fit one with: python -m app.cli fit-projection --model {model_name} --dimensions {dimensions}"
+                    )
+
+                _projectors[key] = PCAProjector.from_projection(projection)
+
+        return _projectors[key]
+
+
+class ProjectedEmbedding(BaseEmbedding):
+    """
+    Embedding model wrapper reducing the dimensionality of both text & query embeddings, so chunks are stored
+    & searched within the same reduced space
+    """
+
+    dimensions: int = Field(description="Dimensionality embeddings are projected to")
+
+    _base_model: BaseEmbedding = PrivateAttr()
+    _projector: EmbeddingProjector = PrivateAttr()
+
+    def __init__(self, base_model: BaseEmbedding, projector: EmbeddingProjector, **kwargs: Any):
+        kwargs.setdefault("embed_batch_size", base_model.embed_batch_size)
+        super().__init__(model_name=base_model.model_name, dimensions=projector.dimensions, **kwargs)
+        self._base_model = base_model
+        self._projector = projector
+
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "ProjectedEmbedding"
+
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._project([self._base_model.get_query_embedding(query)])[0]
+
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return await asyncio.to_thread(self._get_query_embedding, query)
+
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        # NOTE: embed via the base model so local models still bucket texts by token length
+        return self._project(embed_texts(self._base_model, texts))
+
+
+    def _project(self, embeddings: List[Embedding]) -> List[Embedding]:
+        return self._projector.project(np.asarray(embeddings, dtype=np.float32)).tolist()
+
+
+def benchmark_projection_recall(
+        embeddings: np.ndarray,
+        projector: EmbeddingProjector,
+        k: int = 10,
+        num_queries: Optional[int] = 200
+) -> Dict[str, float]:
+    """
+    Measure recall@k of nearest neighbour search over projected embeddings against the full embeddings, using
+    sample embeddings as both queries & corpus (excluding each query from its own neighbours)
+
+    Args:
+        embeddings (np.ndarray): normalized full dimensionality sample embeddings of shape (n, input dimensions)
+        projector (EmbeddingProjector): projector to benchmark
+        k (int): number of neighbours retrieved per query
+        num_queries (Optional[int]): number of sample embeddings used as queries (all when None)
+    """
+
+    full = np.asarray(embeddings, dtype=np.float32)
+    full = full / np.maximum(np.linalg.norm(full, axis=1, keepdims=True), 1e-12)
+    reduced = projector.project(full)
+
+    num_queries = min(num_queries or len(full), len(full))
+    k = min(k, len(full) - 1)
+
+    def top_k(vectors: np.ndarray) -> np.ndarray:
+        similarities = vectors[:num_queries] @ vectors.T
+        similarities[np.arange(num_queries), np.arange(num_queries)] = -np.inf
+        return np.argpartition(-similarities, k, axis=1)[:, :k]
+
+    expected, actual = top_k(full), top_k(reduced)
+    recall = float(np.mean([len(set(e) & set(a)) / k for e, a in zip(expected, actual)]))
+
+    results = {
+        "recall_at_k": recall,
+        "k": k,
+        "full_dimensions": full.shape[1],
+        "reduced_dimensions": reduced.shape[1],
+        "full_bytes_per_vector": full.shape[1] * 4,
+        "reduced_bytes_per_vector": reduced.shape[1] * 4
+    }
+
+    logger.info(
+        f"Projected {full.shape[1]} to {reduced.shape[1]} dimensions with {type(projector).__name__}: "
+        f"recall@{k}={recall:.4f} over {num_queries} queries, {results['reduced_bytes_per_vector']} bytes per "
+        f"vector (vs {results['full_bytes_per_vector']})"
+    )
+
+    return results
@@ -0,0 +1,90 @@
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import socket
+import struct
+import json
+
+
+# each frame is prefixed by the length of its JSON header & its binary payload (i.e float32 embeddings)
+_FRAME_PREFIX = struct.Struct("!II")
+
+
+def encode_frame(header: Dict[str, Any], payload: bytes = b"") -> bytes:
+    """
+    Encode a frame sent between the embedding server & its clients
+
+    Args:
+        header (Dict[str, Any]): JSON serializable header
+        payload (bytes): binary payload
+    """
+
+    encoded_header = json.dumps(header).encode()
+    return _FRAME_PREFIX.pack(len(encoded_header), len(payload)) + encoded_header + payload
+
+
+def send_frame(sock: socket.socket, header: Dict[str, Any], payload: bytes = b""):
+    """
+    Send frame over a blocking socket
+
+    Args:
+        sock (socket.socket): connected socket
+        header (Dict[str, Any]): JSON serializable header
+        payload (bytes): binary payload
+    """
+
+    sock.sendall(encode_frame(header, payload))
+
+
+def recv_frame(sock: socket.socket) -> Tuple[Dict[str, Any], bytes]:
+    """
+    Receive frame over a blocking socket
+
+    Args:
+        sock (socket.socket): connected socket
+    """
+
+    header_length, payload_length = _FRAME_PREFIX.unpack(_recv_exactly(sock, _FRAME_PREFIX.size))
+    header = json.loads(_recv_exactly(sock, header_length))
+    return header, _recv_exactly(sock, payload_length)
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """
+    Read frame from an asyncio stream, returning None once the peer closes the connection
+
+    Args:
+        reader (asyncio.StreamReader): stream to read from
+    """
+
+    try:
+        header_length, payload_length = _FRAME_PREFIX.unpack(await reader.readexactly(_FRAME_PREFIX.size))
+    except asyncio.IncompleteReadError:
+        return None
+
+    header = json.loads(await reader.readexactly(header_length))
+    return header, await reader.readexactly(payload_length)
+
+
+async def write_frame(writer: asyncio.StreamWriter, header: Dict[str, Any], payload: bytes = b""):
+    """
+    Write frame to an asyncio stream
+
+    Args:
+        writer (asyncio.StreamWriter): stream to write to
+        header (Dict[str, Any]): JSON serializable header
+        payload (bytes): binary payload
+    """
+
+    writer.write(encode_frame(header, payload))
+    await writer.drain()
+
+
+def _recv_exactly(sock: socket.socket, length: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < length:
+        data = sock.recv(length - len(buffer))
+        if not data:
+            raise ConnectionError("Embedding server closed the connection")
+        buffer.extend(data)
+
+    return bytes(buffer)
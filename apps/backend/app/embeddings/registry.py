@@ -0,0 +1,199 @@
+from app.core import settings
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import threading
+import logging
+import time
+import gc
+
+
+logger = logging.getLogger(__name__)
+
+# embedding providers whose models run on this host
+LOCAL_EMBEDDING_PROVIDERS = {"HuggingFace", "HuggingFaceONNX"}
+
+
+def load_embedding_model(provider: str, model_name: str, device: Optional[str] = None) -> BaseEmbedding:
+    """
+    Load embedding model for the specified provider
+
+    Args:
+        provider (str): embedding provider
+        model_name (str): embedding model name
+        device (Optional[str]): device to load local models onto (inferred when not specified)
+    """
+
+    match provider:
+
+        # Local Embedding Providers
+        case "HuggingFace":
+            from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+            # NOTE: batches are formed by token budget beforehand, so each call is encoded as a single batch
+            return HuggingFaceEmbedding(
+                model_name=model_name,
+                device=device,
+                embed_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE
+            )
+        case "HuggingFaceONNX":
+            from .onnx_backend import load_onnx_embedding_model
+
+            return load_onnx_embedding_model(model_name)
+        case _:
+            logging.error(
+                f"The embedidng provider specified, '{provider}', is not curretly set up for this application"
+            )
+            raise Exception(
+                f"Invalid embedding provider specified: {provider}"
+            )
+
+
+def estimate_model_bytes(model: BaseEmbedding) -> int:
+    """
+    Estimate the memory held by a loaded embedding model from the size of its weights
+
+    Args:
+        model (BaseEmbedding): loaded embedding model
+    """
+
+    # NOTE: HuggingFaceEmbedding wraps a SentenceTransformer (torch module)
+    module = getattr(model, "_model", None)
+    if module is None or not hasattr(module, "parameters"):
+        return 0
+
+    tensors = list(module.parameters()) + list(module.buffers())
+    size = sum(t.numel() * t.element_size() for t in tensors)
+
+    # ONNX Runtime models hold their weights outside of torch
+    model_path = getattr(getattr(module[0], "auto_model", None), "model_path", None)
+    if not size and model_path:
+        size = Path(model_path).stat().st_size
+
+    return size
+
+
+class EmbeddingModelRegistry:
+    """
+    Shares loaded embedding models across IngestionJobs & Projects, keyed by (provider, model name, device)
+
+    NOTE: Once the memory held by loaded models exceeds the budget, the least recently used models are evicted
+    (the most recently used model is always kept, even if it alone exceeds the budget). Models are loaded outside
+    of the registry lock, so loading one model does not block retrieving the others
+    """
+
+    def __init__(self, memory_budget: int):
+        self._memory_budget = memory_budget
+        self._models: OrderedDict[Tuple[str, str, Optional[str]], Tuple[BaseEmbedding, int]] = OrderedDict()
+        self._loading: Dict[Tuple[str, str, Optional[str]], Future] = {}
+        self._lock = threading.Lock()
+
+
+    @property
+    def memory_used(self) -> int:
+        return sum(size for _, size in self._models.values())
+
+
+    def get(self, provider: str, model_name: str, device: Optional[str] = None) -> BaseEmbedding:
+        """
+        Retrieve embedding model, loading it on first use
+
+        Args:
+            provider (str): embedding provider
+            model_name (str): embedding model name
+            device (Optional[str]): device to load local models onto
+        """
+
+        key = (provider, model_name, device)
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key][0]
+
+            # NOTE: concurrent callers of a model being loaded wait on the caller loading it
+            future = self._loading.get(key)
+            is_loader = future is None
+            if is_loader:
+                future = self._loading[key] = Future()
+
+        if not is_loader:
+            return future.result()
+
+        try:
+            start = time.perf_counter()
+            model = load_embedding_model(provider, model_name, device)
+            size = estimate_model_bytes(model)
+        except Exception as e:
+            with self._lock:
+                self._loading.pop(key, None)
+            future.set_exception(e)
+            raise e
+
+        logger.info(
+            f"Loaded embedding model={model_name} from provider={provider} onto device={device or 'auto'} "
+            f"in {time.perf_counter() - start:.2f} seconds ({size // 1024**2}MB)"
+        )
+
+        with self._lock:
+            self._loading.pop(key, None)
+            self._models[key] = (model, size)
+            evicted = self._evict()
+
+        future.set_result(model)
+
+        # NOTE: models still in use by running IngestionJobs are released once those jobs finish
+        if evicted:
+            gc.collect()
+
+        return model
+
+
+    def clear(self):
+        """
+        Release each of the loaded embedding models
+        """
+
+        with self._lock:
+            self._models.clear()
+        gc.collect()
+
+
+    def _evict(self) -> bool:
+        """
+        Evict least recently used models until the memory held by loaded models is within budget, returning
+        whether any model was evicted
+        """
+
+        evicted = False
+        while len(self._models) > 1 and self.memory_used > self._memory_budget:
+            (provider, model_name, device), (_, size) = self._models.popitem(last=False)
+            logger.info(
+                f"Evicting embedding model={model_name} from provider={provider} on device={device or 'auto'} "
+                f"({size // 1024**2}MB) to stay within memory budget of {self._memory_budget // 1024**2}MB"
+            )
+            evicted = True
+
+        return evicted
+
+
+_registry: Optional[EmbeddingModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_embedding_model_registry() -> EmbeddingModelRegistry:
+    """
+    Retrieve the process-wide embedding model registry
+    """
+
+    global _registry
+
+    with _registry_lock:
+        if _registry is None:
+            _registry = EmbeddingModelRegistry(settings.EMBEDDING_MODEL_MEMORY_BUDGET_MB * 1024**2)
+
+        return _registry
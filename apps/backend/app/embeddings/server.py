@@ -0,0 +1,195 @@
+from app.core import settings, setup_logging
+from .protocol import read_frame, write_frame
+from .worker import get_embedding_worker_pool, shutdown_embedding_workers
+from .batcher import get_query_batcher
+
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from typing import Optional
+import multiprocessing
+import asyncio
+import logging
+import signal
+import socket
+import fcntl
+import time
+import os
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingServer:
+    """
+    Local embedding server owning the embedding worker pools, shared by API requests & IngestionJobs over a Unix socket
+
+    NOTE: Each model is loaded by a pool of worker processes; throughput scales by adding workers per model rather than
+    loading the model within every caller
+    """
+
+    def __init__(self, socket_path: str):
+        self._socket_path = socket_path
+
+
+    async def serve(self):
+        """
+        Accept client connections until the server process is terminated
+        """
+
+        server = await asyncio.start_unix_server(self._handle_connection, path=self._socket_path)
+
+        # only processes running as the same user may connect
+        os.chmod(self._socket_path, 0o600)
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, server.close)
+
+        logger.info(f"Embedding server listening on socket={self._socket_path} with pid={os.getpid()}")
+
+        async with server:
+            try:
+                await server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+        logger.info("Embedding server shutting down")
+
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serve embedding requests sent over a client connection, one at a time
+
+        Args:
+            reader (asyncio.StreamReader): stream of client requests
+            writer (asyncio.StreamWriter): stream of responses to the client
+        """
+
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+
+                request, _ = frame
+                key = (request["provider"], request["model_name"], request["device"])
+                try:
+                    # micro batch concurrent queries from each client into a single forward pass
+                    if request["kind"] == "query":
+                        batcher = get_query_batcher(*key)
+                        embeddings = await asyncio.gather(
+                            *[asyncio.wrap_future(batcher.submit(query)) for query in request["inputs"]]
+                        )
+                    else:
+                        pool = get_embedding_worker_pool(*key)
+                        embeddings = await asyncio.to_thread(pool.run, (request["kind"], request["inputs"]))
+                except Exception as e:
+                    logger.error(f"Failed to embed {len(request['inputs'])} inputs with model={request['model_name']}: {str(e)}")
+                    await write_frame(writer, {"status": "error", "error": str(e)})
+                    continue
+
+                embeddings = np.asarray(embeddings, dtype=np.float32)
+                await write_frame(writer, {"status": "ok", "shape": list(embeddings.shape)}, embeddings.tobytes())
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+
+        finally:
+            writer.close()
+
+
+def run_embedding_server(socket_path: str = settings.EMBEDDING_SERVER_SOCKET):
+    """
+    Run the embedding server until terminated, unless another server already owns the socket
+
+    Args:
+        socket_path (str): path of the Unix socket to listen on
+    """
+
+    setup_logging()
+
+    # NOTE: the lock is held for the lifetime of the server, so a live server's socket is never replaced
+    lock_file = open(f"{socket_path}.lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        logger.info(f"Embedding server already running on socket={socket_path}")
+        return
+
+    # remove socket left behind by a server which did not shut down cleanly
+    Path(socket_path).unlink(missing_ok=True)
+
+    try:
+        asyncio.run(EmbeddingServer(socket_path).serve())
+    finally:
+        shutdown_embedding_workers()
+        Path(socket_path).unlink(missing_ok=True)
+        lock_file.close()
+
+
+def is_embedding_server_running(socket_path: str = settings.EMBEDDING_SERVER_SOCKET) -> bool:
+    """
+    Check whether an embedding server is accepting connections on the socket
+
+    Args:
+        socket_path (str): path of the Unix socket
+    """
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+            return True
+        except OSError:
+            return False
+
+
+_server_process: Optional[BaseProcess] = None
+
+
+def start_embedding_server(socket_path: str = settings.EMBEDDING_SERVER_SOCKET, timeout: float = 30):
+    """
+    Spawn embedding server process (unless one is already running) & wait for it to accept connections
+
+    Args:
+        socket_path (str): path of the Unix socket to listen on
+        timeout (float): seconds to wait for the server to accept connections
+    """
+
+    global _server_process
+
+    if is_embedding_server_running(socket_path):
+        logger.info(f"Using running embedding server on socket={socket_path}")
+        return
+
+    # NOTE: not daemonic, as the server spawns its own worker processes
+    ctx = multiprocessing.get_context("spawn")
+    _server_process = ctx.Process(target=run_embedding_server, args=(socket_path,), name="embedding-server")
+    _server_process.start()
+
+    # NOTE: the spawned process exits cleanly when another process started a server first, so keep waiting on the socket
+    deadline = time.monotonic() + timeout
+    while not is_embedding_server_running(socket_path):
+        if _server_process.exitcode or time.monotonic() > deadline:
+            raise Exception(f"Embedding server failed to start on socket={socket_path}")
+        time.sleep(0.1)
+
+
+def stop_embedding_server():
+    """
+    Terminate the embedding server process spawned by this process (if any)
+    """
+
+    global _server_process
+
+    if not _server_process:
+        return
+
+    _server_process.terminate()
+    _server_process.join(timeout=30)
+    if _server_process.is_alive():
+        _server_process.kill()
+        _server_process.join()
+
+    _server_process = None
@@ -0,0 +1,97 @@
+from app.core import settings, get_sync_session_maker
+from app.models import ModelConfigs
+from .registry import LOCAL_EMBEDDING_PROVIDERS
+
+from sqlalchemy import select
+from transformers import AutoTokenizer, PreTrainedTokenizerBase
+
+from typing import Dict, Iterable, Set
+import threading
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# tokenizers shared across IngestionJobs, keyed by model name
+_tokenizers: Dict[str, PreTrainedTokenizerBase] = {}
+_tokenizers_lock = threading.Lock()
+
+
+def get_tokenizer(model_name: str) -> PreTrainedTokenizerBase:
+    """
+    Retrieve the fast (Rust backed) tokenizer for the specified model, loading it on first use
+
+    Args:
+        model_name (str): HuggingFace model name
+    """
+
+    tokenizer = _tokenizers.get(model_name)
+    if tokenizer:
+        return tokenizer
+
+    with _tokenizers_lock:
+
+        # another thread may have loaded the tokenizer while waiting on the lock
+        if model_name not in _tokenizers:
+            start = time.perf_counter()
+            tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+
+            if not tokenizer.is_fast:
+                logger.warning(f"No fast tokenizer available for model={model_name}; falling back to slow tokenizer")
+
+            logger.info(f"Loaded tokenizer for model={model_name} in {time.perf_counter() - start:.2f} seconds")
+            _tokenizers[model_name] = tokenizer
+
+        return _tokenizers[model_name]
+
+
+def get_configured_tokenizer_models() -> Set[str]:
+    """
+    Retrieve the names of each local embedding model configured by default or by a Project
+    """
+
+    model_names = set()
+    if settings.DOCS_EMBEDDING_PROVIDER in LOCAL_EMBEDDING_PROVIDERS:
+        model_names.add(settings.DOCS_EMBEDDING_MODEL)
+    if settings.CODE_EMBEDDING_PROVIDER in LOCAL_EMBEDDING_PROVIDERS and settings.CODE_EMBEDDING_MODEL:
+        model_names.add(settings.CODE_EMBEDDING_MODEL)
+
+    session_maker = get_sync_session_maker()
+    with session_maker() as session:
+        for docs_provider, docs_model, code_provider, code_model in session.execute(
+            select(
+                ModelConfigs.docs_embedding_provider,
+                ModelConfigs.docs_embedding_model,
+                ModelConfigs.code_embedding_provider,
+                ModelConfigs.code_embedding_model
+            ).distinct()
+        ):
+            if docs_provider in LOCAL_EMBEDDING_PROVIDERS and docs_model:
+                model_names.add(docs_model)
+            if code_provider in LOCAL_EMBEDDING_PROVIDERS and code_model:
+                model_names.add(code_model)
+
+    return model_names
+
+
+def preload_tokenizers(model_names: Iterable[str] = None):
+    """
+    Load tokenizers ahead of the first IngestionJob so tokenizer setup is not part of any job
+
+    Args:
+        model_names (Iterable[str]): models to load tokenizers for, defaulting to each configured model
+    """
+
+    if model_names is None:
+        try:
+            model_names = get_configured_tokenizer_models()
+        except Exception as e:
+            logger.warning(f"Failed to retrieve configured embedding models to preload tokenizers for: {str(e)}")
+            return
+
+    for model_name in model_names:
+        try:
+            get_tokenizer(model_name)
+        except Exception as e:
+            logger.warning(f"Failed to preload tokenizer for model={model_name}: {str(e)}")
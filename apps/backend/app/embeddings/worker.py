@@ -0,0 +1,262 @@
+from app.core import settings, setup_logging
+from app.workers import ProcessWorker, get_process_rss
+from .registry import get_embedding_model_registry
+from .batching import embed_texts, embed_queries
+from .batcher import get_query_batcher
+from .client import get_embedding_client
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.bridge.pydantic import Field
+
+from collections import OrderedDict
+from queue import Queue
+from typing import Any, List, Optional, Tuple
+import threading
+import asyncio
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def _init_embedding_worker(provider: str, model_name: str, device: Optional[str]) -> BaseEmbedding:
+    """
+    Initialize embedding worker process by loading the embedding model
+
+    Args:
+        provider (str): embedding provider
+        model_name (str): embedding model name
+        device (Optional[str]): device to load the model onto
+    """
+
+    setup_logging()
+    return get_embedding_model_registry().get(provider, model_name, device)
+
+
+def _embed(model: BaseEmbedding, task: Tuple[str, List[str]]) -> List[Embedding]:
+    """
+    Embed a batch of texts or queries within the embedding worker process
+
+    Args:
+        model (BaseEmbedding): embedding model owned by the worker process
+        task (Tuple[str, List[str]]): kind of input ("text" or "query") & the inputs to embed
+    """
+
+    kind, inputs = task
+
+    if kind == "query":
+        return embed_queries(model, inputs)
+
+    return embed_texts(model, inputs)
+
+
+class EmbeddingWorkerPool:
+    """
+    Pool of recyclable embedding worker processes loading the same model, each task running on the next
+    idle worker (throughput scales by adding workers rather than loading the model within each caller)
+    """
+
+    def __init__(self, provider: str, model_name: str, device: Optional[str] = None, size: int = 1):
+        self.model_name = model_name
+
+        self._workers = [
+            ProcessWorker(
+                name=f"embedding-{model_name}-{i}",
+                initializer=_init_embedding_worker,
+                init_args=(provider, model_name, device),
+                handler=_embed,
+                max_tasks=settings.EMBEDDING_WORKER_MAX_TASKS,
+                recycle_rss=settings.EMBEDDING_WORKER_RECYCLE_RSS_MB * 1024**2
+            )
+            for i in range(size)
+        ]
+
+        self._idle: Queue = Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+        self._in_flight = 0
+        self._retired = False
+        self._state_lock = threading.Lock()
+
+
+    @property
+    def rss(self) -> int:
+        return sum(get_process_rss(worker.pid) for worker in self._workers if worker.is_alive)
+
+
+    @property
+    def busy(self) -> bool:
+        return self._in_flight > 0
+
+
+    def run(self, task: Tuple[str, List[str]]) -> List[Embedding]:
+        """
+        Run embedding task on the next idle worker, starting the worker process if needed
+
+        Args:
+            task (Tuple[str, List[str]]): kind of input ("text" or "query") & the inputs to embed
+        """
+
+        with self._state_lock:
+            self._in_flight += 1
+
+        worker = self._idle.get()
+        try:
+            return worker.run(task)
+        finally:
+            # NOTE: callers may still hold a pool evicted while they were waiting, so its workers are stopped once done
+            if self._retired:
+                worker.stop()
+
+            self._idle.put(worker)
+            with self._state_lock:
+                self._in_flight -= 1
+
+
+    def stop(self):
+        """
+        Stop each of the worker processes (re-spawned on their next task)
+        """
+
+        for worker in self._workers:
+            worker.stop()
+
+
+    def retire(self):
+        """
+        Stop each of the worker processes of a pool no longer shared, including those of any tasks still to complete
+        """
+
+        self._retired = True
+        self.stop()
+
+
+# embedding worker pools shared across IngestionJobs, keyed by (provider, model name, device) in LRU order
+_pools: OrderedDict[Tuple[str, str, Optional[str]], EmbeddingWorkerPool] = OrderedDict()
+_pools_lock = threading.Lock()
+
+
+def get_embedding_worker_pool(provider: str, model_name: str, device: Optional[str] = None) -> EmbeddingWorkerPool:
+    """
+    Retrieve the embedding worker pool for the specified model, creating it if needed
+
+    NOTE: Once the combined RSS of the embedding workers exceeds the model memory budget, the least recently used
+    idle pools are evicted & stopped (and re-created on their next use)
+
+    Args:
+        provider (str): embedding provider
+        model_name (str): embedding model name
+        device (Optional[str]): device to load the model onto
+    """
+
+    with _pools_lock:
+        key = (provider, model_name, device)
+        if key not in _pools:
+            _pools[key] = EmbeddingWorkerPool(provider, model_name, device, size=settings.EMBEDDING_WORKERS_PER_MODEL)
+
+        _pools.move_to_end(key)
+        evicted = _evict_embedding_worker_pools(settings.EMBEDDING_MODEL_MEMORY_BUDGET_MB * 1024**2)
+
+        pool = _pools[key]
+
+    # NOTE: stopping a worker waits on its current task, so evicted pools are stopped without holding the lock
+    for evicted_pool in evicted:
+        evicted_pool.retire()
+
+    return pool
+
+
+def _evict_embedding_worker_pools(memory_budget: int) -> List[EmbeddingWorkerPool]:
+    """
+    Remove least recently used idle embedding worker pools until their combined RSS is within the memory budget,
+    returning the pools removed (to be stopped by the caller)
+
+    Args:
+        memory_budget (int): number of bytes embedding workers may hold
+    """
+
+    rss = {key: pool.rss for key, pool in _pools.items()}
+    evicted = []
+
+    for key in list(_pools)[:-1]:
+        if sum(rss.values()) <= memory_budget:
+            break
+
+        # pools with tasks in flight are skipped, rather than waiting on (or killing) their tasks
+        if rss[key] and not _pools[key].busy:
+            logger.info(
+                f"Stopping embedding workers for model={key[1]} ({rss.pop(key) // 1024**2}MB) "
+                f"to stay within memory budget of {memory_budget // 1024**2}MB"
+            )
+            evicted.append(_pools.pop(key))
+
+    return evicted
+
+
+def shutdown_embedding_workers():
+    """
+    Stop each of the embedding worker processes
+    """
+
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.retire()
+
+
+class WorkerEmbedding(BaseEmbedding):
+    """
+    Embedding model proxy computing embeddings within recyclable embedding worker processes, either owned by
+    the shared embedding server (when enabled) or by the calling process
+    """
+
+    provider: str = Field(description="Embedding provider of the model loaded by the worker process")
+    device: Optional[str] = Field(default=None, description="Device the worker process loads the model onto")
+
+    def __init__(self, provider: str, model_name: str, device: Optional[str] = None, **kwargs: Any):
+        # send whole batches of chunks to the worker, which buckets them by token length
+        kwargs.setdefault("embed_batch_size", settings.INGESTION_BATCH_SIZE)
+        super().__init__(provider=provider, model_name=model_name, device=device, **kwargs)
+
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "WorkerEmbedding"
+
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        # NOTE: the embedding server micro batches queries itself
+        if settings.EMBEDDING_SERVER_ENABLED:
+            return self._run("query", [query])[0]
+
+        return get_query_batcher(self.provider, self.model_name, self.device).embed(query)
+
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return await asyncio.to_thread(self._get_query_embedding, query)
+
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._run("text", [text])[0]
+
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return self._run("text", texts)
+
+
+    def _run(self, kind: str, inputs: List[str]) -> List[Embedding]:
+        """
+        Send batch of inputs to an embedding worker process
+
+        Args:
+            kind (str): kind of input ("text" or "query")
+            inputs (List[str]): inputs to embed
+        """
+
+        if settings.EMBEDDING_SERVER_ENABLED:
+            return get_embedding_client().embed(self.provider, self.model_name, self.device, kind, inputs)
+
+        return get_embedding_worker_pool(self.provider, self.model_name, self.device).run((kind, inputs))
@@ -0,0 +1,23 @@
+from .pipeline import IngestionPipeline, StageTiming
+from .records import ChunkRecord
+from .writer import VectorWriter
+from .archive import export_collections, import_collections, iter_collection
+from .rebuild import CollectionRebuild, copy_collection, garbage_collect_collections
+from .reembed import reembed_collection
+from .locks import CollectionLock, lock_collections_for_write
+
+__all__ = [
+    "IngestionPipeline",
+    "StageTiming",
+    "ChunkRecord",
+    "VectorWriter",
+    "export_collections",
+    "import_collections",
+    "iter_collection",
+    "CollectionRebuild",
+    "copy_collection",
+    "garbage_collect_collections",
+    "reembed_collection",
+    "CollectionLock",
+    "lock_collections_for_write"
+]
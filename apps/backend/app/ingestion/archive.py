@@ -0,0 +1,251 @@
+from app.core import settings, ChromaClientManager, CollectionTarget
+from .writer import VectorWriter
+from .locks import lock_collections_for_write
+
+from chromadb.api.models.Collection import Collection
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import tempfile
+import tarfile
+import logging
+import json
+import time
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_VERSION = 1
+
+
+def export_collections(
+        chroma_manager: ChromaClientManager,
+        collections: Dict[str, CollectionTarget],
+        archive_path: Path
+) -> Dict[str, int]:
+    """
+    Export Chroma collections to a tar archive holding, per collection, a float32 NPY file of the vectors
+    (row i belonging to line i of the JSONL file) plus a JSONL file of the ids, documents & metadata
+
+    NOTE: Vectors are written a page at a time into a memory mapped NPY file, so memory is bounded by
+    the page size rather than the collection size. Partitions of shared collections are exported without
+    their partition id prefix & metadata, so archives restore into either collection layout.
+
+    Args:
+        chroma_manager (ChromaClientManager): manager of the Chroma client to export from
+        collections (Dict[str, CollectionTarget]): collections (or partitions) keyed by source type (i.e DOCS or CODE)
+        archive_path (Path): path of the tar archive to write
+    """
+
+    counts = {}
+    manifest: Dict[str, Any] = {"version": ARCHIVE_VERSION, "collections": {}}
+
+    Path(settings.TMP).mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=settings.TMP) as tmp_dir:
+        with tarfile.open(archive_path, "w") as archive:
+            for source_type, target in collections.items():
+                start = time.perf_counter()
+                collection = chroma_manager.get_collection(target.name)
+
+                count, dimensions = _export_collection(collection, target, Path(tmp_dir), source_type)
+                archive.add(Path(tmp_dir) / f"{source_type}.jsonl", arcname=f"{source_type}.jsonl")
+                archive.add(Path(tmp_dir) / f"{source_type}.npy", arcname=f"{source_type}.npy")
+
+                manifest["collections"][source_type] = {
+                    "name": target.name,
+                    "count": count,
+                    "dimensions": dimensions,
+                    "metadata": collection.metadata
+                }
+                counts[source_type] = count
+
+                logger.info(
+                    f"Exported {count} vectors from collection={target.name} in {time.perf_counter() - start:.2f}s"
+                )
+
+            manifest_path = Path(tmp_dir) / "manifest.json"
+            manifest_path.write_text(json.dumps(manifest))
+            archive.add(manifest_path, arcname="manifest.json")
+
+    return counts
+
+
+def import_collections(
+        chroma_manager: ChromaClientManager,
+        archive_path: Path,
+        collections: Dict[str, CollectionTarget],
+        batch_size: int = settings.CHROMA_IMPORT_BATCH_SIZE
+) -> Dict[str, int]:
+    """
+    Restore Chroma collections from an archive written by export_collections, bulk upserting large batches
+    (creating collections which do not exist yet)
+
+    Args:
+        chroma_manager (ChromaClientManager): manager of the Chroma client to import into
+        archive_path (Path): path of the tar archive to read
+        collections (Dict[str, CollectionTarget]): collections (or partitions) to restore into keyed by source
+            type, source types missing from the archive are skipped
+        batch_size (int): number of vectors per upsert
+    """
+
+    counts = {}
+
+    Path(settings.TMP).mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=settings.TMP) as tmp_dir:
+        with tarfile.open(archive_path, "r") as archive:
+            archive.extractall(tmp_dir, filter="data")
+
+        manifest = json.loads((Path(tmp_dir) / "manifest.json").read_text())
+        if manifest.get("version") != ARCHIVE_VERSION:
+            raise Exception(f"Unsupported collection archive version: {manifest.get('version')}")
+
+        for source_type, target in collections.items():
+            entry = manifest["collections"].get(source_type)
+            if not entry:
+                logger.warning(f"No {source_type} collection found within archive={archive_path}, skipping")
+                continue
+
+            start = time.perf_counter()
+            with lock_collections_for_write(chroma_manager, [target.name]):
+                collection = _get_or_create_collection(chroma_manager, target.name, entry.get("metadata"))
+
+                vectors = np.load(Path(tmp_dir) / f"{source_type}.npy", mmap_mode="r")
+                writer = VectorWriter(
+                    collection, batch_size=min(batch_size, _get_max_batch_size(chroma_manager)), target=target
+                )
+                try:
+                    offset = 0
+                    for lines in _read_batches(Path(tmp_dir) / f"{source_type}.jsonl", batch_size):
+                        writer.upsert(
+                            ids=[line["id"] for line in lines],
+                            embeddings=np.asarray(vectors[offset : offset + len(lines)]),
+                            metadatas=[line["metadata"] for line in lines],
+                            documents=[line["document"] for line in lines]
+                        )
+                        offset += len(lines)
+
+                    writer.flush()
+                finally:
+                    writer.close()
+
+            counts[source_type] = writer.count
+            logger.info(
+                f"Imported {writer.count} vectors into collection={target.name} in {time.perf_counter() - start:.2f}s"
+            )
+
+    return counts
+
+
+def _export_collection(collection: Collection, target: CollectionTarget, tmp_dir: Path, source_type: str) -> Tuple[int, int]:
+    """
+    Page through collection (or partition), writing its vectors & entries to the temporary directory
+
+    Args:
+        collection (Collection): collection to export
+        target (CollectionTarget): partition of the collection to export
+        tmp_dir (Path): directory to write files to
+        source_type (str): source type of the collection, used to name files
+    """
+
+    # NOTE: Chroma can't count filtered entries, so partitions are counted by retrieving their ids only
+    total = len(collection.get(where=target.scope(), include=[])["ids"]) if target.shared else collection.count()
+    page_size = settings.CHROMA_STREAM_PAGE_SIZE
+
+    vectors: Optional[np.memmap] = None
+    count = 0
+
+    with open(tmp_dir / f"{source_type}.jsonl", "w") as jsonl:
+        for page in iter_collection(collection, ["embeddings", "documents", "metadatas"], page_size, target.scope()):
+            embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+
+            # NOTE: collections may change while being exported, so never write past the count taken up front
+            rows = min(len(page["ids"]), total - count)
+            if rows <= 0:
+                break
+
+            if vectors is None:
+                vectors = np.lib.format.open_memmap(
+                    tmp_dir / f"{source_type}.npy", mode="w+", dtype=np.float32, shape=(total, embeddings.shape[1])
+                )
+
+            vectors[count : count + rows] = embeddings[:rows]
+            for i in range(rows):
+                jsonl.write(json.dumps({
+                    "id": page["ids"][i].removeprefix(target.id_prefix),
+                    "document": page["documents"][i],
+                    "metadata": {k: v for k, v in page["metadatas"][i].items() if k not in target.partition}
+                }) + "\n")
+
+            count += rows
+
+    if vectors is None:
+        np.save(tmp_dir / f"{source_type}.npy", np.zeros((0, 0), dtype=np.float32))
+        return 0, 0
+
+    dimensions = vectors.shape[1]
+    vectors.flush()
+    del vectors
+
+    # shrink vectors file when documents were deleted during the export
+    if count < total:
+        np.save(tmp_dir / f"{source_type}.trimmed.npy", np.load(tmp_dir / f"{source_type}.npy", mmap_mode="r")[:count])
+        (tmp_dir / f"{source_type}.trimmed.npy").replace(tmp_dir / f"{source_type}.npy")
+
+    return count, dimensions
+
+
+def iter_collection(
+        collection: Collection,
+        include: List[str],
+        page_size: int = settings.CHROMA_STREAM_PAGE_SIZE,
+        where: Optional[Dict[str, Any]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Page through each entry of a collection
+
+    Args:
+        collection (Collection): collection to page through
+        include (List[str]): fields to return for each entry
+        page_size (int): number of entries per page
+        where (Optional[Dict[str, Any]]): Chroma metadata filter (i.e partition of a shared collection)
+    """
+
+    offset = 0
+    while True:
+        page = collection.get(limit=page_size, offset=offset, include=include, where=where)
+        if not page["ids"]:
+            return
+
+        yield page
+
+        if len(page["ids"]) < page_size:
+            return
+        offset += len(page["ids"])
+
+
+def _read_batches(path: Path, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    with open(path) as jsonl:
+        for line in jsonl:
+            batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
+
+
+def _get_or_create_collection(chroma_manager: ChromaClientManager, name: str, metadata: Optional[Dict[str, Any]]) -> Collection:
+    try:
+        return chroma_manager.get_collection(name)
+    except Exception:
+        logger.info(f"Creating collection={name} to import into")
+        return chroma_manager.create_collection(name, metadata=metadata or None)
+
+
+def _get_max_batch_size(chroma_manager: ChromaClientManager) -> int:
+    max_batch_size = chroma_manager.get_sync_client().get_max_batch_size()
+    return max_batch_size if max_batch_size > 0 else settings.CHROMA_IMPORT_BATCH_SIZE
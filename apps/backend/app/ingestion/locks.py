@@ -0,0 +1,112 @@
+from app.core import ChromaClientManager, get_sync_session_maker
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from contextlib import contextmanager, ExitStack
+from hashlib import sha256
+from typing import Iterable, Iterator, Optional
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def _get_lock_key(alias: str) -> int:
+    # NOTE: Postgres advisory locks are keyed by a signed 64 bit integer
+    return int.from_bytes(sha256(alias.encode()).digest()[:8], "big", signed=True)
+
+
+class CollectionLock:
+    """
+    Postgres advisory lock over a logical collection (i.e {PROJECT}_DOCS), held shared by writers (ingestion,
+    imports & deletes) & exclusively by rebuilds, from creating the new version until the alias is swapped, so no
+    write lands on the version being replaced once its entries are being copied
+
+    NOTE: Advisory locks belong to the connection holding them, so the locks of a crashed process are released
+    along with its connection. Locks are not waited on, the caller fails instead
+    """
+
+    def __init__(self, alias: str, exclusive: bool = False):
+        self.alias = alias
+        self._exclusive = exclusive
+        self._session: Optional[Session] = None
+
+
+    def __enter__(self) -> "CollectionLock":
+        self.acquire()
+        return self
+
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+    def acquire(self):
+        """
+        Acquire lock, raising if a rebuild (or for exclusive locks, a writer) currently holds it
+        """
+
+        lock_fn = "pg_try_advisory_lock" if self._exclusive else "pg_try_advisory_lock_shared"
+
+        session_maker = get_sync_session_maker()
+        session = session_maker()
+        try:
+            # NOTE: autocommit, so the connection doesn't sit idle in a transaction while the lock is held
+            connection = session.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+            locked = connection.execute(text(f"SELECT {lock_fn}(:key)"), {"key": _get_lock_key(self.alias)}).scalar()
+        except Exception:
+            session.close()
+            raise
+
+        if not locked:
+            session.close()
+            if self._exclusive:
+                raise Exception(f"Collection={self.alias} has writes in progress, retry the rebuild once they complete")
+            raise Exception(f"Collection={self.alias} is being rebuilt, retry once the rebuild completes")
+
+        self._session = session
+        logger.debug(f"Acquired {'exclusive' if self._exclusive else 'shared'} lock of collection={self.alias}")
+
+
+    def release(self):
+        """
+        Release lock (if held)
+        """
+
+        if not self._session:
+            return
+
+        unlock_fn = "pg_advisory_unlock" if self._exclusive else "pg_advisory_unlock_shared"
+
+        connection = self._session.connection()
+        try:
+            connection.execute(text(f"SELECT {unlock_fn}(:key)"), {"key": _get_lock_key(self.alias)})
+        except Exception as e:
+            # NOTE: discard the connection rather than returning it to the pool still holding the lock
+            logger.warning(f"Failed to release lock of collection={self.alias}: {str(e)}")
+            connection.invalidate()
+        finally:
+            self._session.close()
+            self._session = None
+
+
+@contextmanager
+def lock_collections_for_write(chroma_manager: ChromaClientManager, aliases: Iterable[str]) -> Iterator[None]:
+    """
+    Hold shared locks of the collections written to, failing if any of them is being rebuilt
+
+    NOTE: Alias resolutions cached before the lock was acquired may point at the version a rebuild just replaced,
+    so they are dropped once the locks are held
+
+    Args:
+        chroma_manager (ChromaClientManager): manager of the Chroma client writing to the collections
+        aliases (Iterable[str]): logical names of the collections written to
+    """
+
+    with ExitStack() as stack:
+        for alias in sorted(set(aliases)):
+            stack.enter_context(CollectionLock(alias))
+            chroma_manager.invalidate_alias(alias)
+
+        yield
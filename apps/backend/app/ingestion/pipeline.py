@@ -0,0 +1,367 @@
+from app.core import settings, ChromaClientManager, get_collection_targets
+from app.models import DataSource, Project
+from app.embeddings import EmbeddingManager, embed_texts
+from .records import ChunkRecord
+from .writer import VectorWriter
+from .locks import lock_collections_for_write
+
+from docling.chunking import HybridChunker
+from docling_core.types.doc import DoclingDocument
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.schema import MetadataMode
+
+from dataclasses import dataclass
+from queue import Queue, Empty, Full
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+import threading
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# marks the end of a stage's output
+_DONE = object()
+
+
+@dataclass(slots=True)
+class StageTiming:
+    """
+    Time a pipeline stage spent working, waiting on the previous stage & blocked on the next stage
+    """
+
+    items: int = 0
+    busy: float = 0.0
+    input_wait: float = 0.0
+    output_wait: float = 0.0
+
+
+    def __str__(self) -> str:
+        return (
+            f"items={self.items}, busy={self.busy:.2f}s, waiting on input={self.input_wait:.2f}s, "
+            f"blocked on output={self.output_wait:.2f}s"
+        )
+
+
+class IngestionPipeline:
+    """
+    Streams converted documents through chunking, embedding & vector store upsert stages
+
+    Each stage (including conversion) runs in its own thread & hands work to the next stage via a bounded
+    queue, so stages overlap & a slow stage applies backpressure to the stages before it. Memory is bounded
+    by the queue sizes rather than the number of documents ingested.
+
+    NOTE: Embedding & upserting are double buffered; while one batch is being written to Chroma the next is
+    being embedded, with at most one embedded batch waiting (plus the writer's in flight batches)
+    """
+
+    def __init__(
+            self,
+            data_source: DataSource,
+            chroma_manager: ChromaClientManager,
+            source_type: str = "DOCS",
+            project_id: Optional[UUID] = None,
+            queue_size: int = settings.INGESTION_QUEUE_SIZE,
+            batch_size: int = settings.INGESTION_BATCH_SIZE
+    ):
+        self._chroma_manager = chroma_manager
+        self._source_type = source_type
+        self._queue_size = queue_size
+        self._batch_size = batch_size
+
+        self._projects: List[Project] = [
+            record.project for record in data_source.project_data
+            if not project_id or record.project.id == project_id
+        ]
+
+        # per-project state, created lazily by the stage which uses it
+        self._chunkers: Dict[str, HybridChunker] = {}
+        self._embedding_models: Dict[str, BaseEmbedding] = {}
+        self._writers: Dict[str, VectorWriter] = {}
+        self._chunk_counts: Dict[str, int] = {project.project_name: 0 for project in self._projects}
+
+        self._failed = threading.Event()
+        self._errors: List[Exception] = []
+        self._timings: Dict[str, StageTiming] = {}
+
+
+    def run(self, documents: Iterable[DoclingDocument]) -> Dict[str, StageTiming]:
+        """
+        Chunk, embed & store each of the documents for each Project, raising the first failure of any stage,
+        returning the timing of each stage
+
+        NOTE: Fails upfront when any of the Projects' collections is being rebuilt, as chunks written to the
+        version being replaced would be lost once the rebuild swaps it out
+
+        Args:
+            documents (Iterable[DoclingDocument]): converted documents (i.e lazily converted by ConversionSupervisor)
+        """
+
+        collections = [
+            get_collection_targets(project, self._source_type)[self._source_type].name for project in self._projects
+        ]
+        with lock_collections_for_write(self._chroma_manager, collections):
+            return self._run(documents)
+
+
+    def _run(self, documents: Iterable[DoclingDocument]) -> Dict[str, StageTiming]:
+
+        # NOTE: converted documents are by far the largest items, so at most one waits to be chunked
+        converted: Queue = Queue(maxsize=1)
+        chunked: Queue = Queue(maxsize=self._queue_size)
+        embedded: Queue = Queue(maxsize=1)
+
+        # NOTE: documents are converted lazily, so the convert stage's time waiting on input is conversion time
+        stages = [
+            ("convert", documents, lambda document: [document], converted),
+            ("chunk", self._iter_queue(converted), self._chunk, chunked),
+            ("embed", self._iter_queue(chunked), self._embed, embedded),
+            ("upsert", self._iter_queue(embedded), self._upsert, None),
+        ]
+
+        threads = [
+            threading.Thread(target=self._run_stage, args=stage, name=f"ingestion-{stage[0]}", daemon=True)
+            for stage in stages
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        try:
+            if self._errors:
+                raise self._errors[0]
+
+            # wait on batches still being upserted
+            start = time.perf_counter()
+            for writer in self._writers.values():
+                writer.flush()
+            self._timings["upsert"].busy += time.perf_counter() - start
+        finally:
+            for writer in self._writers.values():
+                writer.close()
+
+        for project_name, count in self._chunk_counts.items():
+            logger.info(f"Stored {count} {self._source_type} chunks for Project={project_name}")
+
+        for name, timing in self._timings.items():
+            logger.info(f"Ingestion pipeline {self._source_type} stage={name}: {timing}")
+
+        for project_name, writer in self._writers.items():
+            logger.info(
+                f"Upserted {writer.count} chunks for Project={project_name} in {writer.batches} batches, "
+                f"{writer.upsert_seconds:.2f}s spent within Chroma upserts"
+            )
+
+        return self._timings
+
+
+    def _run_stage(self, name: str, inputs: Iterable, handler: Callable[[Any], Iterable], output: Optional[Queue]):
+        """
+        Apply stage handler to each input, passing results to the next stage
+
+        Args:
+            name (str): name of the stage
+            inputs (Iterable): items to process
+            handler (Callable[[Any], Iterable]): function producing zero or more results per input
+            output (Optional[Queue]): queue feeding the next stage (None for the final stage)
+        """
+
+        timing = self._timings[name] = StageTiming()
+        iterator = iter(inputs)
+
+        try:
+            while True:
+                start = time.perf_counter()
+                item = next(iterator, _DONE)
+                timing.input_wait += time.perf_counter() - start
+
+                if item is _DONE or self._failed.is_set():
+                    break
+
+                timing.items += 1
+
+                # NOTE: handlers are generators, so time producing each result separately from handing it off
+                start = time.perf_counter()
+                results = iter(handler(item))
+                timing.busy += time.perf_counter() - start
+
+                while True:
+                    start = time.perf_counter()
+                    result = next(results, _DONE)
+                    timing.busy += time.perf_counter() - start
+
+                    if result is _DONE:
+                        break
+
+                    if output is not None:
+                        start = time.perf_counter()
+                        self._put(output, result)
+                        timing.output_wait += time.perf_counter() - start
+
+            if output is not None:
+                self._put(output, _DONE)
+
+        except Exception as e:
+            logger.error(f"Ingestion pipeline stage={name} failed: {str(e)}")
+            self._errors.append(e)
+            self._failed.set()
+
+        finally:
+            # release resources held by generators (i.e conversion worker process) when stopping early
+            if hasattr(inputs, "close"):
+                inputs.close()
+
+
+    def _put(self, queue: Queue, item: Any):
+        """
+        Put item on queue, blocking while the queue is full unless another stage has failed
+
+        Args:
+            queue (Queue): queue to put item on
+            item (Any): item to put on queue
+        """
+
+        while not self._failed.is_set():
+            try:
+                queue.put(item, timeout=0.5)
+                return
+            except Full:
+                continue
+
+
+    def _iter_queue(self, queue: Queue) -> Iterator[Any]:
+        """
+        Iterate over items put on queue until the previous stage finishes or any stage fails
+
+        Args:
+            queue (Queue): queue to consume items from
+        """
+
+        while not self._failed.is_set():
+            try:
+                item = queue.get(timeout=0.5)
+            except Empty:
+                continue
+
+            if item is _DONE:
+                return
+
+            yield item
+
+
+    def _chunk(self, document: DoclingDocument) -> Iterator[Tuple[str, List[ChunkRecord]]]:
+        """
+        Chunk a converted document for each Project, producing batches of compact ChunkRecords
+
+        Args:
+            document (DoclingDocument): converted document to chunk
+        """
+
+        for project in self._projects:
+            chunker = self._get_chunker(project)
+
+            batch = []
+            for doc_i, chunk in enumerate(chunker.chunk(dl_doc=document)):
+                i = self._chunk_counts[project.project_name]
+                self._chunk_counts[project.project_name] += 1
+
+                # NOTE: only the record is retained, releasing the DocChunk & its doc items right away
+                batch.append(
+                    ChunkRecord.from_doc_chunk(chunk, chunker.contextualize(chunk=chunk), i, doc_i, project.project_name)
+                )
+
+                if len(batch) >= self._batch_size:
+                    yield project.project_name, batch
+                    batch = []
+
+            if batch:
+                yield project.project_name, batch
+
+
+    def _embed(
+            self, item: Tuple[str, List[ChunkRecord]]
+    ) -> Iterator[Tuple[str, List[ChunkRecord], List[Embedding]]]:
+        """
+        Embed a batch of ChunkRecords using the Project's configured embedding model
+
+        Args:
+            item (Tuple[str, List[ChunkRecord]]): Project name & batch of ChunkRecords to embed
+        """
+
+        project_name, records = item
+
+        # NOTE: embed the same content VectorStoreIndex would (text plus metadata not excluded from embedding)
+        embeddings = embed_texts(
+            self._get_embedding_model(project_name),
+            [record.to_text_node().get_content(metadata_mode=MetadataMode.EMBED) for record in records]
+        )
+
+        yield project_name, records, embeddings
+
+
+    def _upsert(self, item: Tuple[str, List[ChunkRecord], List[Embedding]]) -> Iterator:
+        """
+        Hand a batch of embedded ChunkRecords to the writer of the Project's Chroma collection
+
+        Args:
+            item (Tuple[str, List[ChunkRecord], List[Embedding]]): Project name, batch of ChunkRecords & their embeddings
+        """
+
+        project_name, records, embeddings = item
+        self._get_writer(project_name).write(records, embeddings)
+
+        return iter(())
+
+
+    def _get_chunker(self, project: Project) -> HybridChunker:
+        """
+        Retrieve chunker based on configured embedding model for the Project
+
+        Args:
+            project (Project): Project to chunk documents for
+        """
+
+        if project.project_name not in self._chunkers:
+            embedding_manager = EmbeddingManager(project.model_configs)
+            self._chunkers[project.project_name] = HybridChunker(
+                tokenizer=embedding_manager.get_tokenizer(self._source_type),
+                #TODO: Consider setting maximum length of tokens = 512
+            )
+
+        return self._chunkers[project.project_name]
+
+
+    def _get_embedding_model(self, project_name: str) -> BaseEmbedding:
+        """
+        Retrieve configured embedding model for the Project
+
+        Args:
+            project_name (str): name of the Project
+        """
+
+        if project_name not in self._embedding_models:
+            project = next(p for p in self._projects if p.project_name == project_name)
+            embedding_manager = EmbeddingManager(project.model_configs)
+            self._embedding_models[project_name] = embedding_manager.get_embedding_model(self._source_type)
+
+        return self._embedding_models[project_name]
+
+
+    def _get_writer(self, project_name: str) -> VectorWriter:
+        """
+        Retrieve vector writer corresponding to the Project's collection (or partition of a shared collection)
+        for the source type
+
+        Args:
+            project_name (str): name of the Project
+        """
+
+        if project_name not in self._writers:
+            project = next(p for p in self._projects if p.project_name == project_name)
+            target = get_collection_targets(project, self._source_type)[self._source_type]
+            self._writers[project_name] = VectorWriter(self._chroma_manager.get_collection(target.name), target=target)
+
+        return self._writers[project_name]
@@ -0,0 +1,372 @@
+from app.core import settings, ChromaClientManager, CollectionTarget, get_sync_session_maker
+from app.core.collections import HNSW_CREATE_KEYS
+from app.models import CollectionAlias, CollectionVersion, CollectionVersionStatus, RetiredPartition
+from .writer import VectorWriter
+from .archive import iter_collection
+from .locks import CollectionLock, lock_collections_for_write
+
+from chromadb.api.models.Collection import Collection
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import threading
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class CollectionRebuild:
+    """
+    Blue/green rebuild of a logical collection (i.e {PROJECT}_DOCS): a new physical collection version
+    ({PROJECT}_DOCS_v{n}) is filled in the background while queries keep being served from the current
+    version, then the alias is swapped to the new version within a single Postgres transaction
+
+    NOTE: The replaced version is retired rather than deleted, & garbage collected once the grace period
+    passes, so queries which resolved the alias before the swap still complete against it. Writes & deletes
+    against the collection are blocked (see CollectionLock) from creating the new version until the swap, as
+    they would otherwise land on the version being replaced
+    """
+
+    def __init__(self, chroma_manager: ChromaClientManager, alias: str, metadata: Optional[Dict[str, Any]] = None):
+        self._chroma_manager = chroma_manager
+        self._metadata = metadata
+        self._lock = CollectionLock(alias, exclusive=True)
+
+        self.alias = alias
+        self.version: Optional[int] = None
+        self.collection_name: Optional[str] = None
+
+
+    def run(self, fill: Callable[[Collection], None], on_swap: Optional[Callable[[Session], None]] = None) -> str:
+        """
+        Build a new version of the collection using the fill function & swap the alias to it, discarding
+        the new version if filling fails
+
+        Args:
+            fill (Callable[[Collection], None]): writes each entry of the rebuilt collection into the new version
+            on_swap (Optional[Callable[[Session], None]]): applies changes which must become visible together with the new version
+        """
+
+        collection = self.begin()
+
+        try:
+            start = time.perf_counter()
+            fill(collection)
+            logger.info(
+                f"Filled collection={self.collection_name} with {collection.count()} entries in "
+                f"{time.perf_counter() - start:.2f}s"
+            )
+        except Exception as e:
+            logger.error(f"Failed to rebuild collection={self.alias}: {str(e)}")
+            self.abort()
+            raise
+
+        self.commit(on_swap)
+        return self.collection_name
+
+
+    def begin(self) -> Collection:
+        """
+        Register & create the next physical version of the collection, blocking writes to the collection until
+        the rebuild is committed or aborted
+        """
+
+        self._lock.acquire()
+        try:
+            return self._begin()
+        except Exception:
+            self._lock.release()
+            raise
+
+
+    def _begin(self) -> Collection:
+        session_maker = get_sync_session_maker()
+        with session_maker() as session:
+            building = session.execute(
+                select(CollectionVersion.collection_name).where(
+                    CollectionVersion.alias == self.alias,
+                    CollectionVersion.status == CollectionVersionStatus.BUILDING
+                )
+            ).scalars().first()
+            if building:
+                raise Exception(f"Collection={self.alias} is already being rebuilt into collection={building}")
+
+            latest = session.execute(
+                select(func.max(CollectionVersion.version)).where(CollectionVersion.alias == self.alias)
+            ).scalar()
+
+            self.version = (latest or 0) + 1
+            self.collection_name = f"{self.alias}_v{self.version}"
+
+            # NOTE: the collection name is the primary key, so concurrent rebuilds of the same version conflict here
+            session.add(CollectionVersion(
+                collection_name=self.collection_name,
+                alias=self.alias,
+                version=self.version,
+                status=CollectionVersionStatus.BUILDING
+            ))
+            session.commit()
+
+        logger.info(f"Rebuilding collection={self.alias} into collection={self.collection_name}")
+
+        try:
+            metadata, configuration = self._get_metadata(), self._get_configuration()
+            if configuration and metadata:
+                # NOTE: legacy index metadata would conflict with the index configuration carried over
+                metadata = {k: v for k, v in metadata.items() if not k.startswith("hnsw:")} or None
+
+            return self._chroma_manager.create_collection(
+                self.collection_name, metadata=metadata, configuration=configuration
+            )
+        except Exception:
+            self._set_status(CollectionVersionStatus.FAILED)
+            raise
+
+
+    def commit(self, on_swap: Optional[Callable[[Session], None]] = None):
+        """
+        Atomically swap the alias to the new version, retiring the version previously served
+
+        Args:
+            on_swap (Optional[Callable[[Session], None]]): applies changes within the same transaction as the swap
+                (i.e the embedding model queries against the new version must use)
+        """
+
+        try:
+            self._commit(on_swap)
+        finally:
+            self._lock.release()
+
+        # retired versions are garbage collected once queries resolved before the swap have completed
+        timer = threading.Timer(
+            settings.COLLECTION_GC_GRACE_SECONDS + 1,
+            garbage_collect_collections,
+            args=(self._chroma_manager,)
+        )
+        timer.daemon = True
+        timer.start()
+
+
+    def _commit(self, on_swap: Optional[Callable[[Session], None]] = None):
+        # NOTE: collections created before versioning are served under the alias name itself
+        legacy_collection = None
+        if not self._has_alias():
+            legacy_collection = self._get_legacy_collection_name()
+
+        now = datetime.now()
+        session_maker = get_sync_session_maker()
+        with session_maker() as session:
+            alias = session.execute(
+                select(CollectionAlias).where(CollectionAlias.alias == self.alias).with_for_update()
+            ).scalar_one_or_none()
+
+            if alias:
+                previous = session.get(CollectionVersion, alias.collection_name, with_for_update=True)
+                if previous:
+                    previous.status = CollectionVersionStatus.RETIRED
+                    previous.retired_at = now
+
+                alias.collection_name = self.collection_name
+                alias.version = self.version
+            else:
+                if legacy_collection:
+                    session.add(CollectionVersion(
+                        collection_name=legacy_collection,
+                        alias=self.alias,
+                        version=0,
+                        status=CollectionVersionStatus.RETIRED,
+                        retired_at=now
+                    ))
+
+                session.add(CollectionAlias(alias=self.alias, collection_name=self.collection_name, version=self.version))
+
+            version = session.get(CollectionVersion, self.collection_name)
+            version.status = CollectionVersionStatus.ACTIVE
+
+            if on_swap:
+                on_swap(session)
+
+            session.commit()
+
+        self._chroma_manager.invalidate_alias(self.alias)
+        logger.info(f"Swapped collection={self.alias} to collection={self.collection_name}")
+
+
+    def abort(self):
+        """
+        Discard the new version, leaving the alias untouched
+        """
+
+        try:
+            self._set_status(CollectionVersionStatus.FAILED)
+
+            try:
+                self._chroma_manager.delete_collection(self.collection_name)
+            except Exception as e:
+                logger.warning(f"Failed to delete collection={self.collection_name} of aborted rebuild: {str(e)}")
+        finally:
+            self._lock.release()
+
+
+    def _set_status(self, status: CollectionVersionStatus):
+        session_maker = get_sync_session_maker()
+        with session_maker() as session:
+            version = session.get(CollectionVersion, self.collection_name)
+            version.status = status
+            if status == CollectionVersionStatus.FAILED:
+                version.retired_at = datetime.now()
+            session.commit()
+
+
+    def _get_metadata(self) -> Optional[Dict[str, Any]]:
+        if self._metadata:
+            return self._metadata
+
+        # carry the configuration of the version currently served over to the new version
+        try:
+            return self._chroma_manager.get_collection(self.alias).metadata or None
+        except Exception:
+            return None
+
+
+    def _get_configuration(self) -> Optional[Dict[str, Any]]:
+        # carry the index configuration (i.e tuned HNSW parameters) of the version currently served over to the new version
+        try:
+            hnsw = (self._chroma_manager.get_collection(self.alias).configuration_json or {}).get("hnsw")
+        except Exception:
+            return None
+
+        if not hnsw:
+            return None
+
+        return {"hnsw": {k: v for k, v in hnsw.items() if k in HNSW_CREATE_KEYS and v is not None}}
+
+
+    def _has_alias(self) -> bool:
+        session_maker = get_sync_session_maker()
+        with session_maker() as session:
+            return session.get(CollectionAlias, self.alias) is not None
+
+
+    def _get_legacy_collection_name(self) -> Optional[str]:
+        try:
+            self._chroma_manager.get_sync_client().get_collection(self.alias)
+            return self.alias
+        except Exception:
+            return None
+
+
+def copy_collection(chroma_manager: ChromaClientManager, source: str) -> Callable[[Collection], None]:
+    """
+    Fill function copying every entry (vectors included) of a collection into the rebuilt collection,
+    i.e to apply new collection configuration or compact the collection
+
+    Args:
+        chroma_manager (ChromaClientManager): manager of the Chroma client
+        source (str): logical or physical name of the collection to copy
+    """
+
+    def fill(target: Collection):
+        source_collection = chroma_manager.get_collection(source)
+        writer = VectorWriter(target, batch_size=settings.CHROMA_IMPORT_BATCH_SIZE)
+
+        try:
+            for page in iter_collection(source_collection, include=["embeddings", "documents", "metadatas"]):
+                writer.upsert(page["ids"], page["embeddings"], page["metadatas"], page["documents"])
+            writer.flush()
+        finally:
+            writer.close()
+
+    return fill
+
+
+def garbage_collect_collections(
+        chroma_manager: ChromaClientManager,
+        grace_seconds: float = settings.COLLECTION_GC_GRACE_SECONDS
+) -> List[str]:
+    """
+    Delete physical collection versions which were retired (or failed) before the grace period, versions left
+    building by rebuilds which never finished, as well as partitions of shared collections retired by
+    EmbeddingMigrations before the grace period
+
+    Args:
+        chroma_manager (ChromaClientManager): manager of the Chroma client
+        grace_seconds (float): seconds a retired version is kept for queries which resolved it before the swap
+    """
+
+    now = datetime.now()
+    deleted = []
+
+    session_maker = get_sync_session_maker()
+    with session_maker() as session:
+        versions = session.execute(
+            select(CollectionVersion).where(
+                (
+                    CollectionVersion.status.in_([CollectionVersionStatus.RETIRED, CollectionVersionStatus.FAILED])
+                    & (CollectionVersion.retired_at <= now - timedelta(seconds=grace_seconds))
+                ) | (
+                    (CollectionVersion.status == CollectionVersionStatus.BUILDING)
+                    & (CollectionVersion.updated_at <= now - timedelta(seconds=settings.COLLECTION_REBUILD_STALE_SECONDS))
+                )
+            )
+        ).scalars().all()
+
+        for version in versions:
+            chroma_manager.invalidate_collection(version.collection_name)
+            try:
+                chroma_manager.get_sync_client().delete_collection(name=version.collection_name)
+            except Exception as e:
+                logger.debug(f"Collection {version.collection_name} already deleted: {e}")
+
+            session.delete(version)
+            deleted.append(version.collection_name)
+
+        session.commit()
+
+    if deleted:
+        logger.info(f"Garbage collected collections={deleted}")
+
+    _garbage_collect_partitions(chroma_manager, now - timedelta(seconds=grace_seconds))
+
+    return deleted
+
+
+def _garbage_collect_partitions(chroma_manager: ChromaClientManager, retired_before: datetime):
+    """
+    Delete the chunks of shared collection partitions retired before the specified time
+
+    NOTE: Each partition's row stays locked until its chunks are deleted, so a migration back into the partition
+    cancelling the deletion waits on it (rather than having its freshly written chunks deleted)
+
+    Args:
+        chroma_manager (ChromaClientManager): manager of the Chroma client
+        retired_before (datetime): partitions retired before this time are deleted
+    """
+
+    session_maker = get_sync_session_maker()
+    with session_maker() as session:
+        partitions = session.execute(
+            select(RetiredPartition)
+            .where(RetiredPartition.retired_at <= retired_before)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+
+        for partition in partitions:
+            target = CollectionTarget(partition.collection_name, partition.source_type, str(partition.project_id))
+            try:
+                with lock_collections_for_write(chroma_manager, [target.name]):
+                    chroma_manager.get_collection(target.name).delete(where=target.scope())
+            except Exception as e:
+                # NOTE: left for the next garbage collection (i.e collection is being rebuilt)
+                logger.warning(f"Failed to delete retired partition={target.partition} of collection={target.name}: {str(e)}")
+                continue
+
+            session.delete(partition)
+            logger.info(f"Garbage collected partition={target.partition} of collection={target.name}")
+
+        session.commit()
@@ -0,0 +1,78 @@
+from app.core import get_normalized_project_name
+
+from docling_core.transforms.chunker.hybrid_chunker import DocChunk
+from llama_index.core.schema import TextNode
+
+from dataclasses import dataclass
+from typing import Dict, Union
+
+
+@dataclass(slots=True)
+class ChunkRecord:
+    """
+    Compact representation of a chunk, holding only the text & metadata stored alongside its vector
+
+    NOTE: Created as soon as a document is chunked so the DocChunk (with its doc items & provenance) and
+    the DoclingDocument can be released before the chunk is embedded & stored
+    """
+
+    id: str
+    text: str
+    chunk_idx: str
+    source: str
+    mimetype: str
+    headings: str
+    document_hash: int
+    content_types: str
+
+
+    @classmethod
+    def from_doc_chunk(cls, chunk: DocChunk, text: str, i: int, doc_i: int, project: str) -> "ChunkRecord":
+        """
+        Extract relevant metadata for a particular Document Chunk
+
+        NOTE: Ids are derived from the document's hashed content & the chunk's position within the document, so
+        re-ingesting a document overwrites its own chunks rather than those of other documents
+
+        Args:
+            chunk (DocChunk): document chunk to extract meta data for
+            text (str): contextualized text of the chunk
+            i (int): current position within the IngestionJob
+            doc_i (int): current position within the document
+            project (str): relevant project this chunk belongs to
+        """
+
+        origin = chunk.meta.origin
+        headings = chunk.meta.headings
+
+        # TODO: Add file name, file path, file hash too
+        return cls(
+            id=f"{origin.binary_hash}_{doc_i}",
+            text=text,
+            chunk_idx=f"{get_normalized_project_name(project)}_{i}",
+            source=origin.filename,
+            mimetype=origin.mimetype,
+            headings=" > ".join(headings) if headings else "No Headings",
+            document_hash=origin.binary_hash,
+            content_types=",".join({str(item.label) for item in chunk.meta.doc_items}),
+        )
+
+
+    @property
+    def metadata(self) -> Dict[str, Union[str, int]]:
+        return {
+            "chunk_idx": self.chunk_idx,
+            "source": self.source,
+            "mimetype": self.mimetype,
+            "headings": self.headings,
+            "document_hash": self.document_hash,
+            "content_types": self.content_types
+        }
+
+
+    def to_text_node(self) -> TextNode:
+        """
+        Convert record to LlamaIndex TextNode in order to store within ChromaDB
+        """
+
+        return TextNode(id_=self.id, text=self.text, metadata=self.metadata)
@@ -0,0 +1,104 @@
+from app.core import settings, ChromaClientManager
+from app.embeddings import embed_texts
+from .writer import VectorWriter
+from .archive import iter_collection
+
+from chromadb.api.models.Collection import Collection
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.vector_stores.utils import metadata_dict_to_node
+from llama_index.core.schema import MetadataMode
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+def reembed_collection(
+        chroma_manager: ChromaClientManager,
+        source: str,
+        embedding_model: BaseEmbedding,
+        batch_size: int = settings.EMBEDDING_MIGRATION_BATCH_SIZE,
+        on_progress: Optional[Callable[[int], None]] = None,
+        where: Optional[Dict[str, Any]] = None
+) -> Callable[[Collection], None]:
+    """
+    Fill function re-embedding every chunk stored within a collection with another embedding model, writing
+    the chunks (same ids, documents & metadata) alongside their new vectors into the rebuilt collection
+
+    NOTE: Chunk text & metadata are read back from Chroma, so sources are not re-downloaded or re-converted.
+    The next page is read from Chroma while the current page is embedded, and upserts of embedded pages
+    stay in flight while the following page is embedded.
+
+    Args:
+        chroma_manager (ChromaClientManager): manager of the Chroma client
+        source (str): logical or physical name of the collection to re-embed
+        embedding_model (BaseEmbedding): embedding model to re-embed chunks with
+        batch_size (int): number of chunks read & embedded at once
+        on_progress (Optional[Callable[[int], None]]): called with the number of chunks written so far after each batch
+        where (Optional[Dict[str, Any]]): Chroma metadata filter of the chunks to re-embed (i.e partition of a shared collection)
+    """
+
+    def fill(target: Collection):
+        source_collection = chroma_manager.get_collection(source)
+        pages = iter_collection(source_collection, include=["documents", "metadatas"], page_size=batch_size, where=where)
+
+        writer = VectorWriter(target)
+        reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"reembed-{source}")
+        embed_seconds = 0.0
+        processed = 0
+
+        try:
+            next_page = reader.submit(next, pages, None)
+            while True:
+                page = next_page.result()
+                if page is None:
+                    break
+
+                next_page = reader.submit(next, pages, None)
+
+                start = time.perf_counter()
+                embeddings = embed_texts(embedding_model, _get_embed_texts(page))
+                embed_seconds += time.perf_counter() - start
+
+                writer.upsert(page["ids"], embeddings, page["metadatas"], page["documents"])
+                processed += len(page["ids"])
+
+                if on_progress:
+                    on_progress(processed)
+
+            writer.flush()
+        finally:
+            reader.shutdown(wait=True, cancel_futures=True)
+            writer.close()
+
+        logger.info(
+            f"Re-embedded {processed} chunks of collection={source} into collection={target.name}, "
+            f"{embed_seconds:.2f}s spent embedding & {writer.upsert_seconds:.2f}s within Chroma upserts"
+        )
+
+    return fill
+
+
+def _get_embed_texts(page: Dict[str, Any]) -> List[str]:
+    """
+    Rebuild the content embedded at ingestion (text plus metadata not excluded from embedding) of each chunk
+
+    Args:
+        page (Dict[str, Any]): page of documents & metadata read from a collection
+    """
+
+    texts = []
+    for document, metadata in zip(page["documents"], page["metadatas"]):
+        try:
+            node = metadata_dict_to_node(metadata, text=document)
+            texts.append(node.get_content(metadata_mode=MetadataMode.EMBED))
+        except ValueError:
+            # NOTE: chunks not written in LlamaIndex's layout have no node content, so only their text is embedded
+            texts.append(document)
+
+    return texts
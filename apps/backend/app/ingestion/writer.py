@@ -0,0 +1,220 @@
+from app.core import settings, CollectionTarget
+from .records import ChunkRecord
+
+from llama_index.core.base.embeddings.base import Embedding
+from llama_index.core.vector_stores.utils import node_to_metadata_dict
+
+from chromadb.api.models.Collection import Collection
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set
+import threading
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class VectorWriter:
+    """
+    Upserts precomputed embeddings & their ChunkRecords directly into a Chroma collection, in fixed size
+    batches with several batches in flight & each failed batch retried on its own
+
+    NOTE: Metadata is written in the same layout as LlamaIndex's ChromaVectorStore, so stored chunks can
+    still be retrieved through LlamaIndex. When writing to a partition of a shared collection, each entry is
+    tagged with the partition's metadata & its id prefixed by the partition.
+
+    Chunks previously stored for a source are deleted before the first of its chunks is buffered, so documents
+    which changed (or shrank) since they were last ingested don't leave stale chunks behind
+    """
+
+    def __init__(
+            self,
+            collection: Collection,
+            batch_size: int = settings.CHROMA_UPSERT_BATCH_SIZE,
+            max_in_flight: int = settings.CHROMA_UPSERT_MAX_IN_FLIGHT,
+            max_retries: int = settings.CHROMA_UPSERT_MAX_RETRIES,
+            retry_backoff: float = settings.CHROMA_UPSERT_RETRY_BACKOFF_SECONDS,
+            target: Optional[CollectionTarget] = None
+    ):
+        self._collection = collection
+        self._target = target
+        self._batch_size = batch_size
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix=f"upsert-{collection.name}")
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._futures: List[Future] = []
+
+        self._pending: Dict[str, List[Any]] = self._empty_batch()
+        # hashed content of the documents written per source, so same named documents don't delete each other
+        self._written: Dict[str, Set[int]] = {}
+        # totals across batches (upsert seconds overlap while several batches are in flight)
+        self._count_lock = threading.Lock()
+        self.count = 0
+        self.batches = 0
+        self.upsert_seconds = 0.0
+
+
+    def write(self, records: List[ChunkRecord], embeddings: List[Embedding]):
+        """
+        Buffer embedded records, submitting each full batch for upsert (blocking while the maximum number
+        of batches are in flight)
+
+        Args:
+            records (List[ChunkRecord]): records to store
+            embeddings (List[Embedding]): embedding of each record
+        """
+
+        for record in records:
+            hashes = self._written.setdefault(record.source, set())
+            if record.document_hash not in hashes:
+                self._delete_stale(record.source, hashes)
+                hashes.add(record.document_hash)
+
+        self.upsert(
+            ids=[record.id for record in records],
+            embeddings=embeddings,
+            metadatas=[
+                node_to_metadata_dict(record.to_text_node(), remove_text=True, flat_metadata=True) for record in records
+            ],
+            documents=[record.text for record in records]
+        )
+
+
+    def upsert(
+            self,
+            ids: List[str],
+            embeddings: Sequence[Embedding],
+            metadatas: List[Dict[str, Any]],
+            documents: List[str]
+    ):
+        """
+        Buffer already serialized entries (i.e restored from an export), submitting each full batch for upsert
+
+        Args:
+            ids (List[str]): ids of the entries
+            embeddings (Sequence[Embedding]): embedding of each entry
+            metadatas (List[Dict[str, Any]]): Chroma metadata of each entry
+            documents (List[str]): document text of each entry
+        """
+
+        self._raise_if_failed()
+
+        id_prefix = self._target.id_prefix if self._target else ""
+        partition = self._target.partition if self._target else {}
+
+        for i in range(len(ids)):
+            self._pending["ids"].append(id_prefix + ids[i])
+            self._pending["embeddings"].append(embeddings[i])
+            self._pending["metadatas"].append({**metadatas[i], **partition} if partition else metadatas[i])
+            self._pending["documents"].append(documents[i])
+
+            if len(self._pending["ids"]) >= self._batch_size:
+                self._submit()
+
+
+    def flush(self):
+        """
+        Submit the remaining buffered records & wait for each in flight batch, raising the first failure
+        """
+
+        if self._pending["ids"]:
+            self._submit()
+
+        for future in self._futures:
+            future.result()
+        self._futures.clear()
+
+
+    def close(self):
+        """
+        Stop accepting batches, cancelling those not yet started
+        """
+
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+    def _delete_stale(self, source: str, written: Set[int]):
+        """
+        Delete chunks previously stored for a source, other than those of documents already written by this writer
+
+        Args:
+            source (str): source (file name) of the document about to be written
+            written (Set[int]): hashed content of the documents with the same source already written
+        """
+
+        where: Dict[str, Any] = {"source": source}
+        if written:
+            where = {"$and": [where, {"document_hash": {"$nin": list(written)}}]}
+
+        where = self._target.scope(where) if self._target else where
+        self._collection.delete(where=where)
+
+        logger.debug(f"Deleted previously stored chunks of source={source} from collection={self._collection.name}")
+
+
+    def _submit(self):
+        batch, self._pending = self._pending, self._empty_batch()
+
+        self._in_flight.acquire()
+        future = self._executor.submit(self._upsert, batch)
+        future.add_done_callback(lambda _: self._in_flight.release())
+        self._futures.append(future)
+
+
+    def _upsert(self, batch: Dict[str, List[Any]]):
+        """
+        Upsert batch into the collection, retrying with exponential backoff on failure
+
+        Args:
+            batch (Dict[str, List[Any]]): ids, embeddings, metadatas & documents to upsert
+        """
+
+        for attempt in range(self._max_retries + 1):
+            try:
+                start = time.perf_counter()
+                self._collection.upsert(**batch)
+                elapsed = time.perf_counter() - start
+
+                with self._count_lock:
+                    self.count += len(batch["ids"])
+                    self.batches += 1
+                    self.upsert_seconds += elapsed
+
+                logger.debug(
+                    f"Upserted {len(batch['ids'])} chunks into collection={self._collection.name} in {elapsed:.3f}s"
+                )
+                return
+            except Exception as e:
+                if attempt == self._max_retries:
+                    raise Exception(
+                        f"Failed to upsert {len(batch['ids'])} chunks into collection={self._collection.name} "
+                        f"after {attempt + 1} attempts: {str(e)}"
+                    )
+
+                backoff = self._retry_backoff * 2**attempt
+                logger.warning(
+                    f"Failed to upsert {len(batch['ids'])} chunks into collection={self._collection.name}, "
+                    f"retrying in {backoff:.1f}s: {str(e)}"
+                )
+                time.sleep(backoff)
+
+
+    def _raise_if_failed(self):
+        """
+        Raise the failure of any completed batch, so callers stop producing work early
+        """
+
+        for future in self._futures:
+            if future.done() and future.exception():
+                raise future.exception()
+
+        self._futures = [future for future in self._futures if not future.done()]
+
+
+    @staticmethod
+    def _empty_batch() -> Dict[str, List[Any]]:
+        return {"ids": [], "embeddings": [], "metadatas": [], "documents": []}
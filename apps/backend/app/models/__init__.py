@@ -3,12 +3,17 @@ from .data_source import DataSource
 from .ingestion_job import IngestionJob, ProcessingStatus
 from .project import Project
 from .project_data import ProjectData
-from .model_configs import ModelConfigs
+from .model_configs import ModelConfigs, TableStructureMode, DimensionReduction, IndexPreset
 from .conversation import Conversation
 from .message import Message
 from .file import File
 from .file_collection import FileCollection
 from .record_lock import RecordLock, RecordType
+from .conversion_tuning import ConversionTuning
+from .quarantined_file import QuarantinedFile, QuarantineReason
+from .embedding_projection import EmbeddingProjection
+from .collection_alias import CollectionAlias, CollectionVersion, CollectionVersionStatus
+from .embedding_migration import EmbeddingMigration, RetiredPartition
 
 
 __all__ = [
@@ -18,11 +23,23 @@ __all__ = [
     "Project",
     "ProjectData",
     "ModelConfigs",
+    "TableStructureMode",
+    "DimensionReduction",
+    "IndexPreset",
     "Conversation",
     "Message",
     "ProcessingStatus",
     "File",
     "FileCollection",
     "RecordLock",
-    "RecordType"
+    "RecordType",
+    "ConversionTuning",
+    "QuarantinedFile",
+    "QuarantineReason",
+    "EmbeddingProjection",
+    "CollectionAlias",
+    "CollectionVersion",
+    "CollectionVersionStatus",
+    "EmbeddingMigration",
+    "RetiredPartition"
 ]
@@ -0,0 +1,47 @@
+from .base import Base
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Enum as SQLEnum, Index
+
+from datetime import datetime
+from enum import Enum
+
+
+class CollectionVersionStatus(Enum):
+    BUILDING = "building"
+    ACTIVE = "active"
+    RETIRED = "retired"
+    FAILED = "failed"
+
+
+class CollectionAlias(Base):
+    """
+    Logical Chroma collection name (i.e {PROJECT}_DOCS) pointing to the physical collection version queries are served from
+    """
+
+    __tablename__ = "collection_alias"
+
+    alias: Mapped[str] = mapped_column(primary_key=True, comment="Logical collection name")
+    collection_name: Mapped[str] = mapped_column(nullable=False, comment="Physical collection currently served")
+    version: Mapped[int] = mapped_column(nullable=False, comment="Version of the physical collection currently served")
+
+
+class CollectionVersion(Base):
+    """
+    Physical Chroma collection built for a logical collection, tracked so rebuilds can be swapped in & garbage collected
+    """
+
+    __tablename__ = "collection_version"
+
+    __table_args__ = (
+        Index("ix_collection_version_alias_status", "alias", "status"),
+    )
+
+    collection_name: Mapped[str] = mapped_column(primary_key=True, comment="Physical collection name")
+    alias: Mapped[str] = mapped_column(nullable=False, comment="Logical collection name the version was built for")
+    version: Mapped[int] = mapped_column(nullable=False)
+    status: Mapped[CollectionVersionStatus] = mapped_column(SQLEnum(CollectionVersionStatus), nullable=False)
+    retired_at: Mapped[datetime] = mapped_column(
+        nullable=True,
+        comment="When the version stopped being served, garbage collected once the grace period passes"
+    )
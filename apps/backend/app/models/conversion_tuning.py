@@ -0,0 +1,28 @@
+from .base import Base
+
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class ConversionTuning(Base):
+    """
+    Docling PDF pipeline batch sizes & thread counts found to be fastest on a particular host,
+    persisted by the calibration command for later IngestionJobs
+    """
+
+    __tablename__ = "conversion_tuning"
+
+    host_signature: Mapped[str] = mapped_column(
+        primary_key=True,
+        comment="Available CPUs, memory, and accelerator device of the calibrated host"
+    )
+
+    layout_batch_size: Mapped[int] = mapped_column(nullable=False)
+    table_batch_size: Mapped[int] = mapped_column(nullable=False)
+    ocr_batch_size: Mapped[int] = mapped_column(nullable=False)
+    num_threads: Mapped[int] = mapped_column(nullable=False, comment="Number of threads used by each accelerator")
+    shard_workers: Mapped[int] = mapped_column(nullable=False, comment="Number of page ranges converted in parallel")
+
+    pages_per_second: Mapped[float] = mapped_column(
+        nullable=True,
+        comment="Throughput measured for this tuning against the calibration sample documents"
+    )
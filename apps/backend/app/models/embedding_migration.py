@@ -0,0 +1,59 @@
+from .base import Base
+from .ingestion_job import ProcessingStatus
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, text, Enum as SQLEnum
+
+from uuid import UUID
+from datetime import datetime
+
+
+class EmbeddingMigration(Base):
+    """
+    Re-embedding of a Project's stored chunks with a newly configured embedding model, tracking progress
+    of the rebuilt collection
+    """
+
+    __tablename__ = "embedding_migration"
+
+    id: Mapped[UUID] = mapped_column(
+        primary_key=True, index=True, server_default=text("gen_random_uuid()")
+    )
+    project_id: Mapped[UUID] = mapped_column(ForeignKey("project.id"), index=True)
+    source_type: Mapped[str] = mapped_column(nullable=False, comment="Source type of the collection re-embedded (DOCS or CODE)")
+    processing_status: Mapped[ProcessingStatus] = mapped_column(SQLEnum(ProcessingStatus), nullable=False)
+
+    embedding_provider: Mapped[str] = mapped_column(nullable=False)
+    embedding_model: Mapped[str] = mapped_column(nullable=False)
+    embedding_dimensions: Mapped[int] = mapped_column(
+        nullable=True,
+        comment="Dimensionality embeddings are reduced to (full dimensionality when null)"
+    )
+
+    total_chunks: Mapped[int] = mapped_column(nullable=True, comment="Number of chunks stored when the migration started")
+    processed_chunks: Mapped[int] = mapped_column(nullable=False, default=0, comment="Number of chunks re-embedded so far")
+    collection_name: Mapped[str] = mapped_column(nullable=True, comment="Physical collection version the chunks are written to")
+    error: Mapped[str] = mapped_column(nullable=True)
+
+    start_time: Mapped[datetime] = mapped_column(nullable=False, comment="Start time of EmbeddingMigration processing")
+    end_time: Mapped[datetime] = mapped_column(nullable=True, comment="End time of EmbeddingMigration processing")
+
+
+class RetiredPartition(Base):
+    """
+    Partition of a shared collection a Project's chunks were migrated out of, deleted once queries using the
+    previous embedding model have completed (or cancelled by a later migration back into the partition)
+    """
+
+    __tablename__ = "retired_partition"
+
+    migration_id: Mapped[UUID] = mapped_column(
+        ForeignKey("embedding_migration.id"), primary_key=True, comment="EmbeddingMigration which retired the partition"
+    )
+    collection_name: Mapped[str] = mapped_column(nullable=False, comment="Shared collection the partition belongs to")
+    project_id: Mapped[UUID] = mapped_column(ForeignKey("project.id"), index=True)
+    source_type: Mapped[str] = mapped_column(nullable=False)
+    retired_at: Mapped[datetime] = mapped_column(
+        nullable=False,
+        comment="When the partition stopped being served, deleted once the grace period passes"
+    )
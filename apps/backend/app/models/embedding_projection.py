@@ -0,0 +1,27 @@
+from .base import Base
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import LargeBinary
+
+
+class EmbeddingProjection(Base):
+    """
+    PCA projection fitted against sample embeddings of a model, used to reduce the dimensionality of
+    embeddings at both ingest & query time
+    """
+
+    __tablename__ = "embedding_projection"
+
+    model_name: Mapped[str] = mapped_column(primary_key=True)
+    dimensions: Mapped[int] = mapped_column(primary_key=True, comment="Dimensionality of projected embeddings")
+
+    input_dimensions: Mapped[int] = mapped_column(nullable=False, comment="Dimensionality of the model's embeddings")
+    mean: Mapped[bytes] = mapped_column(LargeBinary, nullable=False, comment="fp16 mean of the sample embeddings")
+    components: Mapped[bytes] = mapped_column(
+        LargeBinary,
+        nullable=False,
+        comment="fp16 principal components (dimensions x input dimensions, row major)"
+    )
+
+    explained_variance: Mapped[float] = mapped_column(nullable=True, comment="Ratio of sample variance retained")
+    sample_count: Mapped[int] = mapped_column(nullable=False, comment="Number of sample embeddings fitted against")
@@ -35,4 +35,8 @@ class IngestionJob(Base):
     end_time: Mapped[datetime] = mapped_column(nullable=True, comment="End time of IngestionJob processing")
     total_duration: Mapped[int] = mapped_column(nullable=True, comment="Total duration of IngestionJob in seconds")
 
+    ocr_pages: Mapped[int] = mapped_column(nullable=True, comment="Number of PDF pages without a text layer that were OCR'd")
+    ocr_skipped_pages: Mapped[int] = mapped_column(nullable=True, comment="Number of PDF pages with a text layer that skipped OCR")
+    quarantined_files: Mapped[int] = mapped_column(nullable=True, comment="Number of documentation files quarantined or skipped due to quarantine")
+
     data_source: Mapped["DataSource"] = relationship(back_populates="ingestion_jobs")
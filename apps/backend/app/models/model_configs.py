@@ -1,8 +1,9 @@
 from uuid import UUID
 from typing import TYPE_CHECKING
+from enum import Enum
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import text, ForeignKey
+from sqlalchemy import text, ForeignKey, Enum as SQLEnum
 
 from .base import Base
 
@@ -10,6 +11,25 @@ if TYPE_CHECKING:
     from .project import Project
 
 
+# enum for determining when the Docling table structure model is ran against PDF pages
+class TableStructureMode(Enum):
+    OFF = "off"
+    AUTO = "auto" # only pages where layout analysis found table regions
+    ALWAYS = "always"
+
+
+# enum for reducing the dimensionality of embeddings stored within Chroma
+class DimensionReduction(Enum):
+    MATRYOSHKA = "matryoshka" # truncation, only for models trained with Matryoshka representation learning
+    PCA = "pca" # projection fitted per model & persisted as an EmbeddingProjection
+
+
+# enum for HNSW index parameter presets applied when creating a project's collections
+class IndexPreset(Enum):
+    SMALL = "small" # fast queries & builds, for small collections where recall is high regardless
+    LARGE = "large" # high recall, for large collections (i.e code) at the cost of latency & build time
+
+
 class ModelConfigs(Base):
     """
     Entity to store selected model configurations used for a given project
@@ -28,6 +48,37 @@ class ModelConfigs(Base):
     code_embedding_provider: Mapped[str] = mapped_column(nullable=True)
     code_embedding_model: Mapped[str] = mapped_column(nullable=True)
 
+    table_structure_mode: Mapped[TableStructureMode] = mapped_column(
+        SQLEnum(TableStructureMode),
+        nullable=True,
+        comment="When to run table structure extraction on ingested PDFs (off, auto, or always)"
+    )
+
+    docs_embedding_dimensions: Mapped[int] = mapped_column(
+        nullable=True,
+        comment="Dimensionality docs embeddings are reduced to before being stored (full dimensionality when null)"
+    )
+    code_embedding_dimensions: Mapped[int] = mapped_column(
+        nullable=True,
+        comment="Dimensionality code embeddings are reduced to before being stored (full dimensionality when null)"
+    )
+    dimension_reduction: Mapped[DimensionReduction] = mapped_column(
+        SQLEnum(DimensionReduction),
+        nullable=True,
+        comment="How embeddings are reduced to the configured dimensionality (matryoshka or pca)"
+    )
+
+    # HNSW index parameters of the project's collections (Chroma defaults when null)
+    docs_hnsw_space: Mapped[str] = mapped_column(nullable=True, comment="Distance metric of the docs index (l2, cosine or ip)")
+    docs_hnsw_m: Mapped[int] = mapped_column(nullable=True, comment="Neighbours per node (M) of the docs index")
+    docs_hnsw_construction_ef: Mapped[int] = mapped_column(nullable=True, comment="Candidate list size while building the docs index")
+    docs_hnsw_search_ef: Mapped[int] = mapped_column(nullable=True, comment="Candidate list size while searching the docs index")
+
+    code_hnsw_space: Mapped[str] = mapped_column(nullable=True, comment="Distance metric of the code index (l2, cosine or ip)")
+    code_hnsw_m: Mapped[int] = mapped_column(nullable=True, comment="Neighbours per node (M) of the code index")
+    code_hnsw_construction_ef: Mapped[int] = mapped_column(nullable=True, comment="Candidate list size while building the code index")
+    code_hnsw_search_ef: Mapped[int] = mapped_column(nullable=True, comment="Candidate list size while searching the code index")
+
     project: Mapped["Project"] = relationship(
         back_populates="model_configs", uselist=False  # ensure 1-1 relationship
     )
@@ -0,0 +1,48 @@
+from .base import Base
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Text, Enum as SQLEnum
+
+from enum import Enum
+
+
+# enum for determining why a particular file was quarantined
+# NOTE: only limit breaches & crashes quarantine a file, other conversion errors fail the IngestionJob instead
+class QuarantineReason(Enum):
+    TIMEOUT = "timeout"
+    MEMORY = "memory"
+    CRASH = "crash"
+
+
+class QuarantinedFile(Base):
+    """
+    Documentation file that failed to convert within the configured time limit / RSS ceiling (or crashed its worker)
+
+    NOTE: Files are keyed by their hashed content, so a quarantined file is skipped by later
+    IngestionJobs until its content changes
+    """
+
+    __tablename__ = "quarantined_file"
+
+    hash: Mapped[str] = mapped_column(
+        String(100),
+        primary_key=True,
+        comment="The hashed file content corresponding to the quarantined file"
+    )
+
+    name: Mapped[str] = mapped_column(
+        nullable=False,
+        comment="The name of the file when it was quarantined"
+    )
+
+    reason: Mapped[QuarantineReason] = mapped_column(
+        SQLEnum(QuarantineReason),
+        nullable=False,
+        comment="Why conversion of this file was aborted"
+    )
+
+    detail: Mapped[str] = mapped_column(
+        Text,
+        nullable=True,
+        comment="Error message captured when conversion was aborted"
+    )
@@ -2,7 +2,7 @@ from .chat import ChatRequest
 from .data_source import DataSourceRequest
 from .project import ProjectRequest
 from .file import File, CodeFileExtension, DocsFileExtension, FileProcesingStatus
-from .chroma import DeleteCollectionDocsRequest
+from .chroma import DeleteCollectionDocsRequest, CollectionInclude, CollectionSourceType, ListingFormat, EmbeddingMigrationRequest, IndexSearchRequest
 
 __all__ = [
     "ChatRequest", 
@@ -12,5 +12,10 @@ __all__ = [
     "CodeFileExtension", 
     "DocsFileExtension", 
     "DeleteCollectionDocsRequest",
+    "CollectionInclude",
+    "CollectionSourceType",
+    "ListingFormat",
+    "EmbeddingMigrationRequest",
+    "IndexSearchRequest",
     "FileProcesingStatus"
 ]
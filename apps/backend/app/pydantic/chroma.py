@@ -1,5 +1,39 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from enum import Enum
+from typing import List, Literal, Optional
 
 class DeleteCollectionDocsRequest(BaseModel):
-    doc_ids: List
\ No newline at end of file
+    doc_ids: List
+
+
+class CollectionInclude(str, Enum):
+    DOCUMENTS = "documents"
+    METADATAS = "metadatas"
+    EMBEDDINGS = "embeddings"
+
+
+class CollectionSourceType(str, Enum):
+    DOCS = "DOCS"
+    CODE = "CODE"
+    ALL = "N/A"
+
+
+class ListingFormat(str, Enum):
+    JSON = "json"
+    NDJSON = "ndjson"
+
+
+class EmbeddingMigrationRequest(BaseModel):
+    source_type: Literal["DOCS", "CODE"]
+    embedding_provider: str
+    embedding_model: str
+
+    # reduce the dimensionality of re-embedded chunks (full dimensionality when not specified)
+    embedding_dimensions: Optional[int] = None
+
+
+class IndexSearchRequest(BaseModel):
+    source_type: Literal["DOCS", "CODE"]
+
+    # candidate list size while searching the HNSW index (higher trades latency for recall)
+    hnsw_search_ef: int = Field(ge=1)
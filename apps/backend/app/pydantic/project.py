@@ -1,8 +1,9 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
 from uuid import UUID
 
-from app.core import settings
+from app.core import settings, is_shared_collection_mode
+from app.models import TableStructureMode, DimensionReduction, IndexPreset
 
 
 class ProjectRequest(BaseModel):
@@ -14,9 +15,47 @@ class ProjectRequest(BaseModel):
     docs_embedding_provider: Optional[str] = settings.DOCS_EMBEDDING_PROVIDER
     docs_embedding_model: Optional[str] = settings.DOCS_EMBEDDING_MODEL
 
+    # allow for configuring when table structure extraction is ran on ingested PDFs
+    table_structure_mode: Optional[TableStructureMode] = TableStructureMode(settings.DOCLING_TABLE_STRUCTURE_MODE)
+
+    # allow for reducing the dimensionality of stored embeddings (full dimensionality when not specified)
+    docs_embedding_dimensions: Optional[int] = None
+    code_embedding_dimensions: Optional[int] = None
+    dimension_reduction: Optional[DimensionReduction] = None
+
+    # allow for tuning the HNSW index of each collection, via a preset and/or explicit parameters (Chroma defaults when not specified)
+    docs_index_preset: Optional[IndexPreset] = None
+    docs_hnsw_space: Optional[Literal["l2", "cosine", "ip"]] = None
+    docs_hnsw_m: Optional[int] = Field(None, ge=2)
+    docs_hnsw_construction_ef: Optional[int] = Field(None, ge=1)
+    docs_hnsw_search_ef: Optional[int] = Field(None, ge=1)
+
+    code_index_preset: Optional[IndexPreset] = None
+    code_hnsw_space: Optional[Literal["l2", "cosine", "ip"]] = None
+    code_hnsw_m: Optional[int] = Field(None, ge=2)
+    code_hnsw_construction_ef: Optional[int] = Field(None, ge=1)
+    code_hnsw_search_ef: Optional[int] = Field(None, ge=1)
+
     teams: Optional[List[UUID]] = (
         []
     )  # Note: once Team model is setup, this should likely be enforced
     epics: Optional[List[str]] = (
         []
     )  # List of Jira Epic's, that we can later used to determine if relevant "commits" should be include in collection
+
+
+    @model_validator(mode="after")
+    def reject_index_params_in_shared_mode(self) -> "ProjectRequest":
+        # NOTE: shared collections are created once per embedding model, so a Project's HNSW parameters would never apply
+        if is_shared_collection_mode():
+            index_params = [
+                name for name in type(self).model_fields
+                if (name.endswith("_index_preset") or "_hnsw_" in name) and getattr(self, name) is not None
+            ]
+            if index_params:
+                raise ValueError(
+                    f"HNSW index parameters ({', '.join(index_params)}) can't be configured per Project "
+                    f"when Chroma collections are shared between Projects"
+                )
+
+        return self
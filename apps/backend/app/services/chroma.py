@@ -1,13 +1,31 @@
 import logging
+import json
 from uuid import UUID
+from datetime import datetime
 
-from typing import Dict, Optional, List
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, List
+import threading
 
+from sqlalchemy import select, delete
 from sqlalchemy.orm import Session
 
-from app.services.util import get_normalized_project_name
-from app.core import ChromaClientManager
-from app.pydantic import DeleteCollectionDocsRequest
+from llama_index.core.base.embeddings.base import BaseEmbedding
+
+from app.core import get_collection_targets
+from app.ingestion import (
+    export_collections,
+    import_collections,
+    CollectionRebuild,
+    copy_collection,
+    garbage_collect_collections,
+    reembed_collection,
+    lock_collections_for_write
+)
+from app.embeddings import EmbeddingManager
+from app.core import ChromaClientManager, CollectionTarget, settings, get_sync_session_maker
+from app.models import EmbeddingMigration, ModelConfigs, Project, ProcessingStatus, RetiredPartition
+from app.pydantic import DeleteCollectionDocsRequest, EmbeddingMigrationRequest, IndexSearchRequest
 
 
 logger = logging.getLogger(__name__)
@@ -23,6 +41,7 @@ class ChromaService:
     ):
         self.db = db
         self.project_svc = project_svc
+        self.chroma_manager = chroma_manager
         self.client = chroma_manager.get_sync_client()
 
 
@@ -47,21 +66,9 @@ class ChromaService:
         project = self.project_svc.get_project_by_id(project_id)
         if "id" not in project: 
             return project
-        
-        project_name = get_normalized_project_name(project_name=project["name"])
-
 
-        match source_type:
-            case "DOCS":
-                self._delete_collection(project_name, "DOCS")
-            case "CODE":
-                return self._delete_collection(project_name, "CODE")
-            case "N/A":
-                collections = ["CODE", "DOCS"]
-                for c in collections:
-                    self._delete_collection(project_name, c)
-            case _:
-                raise Exception("Unknown source_type specified")
+        for target in self._get_collection_targets(project_id, source_type).values():
+            self._delete_collection(target)
     
 
     def delete_collection_documents(
@@ -83,31 +90,32 @@ class ChromaService:
         project = self.project_svc.get_project_by_id(project_id)
         if "id" not in project: 
             return project
-        
-        project_name = get_normalized_project_name(project_name=project["name"])
 
-        match source_type:
-            case "DOCS":
-                self._delete_documents(project_name, "DOCS", delete_collections.doc_ids)
-            case "CODE":
-                return self._delete_documents(project_name, "CODE", delete_collections.doc_ids)
-            case "N/A":
-                collections = ["CODE", "DOCS"]
-                for c in collections:
-                    self._delete_documents(project_name, c, delete_collections.doc_ids)
-            case _:
-                raise Exception("Unknown source_type specified")
+        for target in self._get_collection_targets(project_id, source_type).values():
+            self._delete_documents(target, delete_collections.doc_ids)
 
 
         return {"message": f"Successfully deleted documents from collections for Project={project_id}"}
 
-    def get_all_files(self, project_id: UUID, source_type: Optional[str] = "N/A"):
+    def get_all_files(
+            self,
+            project_id: UUID,
+            source_type: Optional[str] = "N/A",
+            limit: int = settings.CHROMA_LIST_DEFAULT_LIMIT,
+            offset: int = 0,
+            include: Optional[List[str]] = None,
+            where: Optional[Dict[str, Any]] = None
+    ):
         """
-        Retrieve all files stored within collections corresponding to a particular Project
+        Retrieve a page of files stored within collections corresponding to a particular Project
 
         Args:
             project_id (UUID): specific project id to retrieve files for 
             source_type (str): optional source type speciifc to get files for 
+            limit (int): maximum number of documents to return per collection
+            offset (int): number of documents to skip per collection
+            include (Optional[List[str]]): fields to return (documents & metadatas by default, embeddings only when requested)
+            where (Optional[Dict[str, Any]]): Chroma metadata filter
         """
         
         # retrieve Project by ID or return message to user indicating not found
@@ -115,97 +123,697 @@ class ChromaService:
         if "id" not in project: 
             return project
         
-        project_name = get_normalized_project_name(project_name=project["name"])
+        targets = self._get_collection_targets(project_id, source_type)
+        page = {"limit": limit, "offset": offset, "include": include, "where": where}
         
         match source_type:
-            case "DOCS":
-                res = self._get_files_from_collection(project_name, "DOCS")
-                return res if res else {"message": f"No Documents found in collection {project_name}_DOCS"}
-            case "CODE":
-                res = self._get_files_from_collection(project_name, "CODE")
-                return res if res else {"message": f"No Documents found in collection {project_name}_CODE"}
-            case "N/A":
-                collections = ["CODE", "DOCS"]
+            case "DOCS" | "CODE":
+                res = self._get_files_from_collection(targets[source_type], **page)
+                return res if res else {"message": f"No Documents found in collection {targets[source_type].name}"}
+            case _:
                 all_files = {} 
 
-                for c in collections:
-                    files = self._get_files_from_collection(project_name, c)
+                for c, target in targets.items():
+                    files = self._get_files_from_collection(target, **page)
                     if files:
                         all_files[c] = files
                     
                 if not all_files:
-                    return {"message": f"No Documents found in CODE or DOCS collection for Project={project_name}"}
-
-            case _:
-                raise Exception("Unknown source_type specified")
+                    return {"message": f"No Documents found in CODE or DOCS collection for Project={project['name']}"}
         
 
         return all_files
             
     
 
-    def _delete_documents(self, project_name: str, source_type: str, doc_ids: List):
+    def stream_files(
+            self,
+            project_id: UUID,
+            source_type: Optional[str] = "N/A",
+            include: Optional[List[str]] = None,
+            where: Optional[Dict[str, Any]] = None
+    ) -> Iterator[str]:
+        """
+        Stream files stored within collections corresponding to a particular Project as NDJSON (one document per line),
+        fetching a page at a time so memory is bounded by the page size rather than the collection size
+
+        Args:
+            project_id (UUID): specific project id to retrieve files for
+            source_type (str): optional source type speciifc to get files for
+            include (Optional[List[str]]): fields to return (documents & metadatas by default, embeddings only when requested)
+            where (Optional[Dict[str, Any]]): Chroma metadata filter
+        """
+
+        # NOTE: resolved before streaming begins, so failures are raised prior to the response being sent
+        project = self.project_svc.get_project_by_id(project_id)
+        if "id" not in project:
+            raise Exception(project.get("message", f"Project={project_id} not found"))
+
+        targets = self._get_collection_targets(project_id, source_type)
+        return self._stream_collections(list(targets.values()), include, where)
+
+
+    def _stream_collections(
+            self,
+            targets: List[CollectionTarget],
+            include: Optional[List[str]],
+            where: Optional[Dict[str, Any]]
+    ) -> Iterator[str]:
+        """
+        Page through each collection, yielding a JSON line per document
+
+        Args:
+            targets (List[CollectionTarget]): collections (or partitions of shared collections) to stream
+            include (Optional[List[str]]): fields to return
+            where (Optional[Dict[str, Any]]): Chroma metadata filter
+        """
+
+        page_size = settings.CHROMA_STREAM_PAGE_SIZE
+
+        for target in targets:
+            offset = 0
+            while True:
+                page = self._get_files_from_collection(target, page_size, offset, include, where)
+                if not page or "doc_ids" not in page:
+                    break
+
+                for i, doc_id in enumerate(page["doc_ids"]):
+                    line = {"source_type": target.source_type, "doc_id": doc_id}
+                    for key in ("documents", "meta_datas", "embeddings"):
+                        if key in page:
+                            line[key] = page[key][i]
+
+                    yield json.dumps(line) + "\n"
+
+                if page["next_offset"] is None:
+                    break
+                offset = page["next_offset"]
+
+
+    def export_collections(self, project_id: UUID, archive_path: Path, source_type: Optional[str] = "N/A") -> Dict:
+        """
+        Export the collection(s) of a particular Project to a tar archive of NPY vectors & JSONL metadata
+
+        Args:
+            project_id (UUID): specific project id to export collections for
+            archive_path (Path): path of the archive to write
+            source_type (str): optional source type specific collection to export
+        """
+
+        project = self.project_svc.get_project_by_id(project_id)
+        if "id" not in project:
+            raise Exception(project.get("message", f"Project={project_id} not found"))
+
+        counts = export_collections(self.chroma_manager, self._get_collection_targets(project_id, source_type), archive_path)
+        return {"message": f"Successfully exported collections for Project={project_id}", "counts": counts}
+
+
+    def import_collections(self, project_id: UUID, archive_path: Path, source_type: Optional[str] = "N/A") -> Dict:
+        """
+        Restore the collection(s) of a particular Project from an exported archive, upserting into existing collections
+
+        Args:
+            project_id (UUID): specific project id to restore collections for
+            archive_path (Path): path of the archive to read
+            source_type (str): optional source type specific collection to restore
+        """
+
+        project = self.project_svc.get_project_by_id(project_id)
+        if "id" not in project:
+            raise Exception(project.get("message", f"Project={project_id} not found"))
+
+        counts = import_collections(self.chroma_manager, archive_path, self._get_collection_targets(project_id, source_type))
+        return {"message": f"Successfully imported collections for Project={project_id}", "counts": counts}
+
+
+    def get_rebuild_collections(self, project_id: UUID, source_type: Optional[str] = "N/A") -> Dict[str, str]:
+        """
+        Retrieve the logical collection name(s) of a particular Project to rebuild, verifying they exist
+
+        NOTE: Shared collections are rebuilt as a whole, including the partitions of every other Project
+
+        Args:
+            project_id (UUID): specific project id to rebuild collections for
+            source_type (str): optional source type specific collection to rebuild
+        """
+
+        project = self.project_svc.get_project_by_id(project_id)
+        if "id" not in project:
+            raise Exception(project.get("message", f"Project={project_id} not found"))
+
+        collections = {s: target.name for s, target in self._get_collection_targets(project_id, source_type).items()}
+        for name in collections.values():
+            self.chroma_manager.get_collection(name)
+
+        return collections
+
+
+    def rebuild_collections(self, collections: Dict[str, str]) -> Dict[str, str]:
+        """
+        Blue/green rebuild each collection into a new version (copying the version currently served), swapping
+        its alias once the new version is complete while queries continue against the current version
+
+        Args:
+            collections (Dict[str, str]): logical collection names keyed by source type
+        """
+
+        rebuilt = {}
+        for source_type, name in collections.items():
+            # NOTE: source types share a collection when collections are shared & both use the same model
+            if name in rebuilt.values():
+                continue
+            rebuilt[source_type] = CollectionRebuild(self.chroma_manager, name).run(copy_collection(self.chroma_manager, name))
+
+        return rebuilt
+
+
+    def garbage_collect_collections(self, grace_seconds: float = settings.COLLECTION_GC_GRACE_SECONDS) -> Dict:
         """
-        Delete Documents from ChromaDB collection
+        Delete collection versions retired (or failed) longer than the grace period
 
         Args:
-            project_name (str): normalized project name corresponding to collection
-            source_type (str): relevant source type to delete documents for 
+            grace_seconds (float): seconds a retired version is kept for queries still using it
+        """
+
+        deleted = garbage_collect_collections(self.chroma_manager, grace_seconds)
+        return {"deleted": deleted}
+
+
+    def get_index_configuration(self, project_id: UUID, source_type: Optional[str] = "N/A") -> Dict:
+        """
+        Retrieve the HNSW index configuration of the collection(s) of a particular Project
+
+        Args:
+            project_id (UUID): specific project id to retrieve index configuration for
+            source_type (str): optional source type specific collection to retrieve index configuration for
+        """
+
+        project = self.project_svc.get_project_by_id(project_id)
+        if "id" not in project:
+            return project
+
+        return {
+            s: {
+                "collection": target.name,
+                "shared": target.shared,
+                "hnsw": (self.chroma_manager.get_collection(target.name).configuration_json or {}).get("hnsw")
+            }
+            for s, target in self._get_collection_targets(project_id, source_type).items()
+        }
+
+
+    def update_search_ef(self, project_id: UUID, request: IndexSearchRequest) -> Dict:
+        """
+        Adjust the search ef of a Project's collection, trading query latency for recall without rebuilding the index
+
+        Args:
+            project_id (UUID): specific project id to adjust the collection of
+            request (IndexSearchRequest): source type of the collection & search ef to apply
+        """
+
+        project = self.project_svc.get_project_by_id(project_id)
+        if "id" not in project:
+            return project
+
+        target = self._get_collection_targets(project_id, request.source_type)[request.source_type]
+        if target.shared:
+            raise Exception(
+                f"Collection={target.name} is shared with other Projects, so its index can't be tuned per Project"
+            )
+
+        # NOTE: applied to the version currently served, rebuilt versions carry the configuration over
+        collection = self.chroma_manager.get_collection(target.name)
+        collection.modify(configuration={"hnsw": {"ef_search": request.hnsw_search_ef}})
+
+        model_configs = self.db.execute(
+            select(ModelConfigs).where(ModelConfigs.project_id == project_id)
+        ).scalars().one()
+        if request.source_type == "DOCS":
+            model_configs.docs_hnsw_search_ef = request.hnsw_search_ef
+        else:
+            model_configs.code_hnsw_search_ef = request.hnsw_search_ef
+
+        logger.info(f"Set search ef of collection={collection.name} to {request.hnsw_search_ef}")
+
+        return {
+            "message": f"Successfully updated search ef of collection {target.name} for Project={project_id}",
+            "hnsw": (collection.configuration_json or {}).get("hnsw")
+        }
+
+
+    def init_embedding_migration(self, project_id: UUID, request: EmbeddingMigrationRequest) -> Dict:
+        """
+        Persist a new EmbeddingMigration re-embedding a Project's collection with another embedding model
+
+        Args:
+            project_id (UUID): specific project id to re-embed the collection of
+            request (EmbeddingMigrationRequest): source type of the collection & embedding model to re-embed with
+        """
+
+        project = self.project_svc.get_project_by_id(project_id)
+        if "id" not in project:
+            raise Exception(project.get("message", f"Project={project_id} not found"))
+
+        in_progress = self.db.execute(
+            select(EmbeddingMigration.id).where(
+                EmbeddingMigration.project_id == project_id,
+                EmbeddingMigration.source_type == request.source_type,
+                EmbeddingMigration.processing_status == ProcessingStatus.IN_PROGRESS
+            )
+        ).scalars().first()
+        if in_progress:
+            raise Exception(f"EmbeddingMigration={in_progress} is already in progress for Project={project_id}")
+
+        target = self._get_collection_targets(project_id, request.source_type)[request.source_type]
+        collection = self.chroma_manager.get_collection(target.name)
+
+        # NOTE: Chroma can't count filtered entries, so partitions are counted by retrieving their ids only
+        total_chunks = len(collection.get(where=target.scope(), include=[])["ids"]) if target.shared else collection.count()
+
+        migration = EmbeddingMigration(
+            project_id=project_id,
+            source_type=request.source_type,
+            processing_status=ProcessingStatus.IN_PROGRESS,
+            embedding_provider=request.embedding_provider,
+            embedding_model=request.embedding_model,
+            embedding_dimensions=request.embedding_dimensions,
+            total_chunks=total_chunks,
+            processed_chunks=0,
+            start_time=datetime.now()
+        )
+
+        # NOTE: committed right away, as the migration is ran by a background task using its own session
+        self.db.add(migration)
+        self.db.flush()
+        self.db.commit()
+
+        return self._to_migration_dict(migration)
+
+
+    def run_embedding_migration(self, migration_id: UUID):
+        """
+        Re-embed the chunks stored within a Project's collection into a new collection version, then swap the
+        collection & the Project's configured embedding model over together
+
+        NOTE: Chunk text is read back from Chroma, so no sources are re-downloaded or re-converted, and queries
+        continue to be served from the current collection (with the current model) until the swap
+
+        Args:
+            migration_id (UUID): id of the EmbeddingMigration to run
+        """
+
+        session_maker = get_sync_session_maker()
+        with session_maker() as session:
+            migration = session.get(EmbeddingMigration, migration_id)
+            project = session.get(Project, migration.project_id)
+            model_configs = session.execute(
+                select(ModelConfigs).where(ModelConfigs.project_id == migration.project_id)
+            ).scalars().one()
+
+            project_id = migration.project_id
+            source_type = migration.source_type
+            provider = migration.embedding_provider
+            model_name = migration.embedding_model
+            dimensions = migration.embedding_dimensions
+
+            # embedding model configured as it will be once migrated
+            migrated_configs = ModelConfigs(
+                docs_embedding_provider=model_configs.docs_embedding_provider,
+                docs_embedding_model=model_configs.docs_embedding_model,
+                docs_embedding_dimensions=model_configs.docs_embedding_dimensions,
+                code_embedding_provider=model_configs.code_embedding_provider,
+                code_embedding_model=model_configs.code_embedding_model,
+                code_embedding_dimensions=model_configs.code_embedding_dimensions,
+                dimension_reduction=model_configs.dimension_reduction
+            )
+            _set_embedding_model(migrated_configs, source_type, provider, model_name, dimensions)
+
+            target = get_collection_targets(project, source_type)[source_type]
+            migrated_target = get_collection_targets(project, source_type, migrated_configs)[source_type]
+
+        def on_swap(session: Session):
+            model_configs = session.execute(
+                select(ModelConfigs).where(ModelConfigs.project_id == project_id).with_for_update()
+            ).scalars().one()
+            _set_embedding_model(model_configs, source_type, provider, model_name, dimensions)
+
+            migration = session.get(EmbeddingMigration, migration_id)
+            migration.processing_status = ProcessingStatus.SUCCESS
+            migration.end_time = datetime.now()
+
+        logger.info(f"Re-embedding collection={target.name} with embedding model={model_name} for EmbeddingMigration={migration_id}")
+
+        try:
+            embedding_model = EmbeddingManager(migrated_configs).get_embedding_model(source_type)
+
+            if target.shared:
+                collection_name = self._migrate_shared_partition(migration_id, target, migrated_target, embedding_model, on_swap)
+            else:
+                collection_name = self._migrate_collection_version(migration_id, target, embedding_model, on_swap)
+        except Exception as e:
+            logger.error(f"EmbeddingMigration={migration_id} failed: {str(e)}")
+            with session_maker() as session:
+                migration = session.get(EmbeddingMigration, migration_id)
+                migration.processing_status = ProcessingStatus.FAILED
+                migration.error = str(e)
+                migration.end_time = datetime.now()
+                session.commit()
+            return
+
+        logger.info(f"EmbeddingMigration={migration_id} swapped collection={target.name} to collection={collection_name}")
+
+
+    def _migrate_collection_version(
+            self,
+            migration_id: UUID,
+            target: CollectionTarget,
+            embedding_model: BaseEmbedding,
+            on_swap: Callable[[Session], None]
+    ) -> str:
+        """
+        Re-embed a Project's collection into a new version of the collection (blue/green), swapping the alias
+        & model configuration together
+
+        Args:
+            migration_id (UUID): id of the EmbeddingMigration being ran
+            target (CollectionTarget): collection to re-embed
+            embedding_model (BaseEmbedding): embedding model to re-embed with
+            on_swap (Callable[[Session], None]): applies the new model configuration within the swap's transaction
+        """
+
+        rebuild = CollectionRebuild(self.chroma_manager, target.name)
+
+        def on_progress(processed: int):
+            self._update_migration_progress(migration_id, processed, rebuild.collection_name)
+
+        return rebuild.run(
+            reembed_collection(self.chroma_manager, target.name, embedding_model, on_progress=on_progress),
+            on_swap=lambda session: self._record_migration_collection(session, migration_id, rebuild.collection_name, on_swap)
+        )
+
+
+    def _migrate_shared_partition(
+            self,
+            migration_id: UUID,
+            target: CollectionTarget,
+            migrated_target: CollectionTarget,
+            embedding_model: BaseEmbedding,
+            on_swap: Callable[[Session], None]
+    ) -> str:
+        """
+        Re-embed a Project's partition of a shared collection into the partition of the collection shared by
+        Projects embedding with the new model, then switch the model configuration over
+
+        NOTE: The previous partition is recorded as retired & deleted by garbage collection once queries using the previous
+        model configuration have completed. Chunks left within the partition written to (i.e by an earlier migration out
+        of it within the grace period) are stale, so their pending deletion is cancelled & they're cleared upfront
+
+        Args:
+            migration_id (UUID): id of the EmbeddingMigration being ran
+            target (CollectionTarget): partition to re-embed
+            migrated_target (CollectionTarget): partition to write re-embedded chunks to
+            embedding_model (BaseEmbedding): embedding model to re-embed with
+            on_swap (Callable[[Session], None]): applies the new model configuration
+        """
+
+        if migrated_target.name == target.name:
+            raise Exception(f"Chunks are already stored within collection={target.name} for the embedding model")
+
+        collection = self.chroma_manager.get_or_create_collection(migrated_target.name)
+
+        def on_progress(processed: int):
+            self._update_migration_progress(migration_id, processed, migrated_target.name)
+
+        session_maker = get_sync_session_maker()
+        with lock_collections_for_write(self.chroma_manager, [target.name, migrated_target.name]):
+            self._cancel_partition_deletions(migrated_target)
+            collection.delete(where=migrated_target.scope())
+
+            try:
+                # NOTE: chunks keep their (partition prefixed) ids & partition metadata, so are copied as is
+                fill = reembed_collection(
+                    self.chroma_manager, target.name, embedding_model, on_progress=on_progress, where=target.scope()
+                )
+                fill(collection)
+            except Exception:
+                collection.delete(where=migrated_target.scope())
+                raise
+
+            with session_maker() as session:
+                self._record_migration_collection(session, migration_id, migrated_target.name, on_swap)
+                session.add(RetiredPartition(
+                    migration_id=migration_id,
+                    collection_name=target.name,
+                    project_id=UUID(target.project_id),
+                    source_type=target.source_type,
+                    retired_at=datetime.now()
+                ))
+                session.commit()
+
+        # retired partitions are garbage collected once queries using the previous model have completed
+        timer = threading.Timer(
+            settings.COLLECTION_GC_GRACE_SECONDS + 1,
+            garbage_collect_collections,
+            args=(self.chroma_manager,)
+        )
+        timer.daemon = True
+        timer.start()
+
+        return migrated_target.name
+
+
+    def _cancel_partition_deletions(self, target: CollectionTarget):
+        """
+        Cancel pending deletions of a partition retired by earlier migrations, waiting on any garbage collection
+        currently deleting it
+
+        Args:
+            target (CollectionTarget): partition about to be written to
+        """
+
+        session_maker = get_sync_session_maker()
+        with session_maker() as session:
+            cancelled = session.execute(
+                delete(RetiredPartition)
+                .where(
+                    RetiredPartition.collection_name == target.name,
+                    RetiredPartition.project_id == UUID(target.project_id),
+                    RetiredPartition.source_type == target.source_type
+                )
+                .returning(RetiredPartition.migration_id)
+            ).scalars().all()
+            session.commit()
+
+        if cancelled:
+            logger.info(f"Cancelled deletion of partition={target.partition} of collection={target.name} retired by EmbeddingMigrations={cancelled}")
+
+
+    def _update_migration_progress(self, migration_id: UUID, processed: int, collection_name: str):
+        session_maker = get_sync_session_maker()
+        with session_maker() as session:
+            migration = session.get(EmbeddingMigration, migration_id)
+            migration.processed_chunks = processed
+            migration.collection_name = collection_name
+            session.commit()
+
+
+    def _record_migration_collection(
+            self,
+            session: Session,
+            migration_id: UUID,
+            collection_name: str,
+            on_swap: Callable[[Session], None]
+    ):
+        session.get(EmbeddingMigration, migration_id).collection_name = collection_name
+        on_swap(session)
+
+
+    def get_embedding_migration(self, migration_id: UUID) -> Dict:
+        """
+        Retrieve the status & progress of an EmbeddingMigration
+
+        Args:
+            migration_id (UUID): id of the EmbeddingMigration
+        """
+
+        migration = self.db.get(EmbeddingMigration, migration_id)
+        if not migration:
+            return {"message": f"No embedding migration found corresponding to ID {migration_id}"}
+
+        return self._to_migration_dict(migration)
+
+
+    def _to_migration_dict(self, migration: EmbeddingMigration) -> Dict:
+        """
+        Convert EmbeddingMigration to its response, including progress as a percentage
+
+        Args:
+            migration (EmbeddingMigration): migration to convert
+        """
+
+        progress = None
+        if migration.total_chunks:
+            progress = round(100 * min(migration.processed_chunks / migration.total_chunks, 1.0), 2)
+        elif migration.total_chunks == 0:
+            progress = 100.0
+
+        return {
+            "id": migration.id,
+            "project_id": migration.project_id,
+            "source_type": migration.source_type,
+            "status": migration.processing_status,
+            "embedding_provider": migration.embedding_provider,
+            "embedding_model": migration.embedding_model,
+            "embedding_dimensions": migration.embedding_dimensions,
+            "total_chunks": migration.total_chunks,
+            "processed_chunks": migration.processed_chunks,
+            "progress": progress,
+            "collection_name": migration.collection_name,
+            "error": migration.error,
+            "start_time": migration.start_time,
+            "end_time": migration.end_time
+        }
+
+
+    def _delete_documents(self, target: CollectionTarget, doc_ids: List):
+        """
+        Delete Documents from ChromaDB collection (only those within the Project's partition of shared collections)
+
+        Args:
+            target (CollectionTarget): collection (or partition) to delete documents from
             doc_ids (list): list of document ids to delete from DB
         """
 
-        collection = self.client.get_collection(f"{project_name}_{source_type}")
-        collection.delete(ids=doc_ids)
-        logger.info(f"Successfully deleted documents with ids={doc_ids} from collection={project_name}_{source_type}")
+        with lock_collections_for_write(self.chroma_manager, [target.name]):
+            collection = self.chroma_manager.get_collection(target.name)
+            collection.delete(ids=doc_ids, where=target.scope())
+        logger.info(f"Successfully deleted documents with ids={doc_ids} from collection={target.name}")
 
 
         
     
-    def _get_files_from_collection(self, project_name: str, source_type: str):
+    def _get_files_from_collection(
+            self,
+            target: CollectionTarget,
+            limit: int = settings.CHROMA_LIST_DEFAULT_LIMIT,
+            offset: int = 0,
+            include: Optional[List[str]] = None,
+            where: Optional[Dict[str, Any]] = None
+    ):
         """
-        Get Documents ffrom ChromaDB collection
+        Get page of Documents from ChromaDB collection (or the Project's partition of a shared collection)
 
         Args:
-            project_name (str): normalized project name corresponding to collection
-            source_type (str): relevant source type to get documents for 
+            target (CollectionTarget): collection (or partition) to get documents from
+            limit (int): maximum number of documents to return
+            offset (int): number of documents to skip
+            include (Optional[List[str]]): fields to return (documents & metadatas by default)
+            where (Optional[Dict[str, Any]]): Chroma metadata filter
         """
 
         try:
-            collection = self.client.get_collection(f"{project_name}_{source_type}")
+            collection = self.chroma_manager.get_collection(target.name)
         except Exception as e:
-            logger.debug(f"Collection {project_name}_{source_type} does not exist: {e}")
+            logger.debug(f"Collection {target.name} does not exist: {e}")
             return None
 
-        if collection.count() == 0:
-            logger.debug(f"No Documents currently ingested for Project={project_name} and SourceType={source_type}")
+        # NOTE: Chroma doesn't support counting filtered documents, so the total is only known for unshared collections
+        total = None
+        if not target.shared:
+            total = collection.count()
+            if total == 0:
+                logger.debug(f"No Documents currently ingested in collection={target.name}")
+                return {"message": "No documents found"}
+
+        # NOTE: embeddings are left out unless explicitly requested, as they dominate the response size
+        include = include or ["documents", "metadatas"]
+        docs = collection.get(limit=limit, offset=offset, include=include, where=target.scope(where))
+        document_ids = docs['ids']
+
+        if target.shared and not document_ids and not where and offset == 0:
+            logger.debug(f"No Documents currently ingested in partition={target.partition} of collection={target.name}")
             return {"message": "No documents found"}
 
-        docs = collection.get()
-        document_ids = docs['ids']  
-        documents = docs['documents']  
-        metadatas = docs['metadatas']  
-        embeddings = docs.get('embeddings')  
+        logger.info(
+            f"Successfully retrieved {len(document_ids)} documents from collection {target.name} "
+            f"(offset={offset}, limit={limit})"
+        )
 
-        logger.info(f"Successfully retrieved {len(document_ids)} documents from collection {project_name}_{source_type}")
-
-        return {
+        page = {
             "doc_ids": document_ids,
-            "documents": documents,
-            "meta_datas": metadatas,
-            "embeddings": embeddings
-        } 
+            "total": None if where else total,
+            "limit": limit,
+            "offset": offset,
+            "next_offset": offset + len(document_ids) if len(document_ids) == limit else None
+        }
+
+        if "documents" in include:
+            page["documents"] = docs["documents"]
+        if "metadatas" in include:
+            page["meta_datas"] = docs["metadatas"]
+        if "embeddings" in include:
+            page["embeddings"] = [[float(x) for x in embedding] for embedding in docs["embeddings"]]
 
+        return page
 
-    def _delete_collection(self, project_name: str, source_type: str):
+
+    def _delete_collection(self, target: CollectionTarget):
         """
-        Delete collection from ChromaDB
+        Delete collection from ChromaDB (or only the Project's partition of shared collections)
 
         Args:
-            project_name (str): normalized project name corresponding to collection
-            source_type (str): relevant source type corresponding to collection to remove 
+            target (CollectionTarget): collection (or partition) to remove
         """
 
-        self.client.delete_collection(name=f"{project_name}_{source_type}")
-        logger.info(f"Successfully deleted the collection {project_name}_{source_type}")
+        with lock_collections_for_write(self.chroma_manager, [target.name]):
+            if target.shared:
+                self.chroma_manager.get_collection(target.name).delete(where=target.scope())
+                logger.info(f"Successfully deleted partition={target.partition} of the collection {target.name}")
+                return
+
+            self.chroma_manager.delete_collection(target.name)
+        logger.info(f"Successfully deleted the collection {target.name}")
 
 
+    def _get_collection_targets(self, project_id: UUID, source_type: Optional[str] = "N/A") -> Dict[str, CollectionTarget]:
+        """
+        Retrieve the collections (or partitions of shared collections) of a particular Project keyed by source type
+
+        Args:
+            project_id (UUID): specific project id to retrieve collections for
+            source_type (str): optional source type specific collection to retrieve
+        """
+
+        project = self.db.get(Project, project_id)
+        if not project:
+            raise Exception(f"No project found corresponding to ID {project_id}")
+
+        return get_collection_targets(project, source_type)
+
+
+def _set_embedding_model(
+        model_configs: ModelConfigs,
+        source_type: str,
+        provider: str,
+        model_name: str,
+        dimensions: Optional[int]
+):
+    """
+    Set the embedding model configured for a source type
+
+    Args:
+        model_configs (ModelConfigs): model configurations to update
+        source_type (str): source type the embedding model is used for (DOCS or CODE)
+        provider (str): embedding provider
+        model_name (str): embedding model name
+        dimensions (Optional[int]): dimensionality embeddings are reduced to
+    """
+
+    if source_type == "DOCS":
+        model_configs.docs_embedding_provider = provider
+        model_configs.docs_embedding_model = model_name
+        model_configs.docs_embedding_dimensions = dimensions
+    else:
+        model_configs.code_embedding_provider = provider
+        model_configs.code_embedding_model = model_name
+        model_configs.code_embedding_dimensions = dimensions
@@ -2,7 +2,7 @@ import logging
 from pathlib import Path
 from datetime import datetime
 from uuid import UUID, uuid4
-from typing import Tuple, Iterator, Dict, List
+from typing import Tuple, Iterator, Optional
 import asyncio
 import threading
 
@@ -10,26 +10,14 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import DataSource, IngestionJob, ProcessingStatus, RecordType, ProjectData, Project
+from app.models import DataSource, IngestionJob, ProcessingStatus, RecordType, ProjectData, Project, TableStructureMode
 from app.data_providers import GithubDataProvider
 from app.core import settings, get_async_session_maker
-from app.embeddings import EmbeddingManager
-from app.services.util import get_normalized_project_name
 from app.core import ChromaClientManager
+from app.conversion import ConversionSupervisor, ConversionStats
+from app.ingestion import IngestionPipeline
 
-from docling.document_converter import DocumentConverter, PdfFormatOption
-from docling.datamodel.base_models import InputFormat
-from docling.exceptions import ConversionError
-from docling.pipeline.threaded_standard_pdf_pipeline import ThreadedStandardPdfPipeline
-from docling.datamodel.pipeline_options import ThreadedPdfPipelineOptions
-from docling.datamodel.accelerator_options import AcceleratorDevice, AcceleratorOptions
-from docling.chunking import HybridChunker
-from docling.datamodel.document import ConversionResult
-from docling_core.transforms.chunker.hybrid_chunker import DocChunk
-
-from llama_index.vector_stores.chroma import ChromaVectorStore
-from llama_index.core import StorageContext, VectorStoreIndex
-from llama_index.core.schema import TextNode
+from docling_core.types.doc import DoclingDocument
 
 logger = logging.getLogger(__name__)
 
@@ -124,12 +112,13 @@ class IngestionJobService:
 
             # documentation files were ingested
             # TODO: Consider moving logic surronding chunking & converting & storing to Chroma in their own seperate services 
+            conversion_stats = None
             if has_docs:
                 logger.info(f"IngestionJob for DataSource={data_source_id} has ingested relevant docs files; chunking & saving to ChromaDB")
 
                 # TODO: Consider thread pool based on available resources to user (CPU cores, GPU, etc)
                 # run Docling conversion, chunking, and ChromaDB persistence in seperate worker thread 
-                await asyncio.to_thread(
+                conversion_stats = await asyncio.to_thread(
                     self.convert_chunk_and_store,
                     data_source,
                     project_id,
@@ -154,7 +143,8 @@ class IngestionJobService:
                 status=ProcessingStatus.SUCCESS,
                 end_time=job_end_time,
                 duration=duration.seconds,
-                session=self.db # use main DB session
+                session=self.db, # use main DB session
+                conversion_stats=conversion_stats
             )
 
             logger.info(
@@ -189,10 +179,10 @@ class IngestionJobService:
             data_source: DataSource, 
             project_id: UUID,
             job_pk: UUID
-        ):
+        ) -> ConversionStats:
         """
         Convert downloaded Documentation files to Docling files, chunk using Docling's HybridChunker,
-        convert to LlamaIndex TextNodes & store in relevant Chroma DB collection
+        embed & store in relevant Chroma DB collection as a streaming pipeline
 
         Args:
             data_source (DataSource): the data source corresponding to current ingestion job
@@ -201,21 +191,29 @@ class IngestionJobService:
 
         logger.info(f"Converting, chunking, and storing downloaded Documentation via workerThreadId={threading.get_ident()}")
 
-        # convert docs to docling files 
-        converted_files = self._convert_docs_files_to_docling(job_pk)
-
-        # chunk ingested documentation based on configured project embedding model
-        project_chunks = self._chunk_docs(data_source, project_id, converted_files)
-        logger.debug('Successfully chunked ingested documentation for each project')
-
-        # convert docling project chunks to LlamaIndex TextNodes
-        nodes = self._convert_to_text_nodes(project_chunks)
-        logger.debug(f"Successfully convert DocChunks to LlamaIndex TextNode's")
+        # convert docs to docling files
+        conversion_supervisor = ConversionSupervisor(
+            table_structure_mode=self._get_table_structure_mode(data_source, project_id)
+        )
+        converted_files = self._convert_docs_files_to_docling(job_pk, conversion_supervisor)
+        if converted_files is None:
+            return conversion_supervisor.stats
+
+        # stream converted docs through chunking, embedding & storing within each Project's Chroma DB collection
+        pipeline = IngestionPipeline(
+            data_source=data_source,
+            chroma_manager=self.chroma_mnger,
+            source_type="DOCS",
+            project_id=project_id
+        )
+        timings = pipeline.run(converted_files)
 
-        # store results within Chroma DB, using embedding specified DataSource
-        self._save_to_chroma(nodes, "DOCS", data_source)
+        logger.info(
+            f"Succesfully converted, chunked, and stored downloaded Documentation files for IngestionJob={job_pk} "
+            f"(busy seconds per stage: {', '.join(f'{name}={timing.busy:.2f}' for name, timing in timings.items())})"
+        )
 
-        logger.info(f"Succesfully converted, chunked, and stored downloaded Documentation files")
+        return conversion_supervisor.stats
 
 
     async def update_ingestion_job(
@@ -224,7 +222,8 @@ class IngestionJobService:
             status: ProcessingStatus,
             end_time: datetime, 
             duration: int, 
-            session: AsyncSession
+            session: AsyncSession,
+            conversion_stats: Optional[ConversionStats] = None
         ):
         """
         Update existing IngestionJob with relevant status, end_time, and duration
@@ -234,6 +233,7 @@ class IngestionJobService:
             status (ProcessingStatus): the status of the IngestionJob
             end_time (datetime): time of completion for IngestionJob 
             duration (int): total amount of time it took to complete ingestion job
+            conversion_stats (Optional[ConversionStats]): page level statistics from converting documentation files
         """
 
         ingestion_job = await session.get(IngestionJob, job_pk)
@@ -244,6 +244,11 @@ class IngestionJobService:
         ingestion_job.end_time = end_time
         ingestion_job.total_duration = duration 
 
+        if conversion_stats:
+            ingestion_job.ocr_pages = conversion_stats.ocr_pages
+            ingestion_job.ocr_skipped_pages = conversion_stats.ocr_skipped_pages
+            ingestion_job.quarantined_files = conversion_stats.quarantined_files
+
         session.add(ingestion_job)
         await session.flush()
         await session.commit()
@@ -307,67 +312,6 @@ class IngestionJobService:
         return code_path, docs_path
     
 
-    def _convert_to_text_nodes(self, chunks: Dict) -> Dict[str, List[TextNode]]:
-        """
-        Convert Docling chunks to TextNodes in order to store within ChromaDB 
-
-        Args:
-            chunks (Dict): mapping of a Project to a list of Docling chunks for relevant ingested Documents 
-        """
-        project_nodes = {}
-
-        logger.debug(f"Converting Chunks to LlamaIndex TextNodes in order to store in ChromaDB")
-        for project, chunked_data in chunks.items():
-
-            project_nodes[project] = []
-            for i, data in enumerate(chunked_data):
-
-                # extract DocChunk & ContextChunk from mapping
-                doc_chunk = data['doc_chunk']
-                context_chunk = data['contextualized_chunk']
-
-                project_nodes[project].append(
-                    TextNode(
-                        _id=f"{doc_chunk.meta.origin.filename}_{i}", 
-                        text=context_chunk,
-                        metadata=self._get_chunk_meta_data(doc_chunk, i, project)
-                    )
-                )
-        
-        return project_nodes
-
-
-    def _get_chunk_meta_data(self, chunk: DocChunk, i: int, project: str) -> Dict:
-            """
-            Helper function to extract relevant metadata for a particular Document Chunk 
-
-            Args:
-                chunk (DocChunk): document chunk to extract meta data for 
-                i (int): current position 
-                project (str): relevant project this chunk belongs to
-            """
-            chunks_meta_data = chunk.meta 
-
-            origin_file = chunks_meta_data.origin.filename
-            mimetype = chunks_meta_data.origin.mimetype
-            headings = chunks_meta_data.headings
-            document_hash = chunks_meta_data.origin.binary_hash
-
-            content_types = ",".join(list(set([
-                str(item.label)
-                for item in chunks_meta_data.doc_items 
-            ])))
-
-            # TODO: Add file name, file path, file hash too
-            return {
-                "chunk_idx": f"{get_normalized_project_name(project)}_{i}",
-                "source": origin_file,
-                "mimetype": mimetype,
-                "headings": " > ".join(headings) if headings else "No Headings",
-                "document_hash": document_hash,
-                "content_types": content_types
-            }
-
     def _create_tmp_dirs(self, job_pk: UUID):
         """
         Create temporary directory for storing downloaded code and documentation files
@@ -383,44 +327,38 @@ class IngestionJobService:
 
         return code_path, docs_path
 
-    def _convert_docs_files_to_docling(self, job_pk: UUID) -> Iterator[ConversionResult]:
+    def _get_table_structure_mode(self, data_source: DataSource, project_id: Optional[UUID] = None) -> TableStructureMode:
         """
-        Convert each temporary document downloaded to a markdown file
+        Determine the table structure mode to convert documentation with, using the most demanding
+        mode configured across the Projects the ingestion job is ran for
 
-        TODO: Configure onnxruntime
+        NOTE: Documentation is converted once per IngestionJob & shared across each Project
+
+        Args:
+            data_source (DataSource): the data source corresponding to current ingestion job
+            project_id (Optional[UUID]): optional specified project to run ingestion job for
         """
 
-        # convert configured docs file extensions to docling InputFormats
-        allowed_formats = [
-            InputFormat(allowed_format.lower())
-            for allowed_format in settings.DOCS_FILE_EXTENSIONS
+        default_mode = TableStructureMode(settings.DOCLING_TABLE_STRUCTURE_MODE)
+        priority = [TableStructureMode.OFF, TableStructureMode.AUTO, TableStructureMode.ALWAYS]
+
+        modes = [
+            record.project.model_configs.table_structure_mode or default_mode
+            for record in data_source.project_data
+            if not project_id or record.project.id == project_id
         ]
 
-        # setup pipeline pipeline options
-        try:
-            # TODO: Consider toggling on OCR for extracting text from image-based content
-            pipeline_options = ThreadedPdfPipelineOptions(
-                accelerator_options=AcceleratorOptions(
-                    device=AcceleratorDevice(settings.DOCLING_ACCELERATOR_DEVICE)
-                ),
-                table_batch_size=4,
-                layout_batch_size=64,
-            )
-            pipeline_options.do_table_structure = True
-        except ValueError as e:
-            logger.error(f"Failed to created ThreadStandardPdfPipeline", exc_info=True)
-            raise e
-
-        # create converter for creating Docling Documents from our local files
-        docs_converter = DocumentConverter(
-            allowed_formats=allowed_formats,
-            format_options={
-                InputFormat.PDF: PdfFormatOption(
-                    pipeline_cls=ThreadedStandardPdfPipeline,
-                    pipeline_options=pipeline_options,
-                )
-            },
-        )
+        return max(modes, key=priority.index, default=default_mode)
+
+
+    def _convert_docs_files_to_docling(self, job_pk: UUID, conversion_supervisor: ConversionSupervisor) -> Iterator[DoclingDocument]:
+        """
+        Convert each temporary document downloaded to a Docling document
+
+        Args:
+            job_pk (UUID): unique ID for current ingestion job
+            conversion_supervisor (ConversionSupervisor): supervisor used to convert & track statistics for the job's documents
+        """
 
         # retrieve list of files from tmp docs
         tmp_docs = Path(f"{settings.TMP_DOCS}/{job_pk}") 
@@ -436,57 +374,8 @@ class IngestionJobService:
             )
             return
 
-        # convert all docs files to Docling Docs
-        try:
-            conv_results = docs_converter.convert_all(filtered_doc_files)
-            logger.info(f"Successfully converted ingested Documentation files to Docling files")
-        except ConversionError as e:
-            logger.error(f"Failed to convert all documents ingested", exc_info=True)
-            raise e
-
-
-        return conv_results
-
-
-    def _save_to_chroma(self, project_chunks: dict, source_type: str, data_source: DataSource): 
-        """
-        Save context-rich ingested documentation and code to our relevant Chroma collections based on Projects 
-        this ingested job is being ran for 
-
-        Args:
-            project_chunks (dict): relevant chunked docs/code 
-            source_type (str): the content type of the files being saved 
-        """
-        
-        # create mapping of project name to Project model 
-        project_mapping = {record.project.project_name: record.project for record in data_source.project_data} 
-
-        # NOTE: Llama Index doesn't support workign with Async Client when creating ChromaVectorStore / VectorStoreIndex
-        chroma_client = self.chroma_mnger.get_sync_client() 
-
-        for project, nodes in project_chunks.items():
-
-            # get Project model 
-            curr_project = project_mapping[project]
-
-            # get embedding manager for project
-            embedding_manager = EmbeddingManager(curr_project.model_configs)
-
-            # retrieve Chroma DB collection 
-            collection = chroma_client.get_collection(
-                f"{get_normalized_project_name(project)}_{source_type}"
-            )
-
-            # get chroma vector store corresponding to our projects DOCS collection
-            vector_store = ChromaVectorStore(chroma_collection=collection)
-            storage_context = StorageContext.from_defaults(vector_store=vector_store)
-
-            # store nodes within Chroma 
-            index = VectorStoreIndex(
-                nodes=nodes, # NOTE: Instead of using LlamaIndex's Document object, we will use our manually generated nodes
-                storage_context=storage_context,
-                embed_model=embedding_manager.get_embedding_model(source_type) # use configured embedding model for current Project
-            )
+        # convert all docs files to Docling Docs (sharding large PDFs across conversion workers)
+        return conversion_supervisor.convert_all(filtered_doc_files)
 
 
     def _cleanup_tmp_dirs(self, job_pk: UUID):
@@ -551,54 +440,3 @@ class IngestionJobService:
             raise Exception("Invalid directory path specified")
 
         return any(path.iterdir())
-    
-
-
-    def _chunk_docs(self, data_source: DataSource, project_id: UUID, conversion_results: Iterator[ConversionResult]) -> Dict[str, List]: 
-        """
-        Functionality to chunk docs via Dockling 
-
-        Args:
-            data_source (DataSource): data source we are ingesting docs for 
-            project_id (UUID): Optional project to ingest docs for 
-            conversion_results (Iterator[ConversionResult]): converted docling files results
-        """
-
-        # retrieve projects corresponding to data soruce 
-        projects = [record.project for record in data_source.project_data] if not project_id else [project_id] # TODO: Fix me for single project
-
-        # generate mapping of project to relevant ingested documentation chunks 
-        chunked_docs = {project.project_name: [] for project in projects}
-        for project in projects:
-            
-            # get chunker based on configured embedding model for the current project
-            embedding_manager = EmbeddingManager(project.model_configs)
-            chunker = HybridChunker(
-                tokenizer=embedding_manager.get_docs_tokenizer(), 
-                #TODO: Consider setting maximum length of tokens = 512 
-            )
-
-            # iterate through converted Docling documents 
-            for res in conversion_results:
-                logger.debug(f'Conversion result confidence for Document={res.document.name} = {res.confidence}')
-
-                # chunk current Docling document into DocChunk's
-                curr_doc_chunks = list(chunker.chunk(dl_doc=res.document))
-
-                # iterate through chunks in current document 
-                for chunk in curr_doc_chunks:
-                    chunked_docs[project.project_name].append(
-                        {
-                            "doc_chunk": chunk,
-                            "contextualized_chunk": chunker.contextualize(chunk=chunk)
-                        }
-                    )
-
-                
-                
-
-
-
-        return chunked_docs
-
-
@@ -1,14 +1,19 @@
 import logging
 
-from chromadb.api import ClientAPI
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.pydantic import ProjectRequest
 from app.models import Project, ModelConfigs
-from app.core import ChromaClientManager
-from app.services.util import get_normalized_project_name
+from app.core import (
+    ChromaClientManager,
+    is_shared_collection_mode,
+    resolve_hnsw_params,
+    get_hnsw_configuration,
+    get_normalized_project_name,
+    get_collection_targets
+)
 
 from typing import TYPE_CHECKING
 
@@ -28,6 +33,22 @@ class ProjectService:
         Functionality to persist new Project based on specified request
 
         """
+        # resolve index presets into the HNSW parameters persisted (& applied) for each collection
+        docs_hnsw = resolve_hnsw_params(
+            request.docs_index_preset.value if request.docs_index_preset else None,
+            request.docs_hnsw_space,
+            request.docs_hnsw_m,
+            request.docs_hnsw_construction_ef,
+            request.docs_hnsw_search_ef
+        )
+        code_hnsw = resolve_hnsw_params(
+            request.code_index_preset.value if request.code_index_preset else None,
+            request.code_hnsw_space,
+            request.code_hnsw_m,
+            request.code_hnsw_construction_ef,
+            request.code_hnsw_search_ef
+        )
+
         project = Project(
             project_name=request.name,
             epics=request.epics,
@@ -37,6 +58,18 @@ class ProjectService:
                 docs_embedding_model=request.docs_embedding_model,
                 code_embedding_provider=request.code_embedding_provider,
                 code_embedding_model=request.code_embedding_model,
+                table_structure_mode=request.table_structure_mode,
+                docs_embedding_dimensions=request.docs_embedding_dimensions,
+                code_embedding_dimensions=request.code_embedding_dimensions,
+                dimension_reduction=request.dimension_reduction,
+                docs_hnsw_space=docs_hnsw["space"],
+                docs_hnsw_m=docs_hnsw["m"],
+                docs_hnsw_construction_ef=docs_hnsw["construction_ef"],
+                docs_hnsw_search_ef=docs_hnsw["search_ef"],
+                code_hnsw_space=code_hnsw["space"],
+                code_hnsw_m=code_hnsw["m"],
+                code_hnsw_construction_ef=code_hnsw["construction_ef"],
+                code_hnsw_search_ef=code_hnsw["search_ef"],
             ),
         )
 
@@ -45,7 +78,7 @@ class ProjectService:
         self.db.flush()
 
         # create new ChromaDB collections for new project
-        self.create_new_collections(request.name)
+        self.create_new_collections(project)
 
         return {
             "id": project.id,
@@ -84,21 +117,28 @@ class ProjectService:
         ]
 
 
-    def create_new_collections(self, project_name: str) -> None:
+    def create_new_collections(self, project: Project) -> None:
         """
-        Create a new ChromaDB collection corresponding to the new Project
+        Create a new ChromaDB collection corresponding to the new Project, or ensure the collections shared by
+        Projects embedding with the same models exist (when collections are shared)
 
         TODO: Consider moving this functionality out of Project Service into its own ChromaDbService or soemthing
         """
 
+        project_name = project.project_name
+
+        if is_shared_collection_mode():
+            # NOTE: shared collections are created with Chroma's defaults, as their index serves every Project
+            self._verify_project_dne(project)
+            for target in get_collection_targets(project).values():
+                self.chroma_manager.get_or_create_collection(target.name)
+            return
+
         PROJECT = get_normalized_project_name(project_name)
-        chroma_client = (
-            self.chroma_manager.get_sync_client()
-        )  # TODO: Make this configurable for async vs sync
 
         # verify docs collection do not exist
         self._verify_project_collections_dne(
-            chroma_client, PROJECT, original_name=project_name
+            PROJECT, original_name=project_name
         )
 
         # create new CODE and DOCS collections for project
@@ -106,13 +146,40 @@ class ProjectService:
         To account for two collections per project, a sophisitcated way of using RAG will need to be implemented. Either some sort of routing functionality
         based on the posed question or a conveint way to query information from both collecitons if the the posed question corresponds to both.
         """
-        chroma_client.create_collection(
+        model_configs = project.model_configs
+        self.chroma_manager.create_collection(
             name=f"{PROJECT}_CODE",
+            configuration=get_hnsw_configuration(
+                model_configs.code_hnsw_space,
+                model_configs.code_hnsw_m,
+                model_configs.code_hnsw_construction_ef,
+                model_configs.code_hnsw_search_ef
+            )
+        )
+        self.chroma_manager.create_collection(
+            name=f"{PROJECT}_DOCS",
+            configuration=get_hnsw_configuration(
+                model_configs.docs_hnsw_space,
+                model_configs.docs_hnsw_m,
+                model_configs.docs_hnsw_construction_ef,
+                model_configs.docs_hnsw_search_ef
+            )
+        )
+
+    def _verify_project_dne(self, project: Project) -> None:
+        """
+        Helper function for verifying no other Project uses the specified project name, as shared collections
+        don't indicate which names are in use
+        """
+
+        stmt = select(Project.id).where(
+            Project.project_name == project.project_name, Project.id != project.id
         )
-        chroma_client.create_collection(name=f"{PROJECT}_DOCS")
+        if self.db.execute(stmt).scalars().first():
+            raise Exception(f"Project with the name {project.project_name} already exists")
 
     def _verify_project_collections_dne(
-        self, chroma_client: ClientAPI, project_name: str, original_name: str
+        self, project_name: str, original_name: str
     ) -> None:
         """
         Helper function for verifying relevant collections for specified project do not exist already
@@ -124,14 +191,14 @@ class ProjectService:
 
         # attempt to retrieve docs chroma db collection
         try:
-            chroma_client.get_collection(f"{project_name}_DOCS")
+            self.chroma_manager.get_collection(f"{project_name}_DOCS")
             project_dne = False
         except Exception as e:
             pass
 
         # attempt to retrieve code chromadb collection
         try:
-            chroma_client.get_collection(f"{project_name}_CODE")
+            self.chroma_manager.get_collection(f"{project_name}_CODE")
             project_dne = False
         except Exception as e:
             pass
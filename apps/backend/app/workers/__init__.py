@@ -0,0 +1,19 @@
+from .process import (
+    ProcessWorker,
+    WorkerError,
+    WorkerTimeoutError,
+    WorkerMemoryError,
+    WorkerCrashedError,
+    WorkerTaskError,
+    get_process_rss
+)
+
+__all__ = [
+    "ProcessWorker",
+    "WorkerError",
+    "WorkerTimeoutError",
+    "WorkerMemoryError",
+    "WorkerCrashedError",
+    "WorkerTaskError",
+    "get_process_rss"
+]
@@ -0,0 +1,310 @@
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Any, Callable, Optional, Tuple
+import multiprocessing
+import threading
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerError(Exception):
+    """
+    Base exception for failures while running a task in a worker process
+    """
+
+
+class WorkerTimeoutError(WorkerError):
+    """
+    Task exceeded the configured time limit & the worker was killed
+    """
+
+
+class WorkerMemoryError(WorkerError):
+    """
+    Worker exceeded the configured RSS ceiling while running a task & was killed
+    """
+
+
+class WorkerCrashedError(WorkerError):
+    """
+    Worker process exited unexpectedly
+    """
+
+
+class WorkerTaskError(WorkerError):
+    """
+    Task raised an exception within the worker process
+    """
+
+
+def get_process_rss(pid: int) -> int:
+    """
+    Retrieve the resident set size (in bytes) of a process
+
+    Args:
+        pid (int): ID of the process
+    """
+
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024 # reported in kB
+    except (OSError, ValueError):
+        pass
+
+    return 0
+
+
+def _worker_main(conn: Connection, initializer: Callable, init_args: Tuple, handler: Callable):
+    """
+    Entrypoint of the worker process: initialize worker state once (i.e load models) & then
+    run tasks sent by the parent until told to stop
+
+    Args:
+        conn (Connection): connection to parent process
+        initializer (Callable): function creating the worker state
+        init_args (Tuple): arguments passed to the initializer
+        handler (Callable): function invoked with the worker state & each task
+    """
+
+    state = initializer(*init_args)
+    conn.send(("ready", None))
+
+    while True:
+        task = conn.recv()
+
+        # parent requested shutdown
+        if task is None:
+            break
+
+        try:
+            conn.send(("ok", handler(state, task)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {str(e)}"))
+
+    conn.close()
+
+
+class ProcessWorker:
+    """
+    Runs tasks one at a time in a dedicated child process, killing & replacing the process whenever
+    a task exceeds its time limit or the process exceeds its RSS ceiling
+
+    Similar to max-tasks-per-child, the process is also recycled (gracefully stopped in between tasks &
+    replaced by a fresh process on the next task) after a number of tasks or once its RSS grows past
+    a threshold, returning memory fragmented by long running Docling / torch processes to the OS
+
+    NOTE: Processes are spawned (rather than forked) as torch & Docling do not survive a fork
+    of a multi-threaded parent
+    """
+
+    def __init__(
+            self,
+            name: str,
+            initializer: Callable,
+            handler: Callable,
+            init_args: Tuple = (),
+            task_timeout: Optional[float] = None,
+            max_rss: Optional[int] = None,
+            max_tasks: Optional[int] = None,
+            recycle_rss: Optional[int] = None,
+            poll_interval: float = 0.5
+    ):
+        self.name = name
+        self._initializer = initializer
+        self._init_args = init_args
+        self._handler = handler
+        self._task_timeout = task_timeout
+        self._max_rss = max_rss
+        self._max_tasks = max_tasks
+        self._recycle_rss = recycle_rss
+        self._poll_interval = poll_interval
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._process: Optional[BaseProcess] = None
+        self._conn: Optional[Connection] = None
+        self._tasks_completed = 0
+
+        # NOTE: a worker can be shared across threads, but only runs a single task at a time
+        self._lock = threading.RLock()
+
+
+    def __enter__(self) -> "ProcessWorker":
+        return self
+
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid if self._process else None
+
+
+    @property
+    def is_alive(self) -> bool:
+        return bool(self._process and self._process.is_alive())
+
+
+    def start(self):
+        """
+        Spawn worker process & wait for it to finish initializing
+        """
+
+        with self._lock:
+            self._start()
+
+
+    def _start(self):
+        self._tasks_completed = 0
+
+        parent_conn, child_conn = self._ctx.Pipe()
+        self._process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self._initializer, self._init_args, self._handler),
+            name=self.name,
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+        # NOTE: initialization (i.e model loading) is not subject to the task time limit
+        self._receive(deadline=None)
+        logger.debug(f"Started worker={self.name} with pid={self.pid}")
+
+
+    def run(self, task: Any) -> Any:
+        """
+        Run task within worker process, starting the process if needed
+
+        Args:
+            task (Any): picklable task passed to the worker's handler
+        """
+
+        with self._lock:
+            if not self.is_alive:
+                self._start()
+
+            self._conn.send(task)
+
+            deadline = time.monotonic() + self._task_timeout if self._task_timeout else None
+            try:
+                return self._receive(deadline)
+            finally:
+                self._tasks_completed += 1
+                self._recycle_if_needed()
+
+
+    def stop(self):
+        """
+        Gracefully stop worker process, killing it if it does not exit in time
+        """
+
+        with self._lock:
+            self._stop()
+
+
+    def _stop(self):
+        if not self._process:
+            return
+
+        try:
+            if self._process.is_alive():
+                self._conn.send(None)
+                self._process.join(timeout=10)
+        except (OSError, EOFError):
+            pass
+
+        if self._process.is_alive():
+            self.kill()
+        else:
+            self._cleanup()
+
+
+    def kill(self):
+        """
+        Forcefully terminate worker process
+        """
+
+        if not self._process:
+            return
+
+        logger.warning(f"Killing worker={self.name} with pid={self.pid}")
+        self._process.kill()
+        self._process.join()
+        self._cleanup()
+
+
+    def _receive(self, deadline: Optional[float]) -> Any:
+        """
+        Wait for a response from the worker process, enforcing the time limit & RSS ceiling
+
+        Args:
+            deadline (Optional[float]): monotonic time the task must complete by
+        """
+
+        while not self._conn.poll(self._poll_interval):
+
+            if not self._process.is_alive():
+                exit_code = self._process.exitcode
+                self._cleanup()
+                raise WorkerCrashedError(f"Worker={self.name} exited unexpectedly with exitcode={exit_code}")
+
+            if deadline and time.monotonic() > deadline:
+                self.kill()
+                raise WorkerTimeoutError(f"Worker={self.name} exceeded time limit of {self._task_timeout} seconds")
+
+            rss = get_process_rss(self.pid)
+            if self._max_rss and rss > self._max_rss:
+                self.kill()
+                raise WorkerMemoryError(
+                    f"Worker={self.name} exceeded RSS ceiling of {self._max_rss // 1024**2}MB ({rss // 1024**2}MB)"
+                )
+
+        try:
+            status, result = self._conn.recv()
+        except EOFError:
+            self._process.join()
+            exit_code = self._process.exitcode
+            self._cleanup()
+            raise WorkerCrashedError(f"Worker={self.name} exited unexpectedly with exitcode={exit_code}")
+
+        if status == "error":
+            raise WorkerTaskError(result)
+
+        return result
+
+
+    def _recycle_if_needed(self):
+        """
+        Gracefully stop the worker process once it has completed its maximum number of tasks or grown
+        past its RSS threshold, so the next task is handed to a fresh process
+        """
+
+        if not self.is_alive:
+            return
+
+        reason = None
+        if self._max_tasks and self._tasks_completed >= self._max_tasks:
+            reason = f"completing {self._tasks_completed} tasks"
+        elif self._recycle_rss:
+            rss = get_process_rss(self.pid)
+            if rss > self._recycle_rss:
+                reason = f"RSS of {rss // 1024**2}MB exceeding {self._recycle_rss // 1024**2}MB"
+
+        if reason:
+            logger.info(f"Recycling worker={self.name} with pid={self.pid} after {reason}")
+            self._stop()
+
+
+    def _cleanup(self):
+        if self._conn:
+            self._conn.close()
+        self._process = None
+        self._conn = None